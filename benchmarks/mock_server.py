@@ -0,0 +1,478 @@
+"""Local stand-in for the Dynamics 365 (Dataverse) Web API used by the benchmarks.
+
+The server implements the subset of the API used by the component: the OAuth token endpoint, entity metadata,
+create, update, upsert and delete of records, ``$batch`` requests with changesets and the bulk
+``CreateMultiple``, ``UpdateMultiple`` and ``UpsertMultiple`` actions. Each operation takes
+a configurable time, may fail with a configurable probability and may be throttled by the service protection
+limits with HTTP 429.
+
+Counters of received requests are available at ``/_stats``. Run standalone with
+``python benchmarks/mock_server.py --port 8080``.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import cast
+from urllib.parse import parse_qs, unquote, urlparse
+
+API_PREFIX = "/api/data/"
+TOKEN_PATH = "/token"
+STATS_PATH = "/_stats"
+CRLF = "\r\n"
+
+ENTITIES = {"accounts": "account", "contacts": "contact"}
+ATTRIBUTES = {
+    "name": "String",
+    "description": "Memo",
+    "revenue": "Money",
+    "numberofemployees": "Integer",
+    "telephone1": "String",
+    "emailaddress1": "String",
+}
+STRING_MAX_LENGTH = 100
+STRING_ATTRIBUTES_SUFFIX = "/Attributes/Microsoft.Dynamics.CRM.StringAttributeMetadata"
+NAVIGATION_PROPERTIES = {"parentaccountid": "account", "primarycontactid": "contact"}
+BULK_ACTION_PREFIX = "Microsoft.Dynamics.CRM."
+BULK_ACTIONS = ["CreateMultiple", "UpdateMultiple", "UpsertMultiple"]
+
+
+@dataclass
+class MockSettings:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+    seed: int | None = None
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    operations: int = 0
+    batches: int = 0
+    errors: int = 0
+    throttled: int = 0
+    by_method: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "operations": self.operations,
+            "batches": self.batches,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "by_method": dict(self.by_method),
+        }
+
+
+class DataverseMockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, settings: MockSettings):
+        super().__init__(address, DataverseRequestHandler)
+        self.settings = settings
+        self.stats = MockStats()
+        self._lock = threading.Lock()
+        self._random = random.Random(settings.seed)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, method: str, operations: int = 1, batch: bool = False) -> None:
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.operations += operations
+            self.stats.batches += int(batch)
+            self.stats.by_method[method] = self.stats.by_method.get(method, 0) + 1
+
+    def is_throttled(self) -> bool:
+        """Decide whether the next request is throttled."""
+
+        with self._lock:
+            throttled = self._random.random() < self.settings.throttle_rate
+            self.stats.throttled += int(throttled)
+            return throttled
+
+    def is_failed(self) -> bool:
+        """Decide whether the next operation fails."""
+
+        with self._lock:
+            return self._random.random() < self.settings.error_rate
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.stats.errors += 1
+
+    def wait(self, operations: int = 1) -> None:
+
+        latency = self.settings.latency_ms + self._random.uniform(0, self.settings.latency_jitter_ms)
+        if latency > 0:
+            time.sleep(latency * operations / 1000)
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="dataverse-mock", daemon=True)
+        thread.start()
+        return thread
+
+
+class DataverseRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def mock(self) -> DataverseMockServer:
+        return cast(DataverseMockServer, self.server)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method: str) -> None:
+
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        path = unquote(urlparse(self.path).path)
+
+        if path == STATS_PATH:
+            self._send(200, "OK", json.dumps(self.mock.stats.to_dict()))
+            return
+
+        if path == TOKEN_PATH:
+            self.mock.count(method)
+            token = {"access_token": f"token-{uuid.uuid4()}", "token_type": "Bearer", "expires_in": "3599"}
+            self._send(200, "OK", json.dumps(token))
+            return
+
+        if not path.startswith(API_PREFIX):
+            self._send(404, "Not Found", _error("Resource not found."))
+            return
+
+        resource = path[len(API_PREFIX) :].partition("/")[2]
+
+        if method == "GET":
+            self.mock.count(method)
+            query = parse_qs(urlparse(self.path).query)
+            self._send(*(_records(resource, query) if resource in ENTITIES else _metadata(resource)))
+            return
+
+        if resource == "$batch":
+            self._handle_batch(body.decode("utf-8"))
+            return
+
+        if BULK_ACTION_PREFIX in resource:
+            self._handle_bulk(resource, json.loads(body or b"{}"))
+            return
+
+        self.mock.count(method)
+
+        if self.mock.is_throttled():
+            self._send_throttled()
+            return
+
+        self.mock.wait()
+        status_code, reason, response_body = _operation(self.mock, method, resource)
+        headers = {"OData-EntityId": _entity_id(resource)} if method == "POST" and status_code == 204 else None
+        self._send(status_code, reason, response_body, headers=headers)
+
+    def _handle_batch(self, body: str) -> None:
+
+        requests = _parse_batch(self.headers.get("Content-Type", ""), body)
+        operations = sum(len(changeset) if isinstance(changeset, list) else 1 for changeset in requests)
+        self.mock.count("$batch", operations, batch=True)
+
+        if self.mock.is_throttled():
+            self._send_throttled()
+            return
+
+        self.mock.wait(operations)
+
+        continue_on_error = "odata.continue-on-error" in self.headers.get("Prefer", "")
+        batch_boundary = f"batchresponse_{uuid.uuid4()}"
+        lines = []
+
+        for part in requests:
+            if isinstance(part, list):
+                lines += [f"--{batch_boundary}", *_changeset_response(self.mock, part)]
+                continue
+
+            status_code, reason, response_body = _operation(self.mock, part[0], part[1])
+            lines += [f"--{batch_boundary}", *_http_part(status_code, reason, response_body, resource=part[1])]
+
+            if status_code >= 400 and not continue_on_error:
+                break
+
+        lines += [f"--{batch_boundary}--", ""]
+        self._send(200, "OK", CRLF.join(lines), f"multipart/mixed; boundary={batch_boundary}")
+
+    def _handle_bulk(self, resource: str, body: dict) -> None:
+        """Execute a CreateMultiple, UpdateMultiple or UpsertMultiple action. The action is transactional,
+        so it fails as a whole, if any of its records fails."""
+
+        entity_set, _, action = resource.partition(BULK_ACTION_PREFIX)
+        entity_set = entity_set.rstrip("/")
+        targets = body.get("Targets", [])
+        self.mock.count(action, len(targets))
+
+        if self.mock.is_throttled():
+            self._send_throttled()
+            return
+
+        self.mock.wait(len(targets))
+
+        if entity_set not in ENTITIES or action not in BULK_ACTIONS:
+            self.mock.record_error()
+            self._send(404, "Not Found", _error(f"Resource {resource} not found."))
+            return
+
+        if any(self.mock.is_failed() for _ in targets):
+            self.mock.record_error()
+            self._send(400, "Bad Request", _error("The request could not be processed.\r\nSimulated error."))
+            return
+
+        if action == "CreateMultiple":
+            self._send(200, "OK", json.dumps({"Ids": [str(uuid.uuid4()) for _ in targets]}))
+        else:
+            self._send(204, "No Content")
+
+    def _send_throttled(self) -> None:
+
+        retry_after = self.mock.settings.retry_after_seconds
+        message = _error("Number of requests exceeded the limit of 6000 over time window of 300 seconds.")
+        self._send(429, "Too Many Requests", message, headers={"Retry-After": f"{retry_after:g}"})
+
+    def _send(self, status_code, reason, body="", content_type="application/json", headers=None) -> None:
+
+        data = body.encode("utf-8")
+        self.send_response(status_code, reason)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("REQ_ID", str(uuid.uuid4()))
+        self.send_header("x-ms-ratelimit-burst-remaining-xrm-requests", "5999")
+        self.send_header("x-ms-ratelimit-time-remaining-xrm-requests", "1200000.00")
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _error(message: str) -> str:
+    return json.dumps({"error": {"code": "0x80040216", "message": message}})
+
+
+def _metadata(resource: str) -> tuple[int, str, str]:
+
+    if resource == "EntityDefinitions":
+        value = [{"EntitySetName": name, "LogicalName": logical} for name, logical in ENTITIES.items()]
+
+    elif resource.endswith("/Attributes"):
+        value = [
+            {"LogicalName": name, "AttributeType": attribute_type, "IsValidForCreate": True, "IsValidForUpdate": True}
+            for name, attribute_type in ATTRIBUTES.items()
+        ]
+
+    elif resource.endswith(STRING_ATTRIBUTES_SUFFIX):
+        value = [
+            {"LogicalName": name, "MaxLength": STRING_MAX_LENGTH}
+            for name, attribute_type in ATTRIBUTES.items()
+            if attribute_type == "String"
+        ]
+
+    elif resource.startswith("EntityDefinitions(") and resource.endswith(")"):
+        logical_name = resource.split("'")[1]
+        return 200, "OK", json.dumps({"PrimaryIdAttribute": f"{logical_name}id"})
+
+    elif resource == "sdkmessagefilters":
+        value = [{"primaryobjecttypecode": "account", "sdkmessageid": {"name": action}} for action in BULK_ACTIONS]
+
+    elif resource.endswith("/Keys"):
+        value = [{"LogicalName": "name_key", "KeyAttributes": ["name"], "EntityKeyIndexStatus": "Active"}]
+
+    elif resource.endswith("/ManyToOneRelationships"):
+        value = [
+            {"ReferencingEntityNavigationPropertyName": name, "ReferencedEntity": entity}
+            for name, entity in NAVIGATION_PROPERTIES.items()
+        ]
+
+    else:
+        return 404, "Not Found", _error(f"Resource {resource} not found.")
+
+    return 200, "OK", json.dumps({"value": value})
+
+
+def _records(entity_set: str, query: dict) -> tuple[int, str, str]:
+    """Return a record for each value of a ``Microsoft.Dynamics.CRM.In`` filter, with an ID derived from the value,
+    so lookups by natural keys resolve to stable IDs."""
+
+    select = query.get("$select", [""])[0].split(",")
+    record_filter = query.get("$filter", [""])[0]
+
+    if len(select) != 2 or "PropertyValues=[" not in record_filter:
+        return 200, "OK", json.dumps({"value": []})
+
+    id_attribute, attribute = select
+    values = re.findall(r"'((?:[^']|'')*)'", record_filter.partition("PropertyValues=")[2])
+    value = [
+        {id_attribute: str(uuid.uuid5(uuid.NAMESPACE_URL, f"{entity_set}/{item}")), attribute: item.replace("''", "'")}
+        for item in values
+    ]
+
+    return 200, "OK", json.dumps({"value": value})
+
+
+def _entity_id(resource: str) -> str:
+    return f"https://mock/api/data/v9.2/{resource.partition('(')[0]}({uuid.uuid4()})"
+
+
+def _operation(server: DataverseMockServer, method: str, resource: str) -> tuple[int, str, str]:
+    """Execute a single record operation. Returns the status code, reason and body of the response."""
+
+    entity_set, _, _ = resource.partition("(")
+
+    if entity_set not in ENTITIES or method not in ("POST", "PATCH", "DELETE"):
+        server.record_error()
+        return 404, "Not Found", _error(f"Resource {resource} not found.")
+
+    if server.is_failed():
+        server.record_error()
+        return 400, "Bad Request", _error("The request could not be processed.\r\nSimulated error.")
+
+    return 204, "No Content", ""
+
+
+def _http_part(
+    status_code: int, reason: str, body: str, content_id: str | None = None, resource: str = ""
+) -> list[str]:
+
+    lines = ["Content-Type: application/http", "Content-Transfer-Encoding: binary"]
+    if content_id is not None:
+        lines += [f"Content-ID: {content_id}"]
+
+    lines += ["", f"HTTP/1.1 {status_code} {reason}"]
+
+    if status_code == 204:
+        lines += [f"OData-EntityId: {_entity_id(resource)}"]
+
+    if body:
+        lines += ["Content-Type: application/json; odata.metadata=minimal", "", body]
+    else:
+        lines += [""]
+
+    return lines
+
+
+def _changeset_response(server: DataverseMockServer, operations: list) -> list[str]:
+    """Execute a changeset. If any of its operations fails, only the error of the failed operation is returned."""
+
+    changeset_boundary = f"changesetresponse_{uuid.uuid4()}"
+    parts = []
+
+    for method, resource, content_id in operations:
+        status_code, reason, body = _operation(server, method, resource)
+
+        if status_code >= 400:
+            parts = [f"--{changeset_boundary}", *_http_part(status_code, reason, body, content_id)]
+            break
+
+        parts += [f"--{changeset_boundary}", *_http_part(status_code, reason, body, content_id, resource)]
+
+    return [
+        f"Content-Type: multipart/mixed; boundary={changeset_boundary}",
+        "",
+        *parts,
+        f"--{changeset_boundary}--",
+    ]
+
+
+def _boundary(content_type: str) -> str:
+
+    for parameter in content_type.split(";")[1:]:
+        name, _, value = parameter.strip().partition("=")
+        if name.lower() == "boundary":
+            return value.strip('"')
+
+    raise ValueError(f"Missing boundary in content type {content_type}.")
+
+
+def _parse_batch(content_type: str, body: str) -> list:
+    """Parse a ``$batch`` request. Returns a list of ``(method, resource, content_id)`` tuples for operations
+    and lists of such tuples for changesets."""
+
+    parts = []
+    delimiter = f"--{_boundary(content_type)}"
+
+    for part in body.replace(CRLF, "\n").split(delimiter)[1:]:
+        if part.startswith("--"):
+            break
+
+        raw_headers, _, part_body = part.lstrip("\n").partition("\n\n")
+        headers = dict(line.split(":", 1) for line in raw_headers.split("\n") if ":" in line)
+        headers = {name.strip().lower(): value.strip() for name, value in headers.items()}
+        part_content_type = headers.get("content-type", "")
+
+        if part_content_type.lower().startswith("multipart/mixed"):
+            parts += [_parse_batch(part_content_type, part_body)]
+            continue
+
+        method, url, _ = part_body.lstrip("\n").split("\n", 1)[0].split(" ", 2)
+        path = unquote(urlparse(url).path)
+        resource = path[len(API_PREFIX) :].partition("/")[2] if path.startswith(API_PREFIX) else path
+        parts += [(method, resource, headers.get("content-id"))]
+
+    return parts
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Time each operation takes.")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0, help="Random time added to the latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability an operation fails with 400.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability a request is throttled.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of throttled requests.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = MockSettings(
+        args.latency_ms, args.latency_jitter_ms, args.error_rate, args.throttle_rate, args.retry_after, args.seed
+    )
+    server = DataverseMockServer((args.host, args.port), settings)
+    print(f"Dataverse mock server listening on {server.url}", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats.to_dict()), flush=True)
+
+
+if __name__ == "__main__":
+    main()
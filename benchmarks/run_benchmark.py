@@ -0,0 +1,323 @@
+"""Benchmark of the component against the local Dataverse mock server.
+
+Each scenario writes a generated input table with one of the operations and reports throughput, request latency,
+peak memory and CPU time of the component. Scenarios are named ``<operation>-<rows>``, e.g. ``upsert-10k`` or
+``delete-1m``, where operation is one of ``create``, ``update``, ``upsert`` and ``delete``. Every scenario runs
+in a separate process, so its peak memory is not affected by the other scenarios.
+
+Example::
+
+    python benchmarks/run_benchmark.py upsert-10k create-10k --execution-engine batch --concurrency 4 \\
+        --latency-ms 20 --throttle-rate 0.01 --output results.json
+
+Results can be compared to a previous run with ``--baseline``; the benchmark fails, if throughput of any scenario
+drops by more than ``--max-regression``.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from urllib.request import urlopen
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "src"))
+
+from mock_server import DataverseMockServer, MockSettings  # noqa: E402
+
+OPERATIONS = ["create", "update", "upsert", "delete"]
+DEFAULT_SCENARIOS = [f"{operation}-10k" for operation in OPERATIONS]
+ENDPOINT = "accounts"
+ROW_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_scenario(scenario: str) -> tuple[str, int]:
+    """Parse a scenario name, e.g. ``upsert-10k``, into the operation and the number of rows."""
+
+    operation, _, rows = scenario.lower().partition("-")
+    multiplier = ROW_SUFFIXES.get(rows[-1:], 1)
+    rows = rows[:-1] if rows[-1:] in ROW_SUFFIXES else rows
+
+    if operation not in OPERATIONS or not rows.isdigit():
+        raise ValueError(f"Invalid scenario {scenario}. Expected <operation>-<rows>, e.g. upsert-10k.")
+
+    return operation, int(rows) * multiplier
+
+
+def write_input_table(data_dir: str, operation: str, rows: int) -> None:
+
+    tables_dir = os.path.join(data_dir, "in", "tables")
+    os.makedirs(tables_dir, exist_ok=True)
+    os.makedirs(os.path.join(data_dir, "out", "tables"), exist_ok=True)
+
+    table_path = os.path.join(tables_dir, f"{ENDPOINT}.csv")
+    namespace = uuid.UUID("6f1c1f4e-4c1e-4a8e-9d1c-6a0c2b3a9f10")
+
+    with open(table_path, "w", newline="") as out_table:
+        writer = csv.writer(out_table, quoting=csv.QUOTE_ALL)
+        writer.writerow(["id"] if operation == "delete" else ["id", "data"])
+
+        for index in range(rows):
+            record_id = "" if operation == "create" else str(uuid.uuid5(namespace, str(index)))
+
+            if operation == "delete":
+                writer.writerow([record_id])
+                continue
+
+            data = {
+                "name": f"Account {index}",
+                "description": f"Benchmark account number {index}",
+                "revenue": index * 10.5,
+                "numberofemployees": index % 1000,
+                "telephone1": f"+420 {index:09d}",
+                "emailaddress1": f"account{index}@example.com",
+            }
+            writer.writerow([record_id, json.dumps(data)])
+
+    with open(table_path + ".manifest", "w") as manifest:
+        json.dump({"id": f"in.c-benchmark.{ENDPOINT}", "name": ENDPOINT}, manifest)
+
+
+def write_config(data_dir: str, server_url: str, operation: str, parameters: dict) -> None:
+
+    component_operation = {"create": "create_and_update", "update": "create_and_update"}.get(operation, operation)
+
+    config = {
+        "parameters": {
+            "organization_url": server_url,
+            "api_version": "v9.2",
+            "operation": component_operation,
+            **parameters,
+        },
+        "authorization": {
+            "oauth_api": {
+                "credentials": {
+                    "appKey": "benchmark",
+                    "#appSecret": "benchmark",
+                    "#data": json.dumps({"refresh_token": "benchmark"}),
+                }
+            }
+        },
+    }
+
+    with open(os.path.join(data_dir, "config.json"), "w") as config_file:
+        json.dump(config, config_file)
+
+
+def run_component(data_dir: str, server_url: str, result_queue) -> None:
+    """Run the component in the current process and put the measured results to ``result_queue``."""
+
+    os.environ["KBC_DATADIR"] = data_dir
+
+    from component import Component
+    from dynamics.client import DynamicsClient
+
+    DynamicsClient.MSFT_LOGIN_URL = f"{server_url}/token"
+    latencies = []
+    request_raw = DynamicsClient._request_raw
+
+    def timed_request_raw(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return request_raw(self, *args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    DynamicsClient._request_raw = timed_request_raw
+
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    error = None
+
+    try:
+        component = Component()
+        logging.getLogger().setLevel(logging.WARNING)
+        component.run()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    elapsed = time.perf_counter() - start
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = usage_end.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+    result_queue.put(
+        {
+            "elapsed_seconds": elapsed,
+            "cpu_seconds": (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime),
+            "peak_rss_mb": peak_rss / 1024 / 1024,
+            "requests": len(latencies),
+            "latency_p50_ms": _percentile(latencies, 50) * 1000,
+            "latency_p99_ms": _percentile(latencies, 99) * 1000,
+            "error": error,
+        }
+    )
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+
+    if len(values) < 2:
+        return values[0] if values else 0.0
+
+    return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
+
+
+def _fetch_stats(server_url: str) -> dict:
+
+    with urlopen(f"{server_url}/_stats") as response:
+        return json.loads(response.read())
+
+
+def run_scenario(scenario: str, server_url: str, parameters: dict) -> dict:
+
+    operation, rows = parse_scenario(scenario)
+
+    with tempfile.TemporaryDirectory(prefix="dynamics-benchmark-") as data_dir:
+        write_input_table(data_dir, operation, rows)
+        write_config(data_dir, server_url, operation, parameters)
+
+        stats_before = _fetch_stats(server_url)
+        context = multiprocessing.get_context("spawn")
+        result_queue = context.Queue()
+        process = context.Process(target=run_component, args=(data_dir, server_url, result_queue))
+        process.start()
+        result = result_queue.get()
+        process.join()
+        stats_after = _fetch_stats(server_url)
+
+    result.update(
+        {
+            "scenario": scenario,
+            "operation": operation,
+            "rows": rows,
+            "rows_per_second": rows / result["elapsed_seconds"] if result["elapsed_seconds"] else 0.0,
+            "throttled": stats_after["throttled"] - stats_before["throttled"],
+            "server_errors": stats_after["errors"] - stats_before["errors"],
+        }
+    )
+    return result
+
+
+def print_results(results: list[dict]) -> None:
+
+    columns = [
+        ("scenario", "{}"),
+        ("rows", "{}"),
+        ("elapsed_seconds", "{:.2f}"),
+        ("rows_per_second", "{:.1f}"),
+        ("requests", "{}"),
+        ("latency_p50_ms", "{:.1f}"),
+        ("latency_p99_ms", "{:.1f}"),
+        ("throttled", "{}"),
+        ("peak_rss_mb", "{:.1f}"),
+        ("cpu_seconds", "{:.2f}"),
+    ]
+    table = [[name for name, _ in columns]]
+    table += [[template.format(result[name]) for name, template in columns] for result in results]
+    widths = [max(len(row[index]) for row in table) for index in range(len(columns))]
+
+    for row in table:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+    for result in results:
+        if result["error"]:
+            print(f"{result['scenario']} failed: {result['error']}")
+
+
+def find_regressions(results: list[dict], baseline: list[dict], max_regression: float) -> list[str]:
+    """Return descriptions of scenarios, whose throughput dropped by more than ``max_regression``."""
+
+    baseline_by_scenario = {result["scenario"]: result for result in baseline}
+    regressions = []
+
+    for result in results:
+        previous = baseline_by_scenario.get(result["scenario"])
+        if previous is None or not previous["rows_per_second"]:
+            continue
+
+        change = result["rows_per_second"] / previous["rows_per_second"] - 1
+        if change < -max_regression:
+            regressions += [
+                f"{result['scenario']}: {result['rows_per_second']:.1f} rows/s, "
+                f"baseline {previous['rows_per_second']:.1f} rows/s ({change:+.1%})"
+            ]
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", default=DEFAULT_SCENARIOS, help="Scenarios to run.")
+    parser.add_argument("--execution-engine", choices=["single", "batch", "bulk"], default="single")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--use-changesets", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--parameter", action="append", default=[], metavar="NAME=JSON", help="Other component parameter."
+    )
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Time each operation takes on the server.")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results to a JSON file.")
+    parser.add_argument("--baseline", help="JSON file with results of a previous run to compare with.")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="Allowed drop of throughput.")
+    args = parser.parse_args(argv)
+
+    parameters = {
+        "execution_engine": args.execution_engine,
+        "batch_size": args.batch_size,
+        "use_changesets": args.use_changesets,
+        "concurrency": args.concurrency,
+    }
+    for parameter in args.parameter:
+        name, _, value = parameter.partition("=")
+        parameters[name] = json.loads(value)
+
+    settings = MockSettings(
+        args.latency_ms, args.latency_jitter_ms, args.error_rate, args.throttle_rate, args.retry_after, args.seed
+    )
+    server = DataverseMockServer(("127.0.0.1", 0), settings)
+    server.start()
+
+    try:
+        results = [run_scenario(scenario, server.url, parameters) for scenario in args.scenarios]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"parameters": parameters, "server": vars(settings), "results": results}, output, indent=2)
+
+    failed = any(result["error"] for result in results)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file)["results"], args.max_regression)
+
+        for regression in regressions:
+            print(f"Regression in {regression}")
+
+        failed = failed or bool(regressions)
+
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
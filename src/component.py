@@ -1,141 +1,1025 @@
-import csv
-import json
 import logging
 import os
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
-from keboola.component.base import ComponentBase
+import requests
+from keboola.component.base import ComponentBase, sync_action
 from keboola.component.exceptions import UserException
-
-from configuration import Configuration
-from dynamics.client import DynamicsClient
+from keboola.component.sync_actions import MessageType, ValidationResult
+
+from configuration import Configuration, ExecutionEngine, HttpTransport, InputMode
+from dynamics.alternate_key import AlternateKeySpec, find_entity_key
+from dynamics.attributes import KEY_SUFFIX
+from dynamics.batch import BATCH_MAX_OPERATIONS
+from dynamics.change_index import ChangeIndex
+from dynamics.checkpoint import CheckpointStore, table_fingerprint
+from dynamics.client import BULK_MESSAGES, DynamicsClient
+from dynamics.coalesce import RecordCoalescer
+from dynamics.column_mapping import ColumnMapping
+from dynamics.diff import RecordIdSet, get_changed_data, get_compared_attributes, is_record_id
+from dynamics.estimate import DEFAULT_LATENCY_MS, LATENCY_STATE_KEY, EndpointEstimate, LoadEstimate
+from dynamics.executor import OrderedExecutor
+from dynamics.lookup import AMBIGUOUS, IN_FILTER_VALUES, NOT_FOUND, LookupKeyError, LookupResolver, parse_lookup_key
+from dynamics.metadata_cache import MetadataCache
+from dynamics.payload import dump_payload, parse_payload
+from dynamics.reader import get_table_columns, iter_table_rows
 from dynamics.result import DynamicsResultsWriter
+from dynamics.retry import RetryQueue, is_transient_failure
+from dynamics.scheduler import TableScheduler, find_dependency_cycle
+from dynamics.telemetry import Telemetry
+from dynamics.token_manager import TokenManager
+from dynamics.validator import AttributeValidator
 
-APP_VERSION = "0.1.7"
+APP_VERSION = "0.2.0"
 
 SUPPORTED_OPERATIONS = ["delete", "create_and_update", "upsert"]
 MANDATORYFIELDS_UPSERT = ["id", "data"]
 MANDATORYFIELDS_DELETE = ["id"]
+MAX_REPORTED_ERRORS = 20
+LOOKUP_CHUNK_ROWS = 500
+DIFF_CHUNK_ROWS = 500
+
+
+@dataclass(slots=True)
+class WriteRecord:
+    """A row of an input table prepared for writing. Only the values written to the output table, i.e. the ``id`` and
+    ``data`` columns, are kept from the row, so records waiting in queues do not hold whole rows."""
+
+    operation: str
+    record_id: str
+    data: dict | None = None
+    row_number: int = 0
+    status: dict | None = None
+    skipped: bool = False
+    row_id: str | None = None
+    row_data: str | None = None
+    size: int = 0
+    data_hash: str | None = None
+    repeated: bool = False
+
+    @property
+    def result_row(self) -> dict:
+        return {"id": self.row_id, "data": self.row_data}
 
 
 class Component(ComponentBase):
+    checkpoints: CheckpointStore | None = None
+    change_index: ChangeIndex | None = None
+    telemetry: Telemetry | None = None
+    alternate_keys: dict[str, AlternateKeySpec] | None = None
+    bulk_messages: dict[str, set] | None = None
+    attribute_validators: dict[str, AttributeValidator] | None = None
+    endpoint_limits: dict[str, threading.BoundedSemaphore] | None = None
+    lookup_resolver: LookupResolver | None = None
+    sent_records: RecordIdSet | None = None
+
     def __init__(self):
 
         super().__init__()
         self.cfg: Configuration
         self._client: DynamicsClient = None
+        self.state: dict = {}
         self.in_tables = self.get_input_tables_definitions()
-        self.writer = DynamicsResultsWriter(self.tables_out_path)
+        self.writer: DynamicsResultsWriter
 
     def run(self):
 
         self._init_configuration()
+
+        if self.cfg.dry_run:
+            self.dry_run()
+            return
+
         self.check_input_tables()
 
+        self.state = self.get_state_file() or {}
+        self.writer = DynamicsResultsWriter(
+            self.tables_out_path,
+            flush_rows=self.cfg.results_flush_rows,
+            slice_rows=self.cfg.results_slice_rows,
+            compress=self.cfg.results_compress,
+        )
+
+        # saving a checkpoint serializes the whole state, so progress is stored only if it may be resumed
+        if self.cfg.resume_from_checkpoint:
+            self.checkpoints = CheckpointStore(self.state, self.cfg.checkpoint_interval_rows, self.save_checkpoint)
+        else:
+            self.state.pop(CheckpointStore.STATE_KEY, None)
+
+        self.telemetry = Telemetry(self.cfg.progress_interval_seconds)
+        # created before tables are written concurrently, so all of them share the same set
+        self.sent_records = RecordIdSet()
+
+        if self.cfg.skip_unchanged:
+            self.change_index = ChangeIndex(self.state, self.cfg.organization_url, self.cfg.change_index_max_entries)
+            logging.info(f"Skipping unchanged records, {len(self.change_index)} records in the change index.")
+
+        try:
+            self.init_client()
+            self._client.get_entity_metadata()
+
+            self.check_input_endpoints()
+            self.check_alternate_keys()
+
+            if self.cfg.validate_before_write:
+                self.check_input_attributes()
+
+            self.write_tables()
+
+        finally:
+            self.writer.close()
+            self.save_state()
+            self.telemetry.log_progress(force=True)
+            self.telemetry.write_summary(self.tables_out_path)
+
+    def save_state(self) -> None:
+
+        if self._client is not None and self._client.metadata_cache is not None:
+            self.state[MetadataCache.STATE_KEY] = self._client.metadata_cache.to_state()
+
+        if self._client is not None and self._client.token_manager is not None:
+            self.state[TokenManager.STATE_KEY] = self._client.token_manager.to_state(self._source_refresh_token)
+
+        if self.checkpoints is not None:
+            self.state[CheckpointStore.STATE_KEY] = self.checkpoints.to_state()
+
+        if self.change_index is not None:
+            self.state[ChangeIndex.STATE_KEY] = self.change_index.to_state()
+
+        latency_ms = self.telemetry.average_latency_ms() if self.telemetry is not None else None
+        if latency_ms is not None:
+            self.state[LATENCY_STATE_KEY] = {
+                **self.state.get(LATENCY_STATE_KEY, {}),
+                self.cfg.execution_engine: round(latency_ms, 1),
+            }
+
+        self.write_state_file(self.state)
+
+    @sync_action("dryRun")
+    def dry_run(self) -> ValidationResult:
+        """Validate the configuration and all input tables and estimate the load of writing them, without writing
+        any data. Sync actions receive no input tables, the sync action validates the connection, the endpoints
+        and alternate keys of the configuration only."""
+
+        self._init_configuration()
+
+        if not self.in_tables and self.configuration.action != "run":
+            return self.validate_configuration()
+
+        self.check_input_tables()
+
+        self.state = self.get_state_file() or {}
+        self.telemetry = Telemetry(self.cfg.progress_interval_seconds)
+
+        if self.cfg.skip_unchanged:
+            self.change_index = ChangeIndex(self.state, self.cfg.organization_url, self.cfg.change_index_max_entries)
+
         self.init_client()
         self._client.get_entity_metadata()
 
         self.check_input_endpoints()
+        self.check_alternate_keys()
+
+        estimate = self.estimate_load()
+        report = estimate.to_markdown()
+        logging.info(f"Dry run finished, no data was written.\n{report}")
+
+        return ValidationResult(report, MessageType.WARNING if estimate.invalid_rows else MessageType.SUCCESS)
 
-        self.check_input_attributes()
+    def validate_configuration(self) -> ValidationResult:
+        """Validate the connection to the API and the configured alternate keys, without any input tables."""
+
+        self.state = self.get_state_file() or {}
+        self.init_client()
+        self._client.get_entity_metadata()
+        self.check_alternate_keys()
+
+        return ValidationResult(
+            "The configuration is valid. Input tables are not available in the sync action, run the configuration"
+            " with `dry_run` enabled to validate their rows and estimate the load.",
+            MessageType.SUCCESS,
+        )
+
+    def estimate_load(self) -> LoadEstimate:
+        """Validate all rows of the input tables and count the rows and requests needed to write them."""
+
+        endpoints = []
+        errors = []
 
         for table in self.in_tables:
             endpoint = self._entity_set_name(table)
+            endpoint_estimate = EndpointEstimate(endpoint)
 
-            logging.info(f"Writing data to {endpoint}.")
-            error_counter = 0
-
-            with open(table.full_path) as inTable:
-                table_reader = csv.DictReader(inTable)
-
-                for row in table_reader:
-                    record_id = row["id"].strip()
-                    record_data = None
-
-                    if record_id == "" and self.cfg.operation != "create_and_update":
-                        if self.cfg.continue_on_error is False:
-                            raise UserException(
-                                "For upsert and delete operations, all records must have valid IDs provided."
-                            )
-
-                        self.writer.writerow(
-                            {
-                                **row,
-                                **{
-                                    "operation_status": "MISSING_ID_ERROR",
-                                    "operation_response": "For upsert and delete operations, an ID must to be provided"
-                                    + " for all records.",
-                                },
-                            },
-                            endpoint,
-                            self.cfg.operation,
-                        )
-                        error_counter += 1
-                        continue
-
-                    if self.cfg.operation == "create_and_update":
-                        if record_id == "":
-                            record_operation = "create"
-                        else:
-                            record_operation = "update"
+            for unit in self.group_records(self.iter_records(table, validate_attributes=True)):
+                for record in unit:
+                    if record.skipped:
+                        endpoint_estimate.skipped_rows += 1
 
-                    else:
-                        record_operation = self.cfg.operation
-
-                    if record_operation != "delete":
-                        record_data = self.parse_json_from_string(row["data"])
-
-                        if record_data is None:
-                            if self.cfg.continue_on_error is False:
-                                raise UserException(
-                                    "".join(
-                                        [
-                                            f"Invalid data provided. {row['data']} is not a valid",
-                                            " JSON or Python Dictionary representation.",
-                                        ]
-                                    )
-                                )
-
-                            else:
-                                self.writer.writerow(
-                                    {
-                                        **row,
-                                        **{
-                                            "operation_status": "DATA_ERROR",
-                                            "operation_message": "Data provided is not a valid JSON or Python Dict object.",
-                                        },
-                                    },
-                                    endpoint,
-                                    record_operation,
-                                )
-
-                                error_counter += 1
-                                continue
-
-                    req_record = self.make_request(record_operation, endpoint, record_id, record_data)
-
-                    success, request_id, request_status_dict = self.parse_response(record_operation, req_record)
-
-                    if success is False and self.cfg.continue_on_error is False:
-                        raise UserException(
-                            f"There was an error during {record_operation} operation"
-                            f"on {endpoint} endpoint. Received: {request_status_dict}."
-                        )
+                    elif record.status is not None:
+                        endpoint_estimate.invalid_rows += 1
+                        if len(errors) < MAX_REPORTED_ERRORS:
+                            errors += [
+                                f"In {table.name} on the line {record.row_number}:"
+                                f" {record.status['operation_response']}"
+                            ]
 
                     else:
-                        error_counter += int(not success)
-                        self.writer.writerow({**row, **request_status_dict}, endpoint, record_operation, request_id)
-
-            if error_counter != 0:
-                logging.warning(
-                    "".join(
-                        [
-                            f"There were {error_counter} errors during {self.cfg.operation} operation on",
-                            f" {endpoint} endpoint.",
-                        ]
+                        endpoint_estimate.rows[record.operation] += 1
+
+                endpoint_estimate.requests += self.count_unit_requests(endpoint, unit)
+
+            endpoints += [endpoint_estimate]
+
+        latency_ms, latency_source = self.get_expected_latency()
+        return LoadEstimate(
+            self.cfg.execution_engine, self.cfg.concurrency, latency_ms, latency_source, endpoints, errors
+        )
+
+    def count_unit_requests(self, endpoint, unit) -> int:
+        """Return the number of requests needed to send a unit, if none of them is retried."""
+
+        operations = Counter(record.operation for record in unit if record.status is None)
+
+        if not operations:
+            return 0
+
+        if self.cfg.execution_engine == ExecutionEngine.batch:
+            return 1
+
+        if self.cfg.execution_engine == ExecutionEngine.bulk:
+            return sum(1 if self.supports_bulk(endpoint, op) else count for op, count in operations.items())
+
+        return operations.total()
+
+    def get_expected_latency(self) -> tuple[float, str]:
+        """Return the expected latency of a request and its source: the average latency of the execution engine
+        measured in previous runs, the latency of metadata requests of this run, or a default."""
+
+        previous_ms = self.state.get(LATENCY_STATE_KEY, {}).get(self.cfg.execution_engine)
+        if previous_ms:
+            return previous_ms, "measured in previous runs"
+
+        metadata_ms = self.telemetry.average_latency_ms(metadata=True) if self.telemetry is not None else None
+        if metadata_ms:
+            return metadata_ms, "measured on metadata requests"
+
+        return DEFAULT_LATENCY_MS, "default"
+
+    def save_checkpoint(self) -> None:
+        """Persist progress of writing. Results are flushed first, so they are never behind the checkpoint."""
+
+        self.writer.flush()
+        self.save_state()
+
+    def write_tables(self) -> None:
+        """Write all input tables, up to ``table_concurrency`` of them at once, respecting dependencies between
+        their endpoints. Requests of all tables share the limit of concurrent requests of the client."""
+
+        self.endpoint_limits = {
+            settings.endpoint.lower(): threading.BoundedSemaphore(settings.max_concurrency)
+            for settings in self.cfg.endpoint_settings
+            if settings.max_concurrency > 0
+        }
+        dependencies = {settings.endpoint: settings.depends_on for settings in self.cfg.endpoint_settings}
+        scheduler = TableScheduler(self.cfg.table_concurrency, dependencies)
+
+        scheduler.run([(self._entity_set_name(table), partial(self.write_table, table)) for table in self.in_tables])
+
+    @staticmethod
+    def checkpoint_rows(rows_done: int, retry_queue: RetryQueue | None) -> int:
+        """Return the number of rows, which can be recorded as written in a checkpoint. Deferred rows and rows after
+        them are not, as the results of deferred rows are written only after they are retried."""
+
+        if retry_queue is None or retry_queue.first_row_number is None:
+            return rows_done
+
+        return min(rows_done, retry_queue.first_row_number - 1)
+
+    def retry_records(self, endpoint, retry_queue: RetryQueue | None) -> int:
+        """Send records deferred due to transient errors again, in up to ``retry_passes`` passes with at most
+        ``retry_concurrency`` concurrent requests. Records failing in the last pass are recorded as failed.
+        Returns the number of failed records."""
+
+        error_counter = 0
+        concurrency = min(self.cfg.retry_concurrency, self.get_endpoint_concurrency(endpoint))
+
+        for retry_pass in range(1, self.cfg.retry_passes + 1):
+            if retry_queue is None or len(retry_queue) == 0:
+                break
+
+            records = retry_queue.drain()
+            logging.info(
+                f"Retrying {len(records)} records of {endpoint}, which failed with transient errors,"
+                f" in {self.cfg.retry_delay_seconds} s (pass {retry_pass}/{self.cfg.retry_passes})."
+            )
+            time.sleep(self.cfg.retry_delay_seconds)
+
+            # records failing in the last pass are not deferred again
+            next_queue = retry_queue if retry_pass < self.cfg.retry_passes else None
+
+            with OrderedExecutor(concurrency) as executor:
+                for unit, responses in executor.map(partial(self.execute_unit, endpoint), self.group_records(records)):
+                    unit_errors = self.process_unit(endpoint, unit, responses, next_queue)
+                    error_counter += unit_errors
+
+                    if self.telemetry is not None:
+                        # the rows were counted in the first pass, only their final failures are added
+                        self.telemetry.record_rows(endpoint, self.unit_operation(unit), 0, unit_errors)
+
+        return error_counter
+
+    def get_endpoint_concurrency(self, endpoint: str) -> int:
+
+        for settings in self.cfg.endpoint_settings:
+            if settings.endpoint.lower() == endpoint.lower() and settings.max_concurrency > 0:
+                return min(settings.max_concurrency, self.cfg.concurrency)
+
+        return self.cfg.concurrency
+
+    def write_table(self, table) -> int:
+        """Write all records of an input table to its endpoint. Returns the number of failed records."""
+
+        endpoint = self._entity_set_name(table)
+
+        logging.info(f"Writing data to {endpoint}.")
+        error_counter = 0
+        skipped_counter = 0
+
+        checkpoint_key = f"{endpoint}|{Path(table.full_path).name}"
+        fingerprint = table_fingerprint(table) if self.checkpoints is not None else ""
+        rows_done = 0
+
+        if self.checkpoints is not None and self.cfg.resume_from_checkpoint:
+            rows_done = self.checkpoints.get(checkpoint_key, fingerprint)
+            if rows_done > 0:
+                logging.info(f"Resuming writing to {endpoint} from a checkpoint, skipping {rows_done} rows.")
+
+        max_in_flight_bytes = self.cfg.max_in_flight_mb * 1024 * 1024
+        retry_queue = RetryQueue() if self.cfg.retry_passes > 0 else None
+
+        with OrderedExecutor(
+            self.get_endpoint_concurrency(endpoint), max_in_flight_bytes=max_in_flight_bytes
+        ) as executor:
+            records = self.iter_records(
+                table,
+                validate_attributes=not self.cfg.validate_before_write,
+                raise_on_invalid=not self.cfg.continue_on_error,
+                skip_rows=rows_done,
+            )
+            units = self.group_records(records)
+
+            for unit, responses in executor.map(partial(self.execute_unit, endpoint), units, size=self.unit_size):
+                unit_errors = self.process_unit(endpoint, unit, responses, retry_queue)
+                unit_skipped = sum(record.skipped for record in unit)
+                error_counter += unit_errors
+                skipped_counter += unit_skipped
+
+                if self.telemetry is not None:
+                    self.telemetry.record_rows(
+                        endpoint, self.unit_operation(unit), len(unit), unit_errors, unit_skipped
                     )
+                    self.telemetry.log_progress()
+                rows_done += len(unit)
+
+                if self.checkpoints is not None:
+                    self.checkpoints.update(checkpoint_key, fingerprint, self.checkpoint_rows(rows_done, retry_queue))
+
+        error_counter += self.retry_records(endpoint, retry_queue)
+
+        if self.checkpoints is not None:
+            self.checkpoints.complete(checkpoint_key)
+
+        if skipped_counter != 0:
+            logging.info(f"Skipped {skipped_counter} unchanged or coalesced records of {endpoint} endpoint.")
+
+        if error_counter != 0:
+            logging.warning(
+                "".join(
+                    [
+                        f"There were {error_counter} errors during {self.cfg.operation} operation on",
+                        f" {endpoint} endpoint.",
+                    ]
+                )
+            )
+
+        return error_counter
+
+    def iter_records(
+        self,
+        table,
+        validate_attributes: bool = False,
+        raise_on_invalid: bool = False,
+        skip_rows: int = 0,
+        prepare_payloads: bool = True,
+    ):
+        """Read an input table in a single pass and yield a record for each of its rows.
+
+        The payload of a row, i.e. the parsed ``data`` column or the mapped columns in the ``columns`` input mode,
+        is built only once and kept in the record. Rows, which fail
+        validation, are yielded with a pre-filled error status, so their results stay in order with the rest
+        of the records, or raise an exception if ``raise_on_invalid`` is set. The first ``skip_rows`` rows
+        are skipped without being parsed.
+
+        If ``coalesce_records`` is enabled, the table is read once more beforehand, see ``coalesce_record``. Skipped
+        rows are then parsed too, as their payloads may be merged into rows, which were not written yet. Lookups
+        by natural keys are resolved in chunks of records, see ``resolve_lookups``, and so are payloads reduced
+        to changed attributes, see ``minimize_payloads``. Both read records from the API, so they are skipped,
+        if ``prepare_payloads`` is not set, e.g. when rows are only validated before they are written.
+        """
+
+        endpoint = self._entity_set_name(table)
+        records = self.iter_table_records(table, validate_attributes, skip_rows)
+
+        if prepare_payloads:
+            records = self.resolve_lookups(endpoint, records)
+
+        if prepare_payloads and (self.cfg.send_changed_attributes or self.change_index is not None):
+            records = self.mark_repeated_records(endpoint, records)
+
+        records = self.check_records(table, endpoint, records, raise_on_invalid)
+
+        if prepare_payloads and self.cfg.send_changed_attributes:
+            records = self.minimize_payloads(endpoint, records)
+
+        yield from records
+
+    def check_records(self, table, endpoint, records, raise_on_invalid: bool = False):
+
+        for record in records:
+            if record.status is not None and not record.skipped and raise_on_invalid:
+                raise UserException(
+                    f"In {table.name} on the line {record.row_number}: {record.status['operation_response']}"
+                )
+
+            if record.status is None and self.is_unchanged(endpoint, record):
+                record.skipped = True
+                record.status = {
+                    "operation_status": "SKIPPED - UNCHANGED",
+                    "operation_response": "Data did not change since the last successful write.",
+                }
+
+            yield record
+
+    def mark_repeated_records(self, endpoint, records):
+        """Mark records, whose record was already sent earlier in the run. Their earlier rows may not be written yet,
+        when later rows are prepared, so neither the current values of the records read from the API, nor their
+        entries in the change index may be up to date."""
+
+        if self.sent_records is None:
+            self.sent_records = RecordIdSet()
+
+        for record in records:
+            if record.status is None and record.record_id:
+                record.repeated = self.sent_records.add(endpoint, record.record_id)
+
+            yield record
+
+    def minimize_payloads(self, endpoint, records):
+        """Reduce payloads of updated and upserted records to attributes, whose values differ from the current
+        values of the records. Current values of records are read in chunks of records, for the attributes set
+        by the chunk. Records, which match their current values, are skipped. Records addressed by alternate keys,
+        records sent earlier in the run and records, whose current values could not be read, are sent in full."""
+
+        chunk = []
+
+        for record in records:
+            chunk += [record]
+
+            if len(chunk) >= DIFF_CHUNK_ROWS:
+                yield from self.minimize_chunk_payloads(endpoint, chunk)
+                chunk = []
+
+        yield from self.minimize_chunk_payloads(endpoint, chunk)
+
+    def minimize_chunk_payloads(self, endpoint, records) -> list:
+
+        compared = [
+            record
+            for record in records
+            if record.status is None
+            and record.data
+            and not record.repeated
+            and record.operation in ("update", "upsert")
+            and is_record_id(record.record_id)
+        ]
+        attributes = sorted({attribute for record in compared for attribute in get_compared_attributes(record.data)})
+
+        if not compared or not attributes:
+            return records
+
+        entity_name = self._client.supported_endpoints[endpoint.lower()]
+        id_attribute = self._client.get_primary_id_attribute(entity_name)
+        current_records = {}
+
+        try:
+            for start in range(0, len(compared), IN_FILTER_VALUES):
+                record_ids = [record.record_id for record in compared[start : start + IN_FILTER_VALUES]]
+                current_records.update(self._client.get_records(endpoint, id_attribute, record_ids, attributes))
+
+        except requests.RequestException as e:
+            logging.warning(f"Could not read current values of {endpoint} records, sending full payloads: {e}")
+            return records
+
+        for record in compared:
+            current = current_records.get(record.record_id.lower())
+            if current is None:
+                continue
+
+            changed_data = get_changed_data(record.data, current)
+
+            if not changed_data:
+                record.skipped = True
+                record.status = {
+                    "operation_status": "SKIPPED - UNCHANGED",
+                    "operation_response": "Data matches the current values of the record.",
+                }
+
+            elif len(changed_data) < len(record.data):
+                if self.change_index is not None:
+                    record.data_hash = ChangeIndex.data_hash(record.data)
+                record.data = changed_data
+                record.size = len(dump_payload(changed_data))
+
+        return records
+
+    def iter_table_records(self, table, validate_attributes: bool = False, skip_rows: int = 0):
+
+        endpoint = self._entity_set_name(table)
+        alternate_key = self.get_alternate_key(endpoint)
+        column_mapping = self.get_column_mapping(table, alternate_key)
+        validator = self.get_attribute_validator(endpoint) if validate_attributes else None
+        coalescer = None
+
+        if self.cfg.coalesce_records:
+            coalescer = self.index_records(table, alternate_key, column_mapping, validator)
+
+        for row_number, row in enumerate(iter_table_rows(table, self.cfg.slice_readers), start=1):
+            if row_number <= skip_rows and coalescer is None:
+                continue
+
+            record = self.build_record(row, row_number, alternate_key, column_mapping, validator)
+
+            if coalescer is not None:
+                self.coalesce_record(record, coalescer)
+
+            if row_number > skip_rows:
+                yield record
+
+    def resolve_lookups(self, endpoint, records):
+        """Resolve lookups by natural keys, e.g. ``parentaccountid@key: accountnumber=A-1``, to ``@odata.bind``
+        references in payloads of records. Records are processed in chunks, so the keys referenced by a chunk are
+        looked up together. Records with a lookup, which cannot be resolved, are marked with ``LOOKUP_ERROR``."""
+
+        chunk = []
+
+        for record in records:
+            chunk += [record]
+
+            if len(chunk) >= LOOKUP_CHUNK_ROWS:
+                yield from self.resolve_chunk_lookups(endpoint, chunk)
+                chunk = []
+
+        yield from self.resolve_chunk_lookups(endpoint, chunk)
+
+    def resolve_chunk_lookups(self, endpoint, records) -> list:
+
+        lookups_by_record = []
+        values_by_target = {}
+
+        for record in records:
+            if record.status is not None or not record.data:
+                continue
+
+            lookup_keys = [key for key in record.data if key.endswith(KEY_SUFFIX)]
+            if not lookup_keys:
+                continue
+
+            try:
+                lookups = [self.parse_lookup(endpoint, key, record.data[key]) for key in lookup_keys]
+            except LookupKeyError as e:
+                record.status = {"operation_status": "LOOKUP_ERROR", "operation_response": str(e)}
+                continue
+
+            for _, _, target, value in lookups:
+                values_by_target.setdefault(target, set()).add(value)
+
+            lookups_by_record += [(record, lookups)]
+
+        if not lookups_by_record:
+            return records
+
+        resolved = {}
+        for target, values in values_by_target.items():
+            try:
+                resolved[target] = self.get_lookup_resolver().resolve(*target, values)
+            except requests.RequestException as e:
+                resolved[target] = f"Could not look up {target[0]} by {target[2]}: {e}"
+
+        for record, lookups in lookups_by_record:
+            errors = []
+
+            for key, navigation_property, target, value in lookups:
+                entity_set, _, attribute = target
+                record_id = resolved[target] if isinstance(resolved[target], str) else resolved[target][value]
+
+                if isinstance(resolved[target], str):
+                    errors += [record_id]
+                elif record_id == NOT_FOUND:
+                    errors += [f"No {entity_set} record with {attribute} '{value}' exists."]
+                elif record_id == AMBIGUOUS:
+                    errors += [f"Multiple {entity_set} records with {attribute} '{value}' exist."]
+                else:
+                    del record.data[key]
+                    record.data[f"{navigation_property}@odata.bind"] = f"/{entity_set}({record_id})"
+
+            if errors:
+                record.status = {"operation_status": "LOOKUP_ERROR", "operation_response": " ".join(errors)}
+
+        return records
+
+    def get_lookup_resolver(self) -> LookupResolver:
+        """Return the resolver of lookups by natural keys, shared by all tables of the run."""
+
+        if self.lookup_resolver is None:
+            self.lookup_resolver = LookupResolver(
+                self._client.find_records, self.cfg.lookup_cache_max_entries, self.cfg.lookup_prefetch
+            )
+
+        return self.lookup_resolver
+
+    def parse_lookup(self, endpoint, key, value) -> tuple:
+        """Return the key, navigation property, ``(entity set, ID attribute, attribute)`` of the referenced records
+        and the value of a lookup by a natural key."""
+
+        navigation_property = key.removesuffix(KEY_SUFFIX)
+        attribute, key_value = parse_lookup_key(value)
+        entity_set, id_attribute = self.get_lookup_resolver().get_target(
+            endpoint, navigation_property, self.find_lookup_target
+        )
+
+        return key, navigation_property, (entity_set, id_attribute, attribute), key_value
+
+    def find_lookup_target(self, endpoint, navigation_property) -> tuple[str, str]:
+        """Return the entity set and ID attribute of records referenced by a navigation property of an endpoint."""
+
+        entity_name = self._client.supported_endpoints[endpoint.lower()]
+        referenced_entity = self._client.get_navigation_targets(entity_name).get(navigation_property)
+
+        if referenced_entity is None:
+            raise LookupKeyError(f"{navigation_property} is not a lookup of {endpoint}.")
+
+        entity_sets = [
+            name for name, logical in self._client.supported_endpoints.items() if logical == referenced_entity
+        ]
+        if not entity_sets:
+            raise LookupKeyError(f"Entity {referenced_entity} referenced by {navigation_property} is not available.")
+
+        return entity_sets[0], self._client.get_primary_id_attribute(referenced_entity)
+
+    def build_record(
+        self,
+        row,
+        row_number,
+        alternate_key: AlternateKeySpec | None = None,
+        column_mapping: ColumnMapping | None = None,
+        validator: AttributeValidator | None = None,
+    ) -> WriteRecord:
+        """Prepare the record of a row and validate its payload, if a validator is given."""
+
+        record = self.prepare_record(row, row_number, alternate_key, column_mapping)
+
+        if validator is not None and record.status is None and record.data is not None:
+            validation_error = validator.validate(record.data)
+
+            if validation_error is not None:
+                record.status = {"operation_status": "ATTRIBUTE_ERROR", "operation_response": validation_error}
+
+        return record
+
+    def index_records(
+        self,
+        table,
+        alternate_key: AlternateKeySpec | None = None,
+        column_mapping: ColumnMapping | None = None,
+        validator: AttributeValidator | None = None,
+    ) -> RecordCoalescer:
+        """Read a table and register the lines of valid rows of each record in a coalescer."""
+
+        coalescer = RecordCoalescer()
+
+        for row_number, row in enumerate(iter_table_rows(table, self.cfg.slice_readers), start=1):
+            record = self.build_record(row, row_number, alternate_key, column_mapping, validator)
+
+            if record.status is None and record.record_id != "":
+                coalescer.add(record.record_id, row_number)
+
+        if coalescer.duplicates:
+            logging.info(f"Coalescing {coalescer.duplicates} rows of {table.name} into rows of the same records.")
+
+        return coalescer
+
+    @staticmethod
+    def coalesce_record(record: WriteRecord, coalescer: RecordCoalescer) -> None:
+        """Merge the payload of a record into the last row of the same record, or the payloads of previous rows into
+        the record, if it is the last one. Merged rows are not sent and are recorded with status ``COALESCED``."""
+
+        if record.status is not None or record.record_id == "":
+            return
+
+        merged_into, data = coalescer.coalesce(record.record_id, record.row_number, record.data)
+
+        if merged_into is None:
+            record.data = data
+            return
+
+        record.skipped = True
+        record.status = {
+            "operation_status": "COALESCED",
+            "operation_response": f"Merged into the row on the line {merged_into}, which writes the same record.",
+        }
+
+    def is_unchanged(self, endpoint, record) -> bool:
+        """Return True, if the record was already written with the same data in a previous run. Records repeated
+        in the run are never unchanged, as their earlier rows may be written after the change index was checked."""
+
+        if self.change_index is None or record.data is None or record.operation not in ("upsert", "update"):
+            return False
+
+        if record.repeated:
+            return False
+
+        return self.change_index.is_unchanged(endpoint, record.record_id, record.data)
+
+    def update_change_index(self, endpoint, record) -> None:
+        """Record a successfully written record in the change index."""
+
+        if self.change_index is None or record.record_id == "":
+            return
+
+        if record.operation == "delete":
+            self.change_index.remove(endpoint, record.record_id)
+
+        elif record.operation in ("upsert", "update"):
+            self.change_index.add(endpoint, record.record_id, record.data, record.data_hash)
+
+    def prepare_record(
+        self,
+        row,
+        row_number,
+        alternate_key: AlternateKeySpec | None = None,
+        column_mapping: ColumnMapping | None = None,
+    ) -> WriteRecord:
+
+        if alternate_key is not None:
+            return self.prepare_keyed_record(row, row_number, alternate_key, column_mapping)
+
+        record_id = row["id"].strip()
+
+        if record_id == "" and self.cfg.operation != "create_and_update":
+            return self.new_record(
+                row,
+                self.cfg.operation,
+                record_id,
+                row_number,
+                status={
+                    "operation_status": "MISSING_ID_ERROR",
+                    "operation_response": "For upsert and delete operations, an ID must to be provided"
+                    + " for all records.",
+                },
+            )
+
+        if self.cfg.operation == "create_and_update":
+            if record_id == "":
+                record_operation = "create"
+            else:
+                record_operation = "update"
+
+        else:
+            record_operation = self.cfg.operation
+
+        record = self.new_record(row, record_operation, record_id, row_number)
+
+        if record_operation == "delete":
+            return record
+
+        return self.parse_record_data(record, row, column_mapping)
+
+    def new_record(self, row, operation, record_id, row_number, status: dict | None = None) -> WriteRecord:
+        """Create the record of a row, keeping only the columns written to the output table."""
+
+        return WriteRecord(
+            operation,
+            record_id,
+            row_number=row_number,
+            status=status,
+            row_id=row.get("id"),
+            row_data=row.get("data"),
+            size=self.record_size(row) if status is None else 0,
+        )
+
+    def parse_record_data(
+        self, record: WriteRecord, row: dict, column_mapping: ColumnMapping | None = None
+    ) -> WriteRecord:
+        """Parse the ``data`` column of a record, or set an error status, if it is not a valid dictionary.
+        If a column mapping is given, the payload is built from the mapped columns of the row instead."""
+
+        if column_mapping is not None:
+            return self.map_record_data(record, row, column_mapping)
+
+        record_data = parse_payload(record.row_data or "")
+
+        if not isinstance(record_data, dict):
+            record.status = {
+                "operation_status": "DATA_ERROR",
+                "operation_response": f"Invalid data provided. {record.row_data} is not a valid"
+                + " JSON or Python Dictionary representation.",
+            }
+            return record
+
+        record.data = record_data
+        return record
+
+    @staticmethod
+    def map_record_data(record: WriteRecord, row: dict, column_mapping: ColumnMapping) -> WriteRecord:
+        """Build the payload of a record from the mapped columns of a row. The payload, or the values of the mapped
+        columns if they cannot be converted, is kept as the ``data`` of the record in the results table."""
+
+        try:
+            record.data = column_mapping.to_payload(row)
+        except ValueError as e:
+            record.status = {"operation_status": "DATA_ERROR", "operation_response": f"Invalid data provided. {e}"}
+            record.row_data = dump_payload(column_mapping.row_values(row)).decode()
+            return record
+
+        record.row_data = dump_payload(record.data).decode()
+        return record
+
+    def prepare_keyed_record(
+        self, row, row_number, alternate_key: AlternateKeySpec, column_mapping: ColumnMapping | None = None
+    ) -> WriteRecord:
+        """Prepare a record addressed by an alternate key. Records are upserted, unless they are deleted, as the API
+        creates or updates the record with the key itself."""
+
+        record_operation = "delete" if self.cfg.operation == "delete" else "upsert"
+        key_segment = alternate_key.segment(row)
+
+        if key_segment is None:
+            return self.new_record(
+                row,
+                record_operation,
+                "",
+                row_number,
+                status={
+                    "operation_status": "MISSING_ID_ERROR",
+                    "operation_response": f"Values of alternate key columns {alternate_key.columns} must be"
+                    + " provided for all records.",
+                },
+            )
+
+        if not row.get("id"):
+            row["id"] = key_segment
+
+        record = self.new_record(row, record_operation, key_segment, row_number)
+
+        if record_operation == "delete":
+            return record
+
+        return self.parse_record_data(record, row, column_mapping)
+
+    def get_column_mapping(self, table, alternate_key: AlternateKeySpec | None = None) -> ColumnMapping | None:
+        """Compile the mapping of columns of a table to attributes of its entity in the ``columns`` input mode."""
+
+        if self.cfg.input_mode != InputMode.columns or self.cfg.operation == "delete":
+            return None
+
+        endpoint = self._entity_set_name(table)
+        entity_name = self._client.supported_endpoints[endpoint.lower()]
+        attribute_types = {
+            attribute["LogicalName"]: attribute["AttributeType"]
+            for attribute in self._client.get_endpoint_attribute_metadata(entity_name)
+        }
+        excluded_columns = {"id", *(alternate_key.columns if alternate_key is not None else [])}
+
+        column_mapping = ColumnMapping(
+            get_table_columns(table), attribute_types, excluded_columns, self.cfg.empty_values_as_null
+        )
+
+        if column_mapping.lookup_columns:
+            raise UserException(
+                f"Columns {column_mapping.lookup_columns} of table {table.name} are lookups. Lookups must be set"
+                " using columns named <navigation property>@odata.bind, e.g. parentaccountid@odata.bind."
+            )
+
+        return column_mapping
+
+    def get_alternate_key(self, endpoint: str) -> AlternateKeySpec | None:
+
+        if self.alternate_keys is not None:
+            return self.alternate_keys.get(endpoint.lower())
+
+        key = self.get_configured_key_columns(endpoint)
+        return AlternateKeySpec(key) if key else None
+
+    def get_configured_key_columns(self, endpoint: str) -> list[str]:
+
+        for alternate_key in self.cfg.alternate_keys:
+            if alternate_key.endpoint.lower() == endpoint.lower():
+                return alternate_key.columns
+
+        return []
+
+    def check_alternate_keys(self) -> None:
+        """Validate configured alternate keys against the keys defined for the entities and resolve types
+        of their attributes."""
+
+        self.alternate_keys = {}
+
+        for configured_key in self.cfg.alternate_keys:
+            endpoint = configured_key.endpoint.lower()
+            entity_name = self._client.supported_endpoints.get(endpoint)
+
+            if entity_name is None:
+                raise UserException(f"Alternate key is configured for an unsupported endpoint {endpoint}.")
+
+            entity_keys = self._client.get_entity_keys(entity_name)
+            entity_key = find_entity_key(entity_keys, configured_key.columns)
+
+            if entity_key is None:
+                available = [key["KeyAttributes"] for key in entity_keys]
+                raise UserException(
+                    f"Columns {configured_key.columns} do not form an alternate key of {endpoint}."
+                    f" Available alternate keys: {available}."
                 )
 
+            if entity_key.get("EntityKeyIndexStatus") not in (None, "Active"):
+                raise UserException(
+                    f"Alternate key {entity_key['LogicalName']} of {endpoint} cannot be used, its index status is"
+                    f" {entity_key['EntityKeyIndexStatus']}."
+                )
+
+            attribute_types = {
+                attribute["LogicalName"]: attribute["AttributeType"]
+                for attribute in self._client.get_endpoint_attribute_metadata(entity_name)
+            }
+            self.alternate_keys[endpoint] = AlternateKeySpec(
+                configured_key.columns, {column: attribute_types.get(column) for column in configured_key.columns}
+            )
+
+    def group_records(self, records):
+        """Group records into units of work, each of which is sent to the API in a single request.
+
+        Units of the bulk engine are also limited by the total size of the data of their records.
+        """
+
+        grouped = self.cfg.execution_engine in (ExecutionEngine.batch, ExecutionEngine.bulk)
+        unit_size = self.cfg.batch_size if grouped else 1
+        max_unit_bytes = self.cfg.bulk_max_payload_kb * 1024 if self.cfg.execution_engine == ExecutionEngine.bulk else 0
+        unit = []
+        unit_requests = 0
+        unit_bytes = 0
+
+        for record in records:
+            record_bytes = record.size if record.status is None else 0
+
+            if max_unit_bytes and unit_requests and unit_bytes + record_bytes > max_unit_bytes:
+                yield unit
+                unit = []
+                unit_requests = 0
+                unit_bytes = 0
+
+            unit += [record]
+            unit_requests += int(record.status is None)
+            unit_bytes += record_bytes
+
+            if unit_requests >= unit_size:
+                yield unit
+                unit = []
+                unit_requests = 0
+                unit_bytes = 0
+
+        if unit:
+            yield unit
+
+    def record_size(self, row: dict) -> int:
+        """Return the approximate size of the payload of a row in bytes."""
+
+        if self.cfg.input_mode == InputMode.columns:
+            return sum(len(value or "") for value in row.values())
+
+        return len(row.get("data") or "")
+
+    @staticmethod
+    def unit_size(unit) -> int:
+        """Return the approximate size of the payloads of a unit in bytes, which bounds the units in flight."""
+
+        return sum(record.size for record in unit)
+
     def _init_configuration(self) -> None:
         try:
             self.validate_configuration_parameters(Configuration.get_dataclass_required_parameters())
@@ -143,6 +1027,35 @@ class Component(ComponentBase):
             raise UserException(f"{e} The configuration is invalid. Please check that you added a configuration row.")
         self.cfg: Configuration = Configuration.fromDict(parameters=self.configuration.parameters)
 
+        if self.cfg.execution_engine in (ExecutionEngine.batch, ExecutionEngine.bulk) and not (
+            1 <= self.cfg.batch_size <= BATCH_MAX_OPERATIONS
+        ):
+            raise UserException(f"Batch size must be between 1 and {BATCH_MAX_OPERATIONS} operations.")
+
+        if self.cfg.concurrency < 1:
+            raise UserException("Concurrency must be at least 1.")
+
+        if self.cfg.skip_unchanged and self.cfg.change_index_max_entries < 1:
+            raise UserException("Change index size must be at least 1.")
+
+        if self.cfg.table_concurrency < 1:
+            raise UserException("Table concurrency must be at least 1.")
+
+        if self.cfg.http2 and self.cfg.http_transport != HttpTransport.httpx:
+            raise UserException("HTTP/2 is supported only by the httpx transport.")
+
+        if self.cfg.connect_timeout_seconds < 1 or self.cfg.read_timeout_seconds < 1:
+            raise UserException("Connect and read timeouts must be at least 1 second.")
+
+        if self.cfg.retry_passes < 0 or self.cfg.retry_concurrency < 1 or self.cfg.retry_delay_seconds < 0:
+            raise UserException("Retry passes and delay must not be negative and retry concurrency must be at least 1.")
+
+        cycle = find_dependency_cycle(
+            {settings.endpoint: settings.depends_on for settings in self.cfg.endpoint_settings}
+        )
+        if cycle is not None:
+            raise UserException(f"Dependencies between endpoints form a cycle: {' -> '.join(cycle)}.")
+
     def init_client(self):
         organization_url = self.configuration.parameters.get("organization_url")
         if not organization_url:
@@ -153,10 +1066,35 @@ class Component(ComponentBase):
         if not credentials:
             raise UserException("The configuration is not authorized. Please authorize it first.")
 
-        refresh_token = credentials.data["refresh_token"]
+        self._source_refresh_token = credentials.data["refresh_token"]
+        refresh_token = TokenManager.restore_refresh_token(self.state, self._source_refresh_token)
+
+        metadata_cache = None
+        if self.cfg.metadata_cache_ttl_hours > 0:
+            metadata_cache = MetadataCache(
+                self.state,
+                organization_url,
+                self.cfg.api_version,
+                self.cfg.metadata_cache_ttl_hours,
+                force_refresh=self.cfg.refresh_metadata_cache,
+            )
 
         self._client = DynamicsClient(
-            credentials.appKey, credentials.appSecret, organization_url, refresh_token, self.cfg.api_version
+            credentials.appKey,
+            credentials.appSecret,
+            organization_url,
+            refresh_token,
+            self.cfg.api_version,
+            pool_size=self.cfg.pool_size or max(self.cfg.concurrency, DynamicsClient.POOL_SIZE),
+            max_concurrency=self.cfg.concurrency,
+            metadata_cache=metadata_cache,
+            fallback_refresh_token=self._source_refresh_token,
+            telemetry=self.telemetry,
+            transport=self.cfg.http_transport,
+            http2=self.cfg.http2,
+            keepalive_expiry=self.cfg.keepalive_expiry_seconds,
+            timeout=(self.cfg.connect_timeout_seconds, self.cfg.read_timeout_seconds),
+            compress_min_bytes=self.cfg.compress_requests_kb * 1024,
         )
 
     def check_input_tables(self):
@@ -167,23 +1105,27 @@ class Component(ComponentBase):
         if self.cfg.operation == "delete":
             _mandFields = MANDATORYFIELDS_DELETE
 
+        elif self.cfg.input_mode == InputMode.columns:
+            _mandFields = MANDATORYFIELDS_DELETE
+
         else:
             _mandFields = MANDATORYFIELDS_UPSERT
 
-        mand_fields_set = set(_mandFields)
         tables_with_missing_fields = []
 
         for table in self.in_tables:
-            with open(table.full_path) as in_table:
-                _rdr = csv.DictReader(in_table)
-                _table_cols = set(_rdr.fieldnames if _rdr.fieldnames is not None else [])
-                col_diff = list(mand_fields_set - _table_cols)
+            # tables with an alternate key are addressed by the key columns instead of the id column
+            key_columns = self.get_configured_key_columns(self._entity_set_name(table))
+            mand_fields_set = set(_mandFields) - {"id"} | set(key_columns) if key_columns else set(_mandFields)
+
+            _table_cols = set(get_table_columns(table))
+            col_diff = list(mand_fields_set - _table_cols)
 
-                if len(col_diff) != 0:
-                    tables_with_missing_fields += [table.name]
+            if len(col_diff) != 0:
+                tables_with_missing_fields += [f"{table.name} {sorted(col_diff)}"]
 
         if len(tables_with_missing_fields) != 0:
-            raise UserException(f"Mandatory fields {mand_fields_set} missing in tables {tables_with_missing_fields}.")
+            raise UserException(f"Mandatory fields are missing in tables: {', '.join(tables_with_missing_fields)}.")
 
     @staticmethod
     def _entity_set_name(table) -> str:
@@ -194,9 +1136,10 @@ class Component(ComponentBase):
         rather than ``table.name`` because keboola-component >=1.5 overrides
         ``TableDefinition.name`` with the Storage table name from the manifest,
         which is unrelated to the Dynamics entity. ``Path.stem`` handles both a
-        plain CSV file and a sliced-table directory. See CFTL-658.
+        plain CSV file and a sliced-table directory, a ``.gz`` suffix of gzipped
+        tables is removed first. See CFTL-658.
         """
-        return Path(table.full_path).stem
+        return Path(Path(table.full_path).name.removesuffix(".gz")).stem
 
     def check_input_endpoints(self):
 
@@ -223,85 +1166,92 @@ class Component(ComponentBase):
             )
 
     def check_input_attributes(self):
+        """Validate all rows of all input tables and fail with a report of the invalid rows, if there are any."""
+
+        invalid_rows = 0
+        reported = []
 
         for table in self.in_tables:
-            table_name = self._entity_set_name(table).lower()
-            endpoint = self._client.supported_endpoints[table_name]
-            supported_attributes = self._client.get_endpoint_attributes(endpoint)
-            navigation_properties = self._client.get_endpoint_navigation_properties(endpoint)
-
-            logging.info(f"Supported attributes for {endpoint}: {supported_attributes}")
-            logging.info(f"Supported navigation properties for {endpoint}: {navigation_properties}")
-
-            with open(table.full_path) as inTable:
-                table_reader = csv.DictReader(inTable)
-                row_counter = 0
-                for row in table_reader:
-                    row_counter += 1
-                    record_id = row["id"].strip()
-
-                    if record_id == "" and self.cfg.operation != "create_and_update":
-                        raise UserException(
-                            f"In {table.name} on the line {row_counter} is missing ID."
-                            " For upsert and delete operations, all records must have valid IDs"
-                        )
-
-                    if self.cfg.operation == "create_and_update":
-                        if record_id == "":
-                            record_operation = "create"
-                        else:
-                            record_operation = "update"
+            for record in self.iter_records(table, validate_attributes=True, prepare_payloads=False):
+                if record.status is None or record.skipped:
+                    continue
+
+                invalid_rows += 1
+                if len(reported) < MAX_REPORTED_ERRORS:
+                    reported += [
+                        f"In {table.name} on the line {record.row_number}: {record.status['operation_response']}"
+                    ]
 
-                    else:
-                        record_operation = self.cfg.operation
-
-                    if record_operation != "delete":
-                        record_data = self.parse_json_from_string(row["data"])
-                        missing = []
-                        for key in record_data.keys():
-                            stripped_key = key.replace("@odata.bind", "")
-                            if "@odata.bind" in key:
-                                if (
-                                    stripped_key not in supported_attributes
-                                    and stripped_key not in navigation_properties
-                                ):
-                                    missing.append(stripped_key)
-                            else:
-                                if stripped_key not in supported_attributes:
-                                    missing.append(stripped_key)
-
-                        if missing:
-                            raise UserException(
-                                f"In {table.name} on the line {row_counter} are unsupported attributes: {missing}"
-                            )
+        if invalid_rows != 0:
+            more = f" and {invalid_rows - len(reported)} more" if invalid_rows > len(reported) else ""
+            raise UserException(f"{invalid_rows} invalid rows in input tables: {' '.join(reported)}{more}.")
 
         logging.info("All attributes in input tables are supported.")
 
-    @staticmethod
-    def get_request_id(request):
+    def get_attribute_validator(self, endpoint: str) -> AttributeValidator:
+        """Return the validator of payloads of an endpoint, compiled on the first use. Metadata of the entity is
+        fetched again, bypassing the metadata cache, once a payload with unsupported attributes is found."""
 
-        _reqid = request.headers.get("req_id")
-        if _reqid is not None:
-            _reqid = _reqid.split(",")[0].strip()
+        if self.attribute_validators is None:
+            self.attribute_validators = {}
 
-        return _reqid
+        entity_name = self._client.supported_endpoints[endpoint.lower()]
 
-    @staticmethod
-    def parse_json_from_string(object_string):
+        if entity_name not in self.attribute_validators:
+            self.attribute_validators[entity_name] = AttributeValidator(
+                *self.get_validated_metadata(entity_name), reload=partial(self.reload_validated_metadata, entity_name)
+            )
 
-        try:
-            return json.loads(object_string)
+        return self.attribute_validators[entity_name]
 
-        except ValueError:
-            pass
+    def get_validated_metadata(self, entity_name: str) -> tuple:
+        """Return attributes, navigation properties, attribute types and maximum lengths of string attributes
+        of an entity, against which payloads are validated."""
+
+        supported_attributes = self._client.get_endpoint_attributes(entity_name)
+        navigation_properties = self._client.get_endpoint_navigation_properties(entity_name)
+
+        logging.info(
+            f"Validating {entity_name} against {len(supported_attributes)} attributes and"
+            f" {len(navigation_properties)} navigation properties."
+        )
+        logging.debug(f"Supported attributes for {entity_name}: {supported_attributes}")
+        logging.debug(f"Supported navigation properties for {entity_name}: {navigation_properties}")
+
+        return (
+            supported_attributes,
+            navigation_properties,
+            {
+                attribute["LogicalName"]: attribute["AttributeType"]
+                for attribute in self._client.get_endpoint_attribute_metadata(entity_name)
+            },
+            {
+                attribute["LogicalName"]: attribute["MaxLength"]
+                for attribute in self._client.get_string_attribute_lengths(entity_name)
+            },
+        )
+
+    def reload_validated_metadata(self, entity_name: str) -> tuple | None:
+        """Fetch validated metadata of an entity again, e.g. after attributes were added to it. Returns ``None``,
+        if the metadata could not be fetched."""
+
+        logging.info(f"Payloads contain attributes unknown to {entity_name}, fetching its metadata again.")
+        self._client.invalidate_entity_metadata(entity_name)
 
         try:
-            return eval(object_string)
+            return self.get_validated_metadata(entity_name)
+        except requests.RequestException as e:
+            logging.warning(f"Could not fetch metadata of {entity_name} again: {e}")
+            return None
 
-        except SyntaxError:
-            pass
+    @staticmethod
+    def get_request_id(request):
 
-        return None
+        _reqid = request.headers.get("req_id")
+        if _reqid is not None:
+            _reqid = _reqid.split(",")[0].strip()
+
+        return _reqid
 
     def make_request(self, operation, endpoint, record_id, record_data):
 
@@ -317,8 +1267,180 @@ class Component(ComponentBase):
         elif operation == "create":
             return self._client.create_record(endpoint, record_data)
 
+    def execute_unit(self, endpoint, unit) -> list:
+        """Send records of a unit to the API. Returns responses aligned with the records, ``None`` for records,
+        which were not sent due to an error."""
+
+        pending = [record for record in unit if record.status is None]
+        endpoint_limit = (self.endpoint_limits or {}).get(endpoint.lower()) or nullcontext()
+
+        with endpoint_limit:
+            if self.telemetry is not None and pending:
+                with self.telemetry.scope(endpoint, self.unit_operation(unit)):
+                    responses = self.send_records(endpoint, pending)
+            else:
+                responses = self.send_records(endpoint, pending)
+
+        responses = iter(responses)
+        return [next(responses) if record.status is None else None for record in unit]
+
+    def send_records(self, endpoint, records) -> list:
+
+        if not records:
+            return []
+
+        if self.cfg.execution_engine == ExecutionEngine.bulk:
+            return self.send_records_bulk(endpoint, records)
+
+        if self.cfg.execution_engine == ExecutionEngine.batch:
+            operations = [
+                self._client.build_batch_operation(record.operation, endpoint, record.record_id, record.data)
+                for record in records
+            ]
+            responses = self.request_or_error(
+                self._client.execute_batch, operations, self.cfg.use_changesets, self.cfg.continue_on_error
+            )
+            return responses if isinstance(responses, list) else [responses] * len(records)
+
+        return [
+            self.request_or_error(self.make_request, record.operation, endpoint, record.record_id, record.data)
+            for record in records
+        ]
+
+    @staticmethod
+    def request_or_error(send, *args):
+        """Call a function sending a request. A connection error or timeout, including server errors, which were
+        retried by the session without success, is returned instead of the response, so it fails only the records
+        of the request."""
+
+        try:
+            return send(*args)
+        except requests.RequestException as e:
+            logging.debug(f"Request failed: {e}")
+            return e
+
+    def send_records_bulk(self, endpoint, records) -> list:
+        """Send records using bulk operations, one request per operation of the records.
+
+        Records of operations, which the entity does not support in bulk (and deletes), are sent individually.
+        If a bulk request is rejected due to invalid data, its records are sent individually, so only the invalid
+        records fail.
+        """
+
+        responses = [None] * len(records)
+        indexes_by_operation = {}
+
+        for index, record in enumerate(records):
+            indexes_by_operation.setdefault(record.operation, []).append(index)
+
+        for operation, indexes in indexes_by_operation.items():
+            group = [records[index] for index in indexes]
+
+            if self.supports_bulk(endpoint, operation):
+                group_responses = self.request_or_error(
+                    self._client.execute_bulk,
+                    operation,
+                    endpoint,
+                    [(record.record_id, record.data) for record in group],
+                )
+
+                if not isinstance(group_responses, list):
+                    group_responses = [group_responses] * len(group)
+
+                elif len(group) > 1 and group_responses[0].status_code == 400:
+                    logging.debug(f"Bulk {operation} on {endpoint} was rejected, sending its records individually.")
+                    group_responses = None
+
+            else:
+                group_responses = None
+
+            if group_responses is None:
+                group_responses = [
+                    self.request_or_error(self.make_request, record.operation, endpoint, record.record_id, record.data)
+                    for record in group
+                ]
+
+            for index, response in zip(indexes, group_responses):
+                responses[index] = response
+
+        return responses
+
+    def supports_bulk(self, endpoint, operation) -> bool:
+
+        if operation not in BULK_MESSAGES:
+            return False
+
+        if self.bulk_messages is None:
+            self.bulk_messages = {}
+
+        if endpoint not in self.bulk_messages:
+            entity_name = self._client.supported_endpoints[endpoint.lower()]
+
+            try:
+                self.bulk_messages[endpoint] = set(self._client.get_bulk_messages(entity_name))
+            except requests.HTTPError as e:
+                logging.warning(f"Could not determine bulk operations supported by {endpoint}: {e}")
+                self.bulk_messages[endpoint] = set()
+
+            unsupported = [message for message in BULK_MESSAGES.values() if message not in self.bulk_messages[endpoint]]
+            if unsupported:
+                logging.warning(f"Endpoint {endpoint} does not support {unsupported}, records are sent individually.")
+
+        return BULK_MESSAGES[operation] in self.bulk_messages[endpoint]
+
+    def unit_operation(self, unit) -> str:
+        """Return the operation of all records in a unit, or the configured operation, if they differ."""
+
+        operations = {record.operation for record in unit}
+        return operations.pop() if len(operations) == 1 else str(self.cfg.operation)
+
+    def process_unit(self, endpoint, unit, responses, retry_queue: RetryQueue | None = None) -> int:
+        """Write results of all records in a unit. Records failed with a transient error are deferred to the retry
+        queue instead, if it is given and not full. Returns the number of failed records."""
+
+        error_counter = 0
+
+        for record, response in zip(unit, responses):
+            if response is None:
+                self.writer.writerow(record.result_row, endpoint, record.operation, status=record.status)
+                error_counter += int(not record.skipped)
+
+            elif retry_queue is not None and is_transient_failure(response) and retry_queue.add(record):
+                continue
+
+            elif self.process_response(record.result_row, endpoint, record.operation, response):
+                self.update_change_index(endpoint, record)
+
+            else:
+                error_counter += 1
+
+        return error_counter
+
+    def process_response(self, row, endpoint, record_operation, response) -> bool:
+
+        success, request_id, request_status_dict = self.parse_response(record_operation, response)
+
+        if success is False and self.cfg.continue_on_error is False:
+            raise UserException(
+                f"There was an error during {record_operation} operation"
+                f"on {endpoint} endpoint. Received: {request_status_dict}."
+            )
+
+        self.writer.writerow(row, endpoint, record_operation, request_id, status=request_status_dict)
+        return success
+
     def parse_response(self, operation, request_object):
 
+        if isinstance(request_object, requests.RequestException):
+            return (
+                False,
+                None,
+                {
+                    "operation_status": f"REQUEST_ERROR - {type(request_object).__name__}",
+                    "operation_response": str(request_object),
+                },
+            )
+
         status_code = request_object.status_code
         id_req = self.get_request_id(request_object)
 
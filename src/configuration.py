@@ -38,6 +38,35 @@ class Operation(StrEnum):
     upsert = "upsert"
 
 
+class ExecutionEngine(StrEnum):
+    single = "single"
+    batch = "batch"
+    bulk = "bulk"
+
+
+class InputMode(StrEnum):
+    json = "json"
+    columns = "columns"
+
+
+class HttpTransport(StrEnum):
+    requests = "requests"
+    httpx = "httpx"
+
+
+@dataclass
+class AlternateKey:
+    endpoint: str
+    columns: list[str]
+
+
+@dataclass
+class EndpointSettings:
+    endpoint: str
+    max_concurrency: int = 0
+    depends_on: list[str] = dataclasses.field(default_factory=list)
+
+
 @dataclass
 class Configuration(ConfigurationBase):
     api_version: str
@@ -45,3 +74,41 @@ class Configuration(ConfigurationBase):
     operation: Operation
     continue_on_error: bool = True
     debug: bool = False
+    execution_engine: ExecutionEngine = ExecutionEngine.single
+    batch_size: int = 100
+    use_changesets: bool = False
+    bulk_max_payload_kb: int = 4096
+    concurrency: int = 1
+    validate_before_write: bool = True
+    metadata_cache_ttl_hours: float = 24.0
+    refresh_metadata_cache: bool = False
+    slice_readers: int = 2
+    results_flush_rows: int = 1000
+    results_slice_rows: int = 0
+    results_compress: bool = False
+    checkpoint_interval_rows: int = 10000
+    resume_from_checkpoint: bool = False
+    skip_unchanged: bool = False
+    change_index_max_entries: int = 100000
+    progress_interval_seconds: float = 60.0
+    alternate_keys: list[AlternateKey] = dataclasses.field(default_factory=list)
+    input_mode: InputMode = InputMode.json
+    empty_values_as_null: bool = False
+    table_concurrency: int = 1
+    dry_run: bool = False
+    coalesce_records: bool = False
+    lookup_cache_max_entries: int = 100000
+    lookup_prefetch: bool = False
+    max_in_flight_mb: int = 64
+    retry_passes: int = 1
+    retry_concurrency: int = 1
+    retry_delay_seconds: int = 10
+    send_changed_attributes: bool = False
+    http_transport: HttpTransport = HttpTransport.requests
+    http2: bool = False
+    pool_size: int = 0
+    keepalive_expiry_seconds: int = 30
+    connect_timeout_seconds: int = 10
+    read_timeout_seconds: int = 300
+    compress_requests_kb: int = 0
+    endpoint_settings: list[EndpointSettings] = dataclasses.field(default_factory=list)
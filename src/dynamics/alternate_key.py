@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field
+
+from dynamics.attributes import LOOKUP_TYPES, NUMERIC_TYPES
+
+
+@dataclass
+class AlternateKeySpec:
+    """Alternate key of an entity, whose values are taken from input table columns of the same names."""
+
+    columns: list[str]
+    attribute_types: dict[str, str | None] = field(default_factory=dict)
+
+    def segment(self, row: dict) -> str | None:
+        """Return the key segment addressing the record of a row, e.g. ``accountnumber='A-1',name='Contoso'``.
+
+        Returns ``None``, if any of the key values is missing.
+        """
+
+        parts = []
+
+        for column in self.columns:
+            value = (row.get(column) or "").strip()
+            if value == "":
+                return None
+
+            parts += [format_key_part(column, value, self.attribute_types.get(column))]
+
+        return ",".join(parts)
+
+
+def format_key_part(attribute: str, value: str, attribute_type: str | None = None) -> str:
+    """Format a single ``name=value`` part of an alternate key according to the type of the attribute."""
+
+    if attribute_type in NUMERIC_TYPES:
+        return f"{attribute}={value}"
+
+    if attribute_type == "Boolean":
+        return f"{attribute}={value.lower()}"
+
+    if attribute_type in LOOKUP_TYPES:
+        return f"_{attribute}_value={value}"
+
+    escaped = value.replace("'", "''")
+    return f"{attribute}='{escaped}'"
+
+
+def find_entity_key(entity_keys: list[dict], columns: list[str]) -> dict | None:
+    """Return the key of an entity consisting of exactly the given attributes, in any order."""
+
+    for key in entity_keys:
+        if {attribute.lower() for attribute in key.get("KeyAttributes") or []} == {c.lower() for c in columns}:
+            return key
+
+    return None
@@ -0,0 +1,10 @@
+# suffixes of payload keys setting lookups by the path of a record or by the natural key of a related record
+BIND_SUFFIX = "@odata.bind"
+KEY_SUFFIX = "@key"
+
+# AttributeType values of attribute metadata, grouped by the JSON type of their values
+INTEGER_TYPES = frozenset({"Integer", "BigInt", "Picklist", "State", "Status"})
+NUMBER_TYPES = frozenset({"Decimal", "Double", "Money"})
+NUMERIC_TYPES = INTEGER_TYPES | NUMBER_TYPES
+STRING_TYPES = frozenset({"String", "Memo"})
+LOOKUP_TYPES = frozenset({"Lookup", "Customer", "Owner"})
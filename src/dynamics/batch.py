@@ -0,0 +1,155 @@
+import json
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from requests.structures import CaseInsensitiveDict
+
+from dynamics.payload import dump_payload
+
+BATCH_MAX_OPERATIONS = 1000
+CRLF = "\r\n"
+
+
+@dataclass
+class BatchOperation:
+    method: str
+    url: str
+    body: dict | None = None
+    headers: dict = field(default_factory=dict)
+
+
+class BatchResponse:
+    """Response of a single operation inside a ``$batch`` request.
+
+    Mimics the subset of ``requests.Response`` used by ``Component.parse_response``, so batched operations
+    can be processed the same way as individual requests.
+    """
+
+    def __init__(self, status_code: int, reason: str, headers: Mapping | None = None, body: str = ""):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.text = body
+
+    def json(self):
+        return json.loads(self.text) if self.text.strip() else {}
+
+    def copy(self) -> "BatchResponse":
+        return BatchResponse(self.status_code, self.reason, dict(self.headers), self.text)
+
+
+def new_boundary(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4()}"
+
+
+def build_batch_body(
+    operations: list[BatchOperation], batch_boundary: str, changeset_boundary: str | None = None
+) -> str:
+    """Serialize operations into a multipart/mixed ``$batch`` request body.
+
+    If ``changeset_boundary`` is provided, all operations are wrapped in a single changeset, which the API
+    executes as one transaction.
+    """
+
+    lines = []
+
+    if changeset_boundary is None:
+        for operation in operations:
+            lines += [f"--{batch_boundary}", *_operation_lines(operation)]
+
+    else:
+        lines += [f"--{batch_boundary}", f"Content-Type: multipart/mixed; boundary={changeset_boundary}", ""]
+        for content_id, operation in enumerate(operations, start=1):
+            lines += [f"--{changeset_boundary}", *_operation_lines(operation, content_id)]
+        lines += [f"--{changeset_boundary}--"]
+
+    lines += [f"--{batch_boundary}--", ""]
+
+    return CRLF.join(lines)
+
+
+def _operation_lines(operation: BatchOperation, content_id: int | None = None) -> list[str]:
+
+    lines = ["Content-Type: application/http", "Content-Transfer-Encoding: binary"]
+    if content_id is not None:
+        lines += [f"Content-ID: {content_id}"]
+
+    lines += ["", f"{operation.method} {operation.url} HTTP/1.1"]
+    lines += [f"{name}: {value}" for name, value in operation.headers.items()]
+
+    if operation.body is not None:
+        lines += ["Content-Type: application/json; type=entry", "", dump_payload(operation.body).decode("utf-8")]
+    else:
+        lines += [""]
+
+    return lines
+
+
+def get_boundary(content_type: str) -> str | None:
+
+    for parameter in content_type.split(";")[1:]:
+        name, _, value = parameter.strip().partition("=")
+        if name.lower() == "boundary":
+            return value.strip('"')
+
+    return None
+
+
+def parse_batch_response(content_type: str, body: str) -> list[BatchResponse]:
+    """Parse a multipart/mixed ``$batch`` response into a flat list of operation responses.
+
+    Responses nested in changesets are flattened in the order they were returned. Each response carries
+    the ``Content-ID`` of the originating operation in its headers, if the API provided one.
+    """
+
+    boundary = get_boundary(content_type)
+    if boundary is None:
+        raise ValueError(f"Batch response is not a multipart response. Received content type: {content_type}.")
+
+    responses = []
+    for part_headers, part_body in _split_multipart(body.replace(CRLF, "\n"), boundary):
+        part_content_type = part_headers.get("Content-Type", "")
+
+        if part_content_type.lower().startswith("multipart/mixed"):
+            responses += parse_batch_response(part_content_type, part_body)
+
+        else:
+            response = _parse_http_response(part_body)
+            if "Content-ID" in part_headers:
+                response.headers["Content-ID"] = part_headers["Content-ID"]
+            responses += [response]
+
+    return responses
+
+
+def _split_multipart(body: str, boundary: str):
+
+    delimiter = f"--{boundary}"
+
+    for part in body.split(delimiter)[1:]:
+        if part.startswith("--"):
+            break
+
+        raw_headers, _, part_body = part.lstrip("\n").partition("\n\n")
+        yield _parse_headers(raw_headers.split("\n")), part_body.strip("\n")
+
+
+def _parse_headers(lines: list[str]) -> CaseInsensitiveDict:
+
+    headers = CaseInsensitiveDict()
+    for line in lines:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip()] = value.strip()
+
+    return headers
+
+
+def _parse_http_response(raw: str) -> BatchResponse:
+
+    head, _, body = raw.partition("\n\n")
+    status_line, *header_lines = head.split("\n")
+    _, status_code, reason = (status_line.split(" ", 2) + [""])[:3]
+
+    return BatchResponse(int(status_code), reason.strip(), _parse_headers(header_lines), body.strip())
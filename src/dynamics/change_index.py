@@ -0,0 +1,81 @@
+import hashlib
+import json
+import threading
+
+DIGEST_SIZE = 8
+
+
+class ChangeIndex:
+    """Index of hashes of records successfully written in previous runs, persisted in the component state file.
+
+    Each entry maps a hash of the organization, endpoint and record ID to a hash of the normalized record data,
+    so the index does not contain any record data. The index keeps at most ``max_entries`` entries, the least
+    recently written or matched records are evicted first.
+    """
+
+    STATE_KEY = "change_index"
+
+    def __init__(self, state: dict | None, organization_url: str, max_entries: int):
+        self._entries = dict((state or {}).get(self.STATE_KEY, {}))
+        self._prefix = f"{organization_url.rstrip('/').lower()}|"
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._evict()
+
+    @staticmethod
+    def _digest(value: str) -> str:
+        return hashlib.blake2b(value.encode(), digest_size=DIGEST_SIZE).hexdigest()
+
+    def _key(self, endpoint: str, record_id: str) -> str:
+        return self._digest(f"{self._prefix}{endpoint}|{record_id.lower()}")
+
+    @classmethod
+    def data_hash(cls, data: dict) -> str:
+        """Return a hash of record data, which does not depend on the order of its attributes."""
+
+        return cls._digest(json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str))
+
+    def is_unchanged(self, endpoint: str, record_id: str, data: dict) -> bool:
+
+        key = self._key(endpoint, record_id)
+
+        with self._lock:
+            data_hash = self._entries.pop(key, None)
+
+            if data_hash is None:
+                return False
+
+            # re-inserting the entry marks it as recently used
+            self._entries[key] = data_hash
+
+        return data_hash == self.data_hash(data)
+
+    def add(self, endpoint: str, record_id: str, data: dict, data_hash: str | None = None) -> None:
+        """Record written data of a record. ``data_hash`` is the hash of the full data of the record, if only a part
+        of it was written."""
+
+        key = self._key(endpoint, record_id)
+        data_hash = data_hash if data_hash is not None else self.data_hash(data)
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = data_hash
+            self._evict()
+
+    def remove(self, endpoint: str, record_id: str) -> None:
+
+        with self._lock:
+            self._entries.pop(self._key(endpoint, record_id), None)
+
+    def _evict(self) -> None:
+
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def to_state(self) -> dict:
+
+        with self._lock:
+            return dict(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import threading
+
+from dynamics.reader import get_slice_paths, open_slice
+
+FINGERPRINT_BYTES = 65536
+
+
+class CheckpointStore:
+    """Progress of writing input tables, which is persisted in the component state file.
+
+    For each table, the store keeps the number of leading input rows, whose results were already recorded,
+    together with a fingerprint of the table. A checkpoint is only used, if the fingerprint of the table
+    did not change. Progress is persisted by calling ``save_callback`` every ``interval_rows`` rows. Tables may
+    be written by multiple threads, the callback is never called by more of them at once.
+    """
+
+    STATE_KEY = "checkpoints"
+
+    def __init__(self, state: dict | None, interval_rows: int, save_callback):
+        self._checkpoints = dict((state or {}).get(self.STATE_KEY, {}))
+        self._saved_rows = {}
+        self.interval_rows = interval_rows
+        self.save_callback = save_callback
+        self._lock = threading.RLock()
+
+    def get(self, table_key: str, fingerprint: str) -> int:
+        """Return the number of rows of the table already written in a previous run."""
+
+        checkpoint = self._checkpoints.get(table_key)
+        if checkpoint is None or checkpoint.get("fingerprint") != fingerprint:
+            return 0
+
+        return checkpoint.get("rows", 0)
+
+    def update(self, table_key: str, fingerprint: str, rows: int) -> None:
+
+        with self._lock:
+            self._checkpoints[table_key] = {"fingerprint": fingerprint, "rows": rows}
+
+            if self.interval_rows > 0 and rows - self._saved_rows.get(table_key, 0) >= self.interval_rows:
+                self._saved_rows[table_key] = rows
+                self.save_callback()
+
+    def complete(self, table_key: str) -> None:
+        """Remove the checkpoint of a table, which was written completely."""
+
+        with self._lock:
+            if self._checkpoints.pop(table_key, None) is not None:
+                self.save_callback()
+
+    def to_state(self) -> dict:
+
+        with self._lock:
+            return dict(self._checkpoints)
+
+
+def table_fingerprint(table) -> str:
+    """Return a fingerprint of the table contents based on sizes of its files and the beginning of its data."""
+
+    digest = hashlib.sha1()
+
+    slice_paths = get_slice_paths(table)
+    for path in slice_paths:
+        digest.update(f"{os.path.basename(path)}:{os.path.getsize(path)}|".encode())
+
+    if slice_paths:
+        with open_slice(slice_paths[0]) as in_slice:
+            digest.update(in_slice.read(FINGERPRINT_BYTES).encode())
+
+    return digest.hexdigest()
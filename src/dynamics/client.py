@@ -1,68 +1,106 @@
+import json
 import logging
 import os
+import time
+from urllib.parse import parse_qsl, quote, urlparse
 
 import requests
-from keboola.component import UserException
 from keboola.http_client import HttpClient
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from dynamics.batch import (
+    BatchOperation,
+    BatchResponse,
+    build_batch_body,
+    new_boundary,
+    parse_batch_response,
+)
+from dynamics.metadata_cache import MetadataCache
+from dynamics.payload import JSON_CONTENT_TYPE, dump_payload
+from dynamics.telemetry import Telemetry
+from dynamics.throttling import AdaptiveRateController
+from dynamics.token_manager import TokenManager
+from dynamics.transport import HttpxAdapter, compress_body
+
+KEY_SAFE_CHARACTERS = "=',"
+BULK_MESSAGES = {"create": "CreateMultiple", "update": "UpdateMultiple", "upsert": "UpsertMultiple"}
+# cache names of metadata of attributes and relationships of an entity, which change when attributes are added
+ENTITY_METADATA_NAMES = ("Attributes", "StringAttributeLengths", "NavigationProperties", "NavigationTargets")
+
 
 class DynamicsClient(HttpClient):
+    metadata_cache: MetadataCache | None = None
+    token_manager: TokenManager | None = None
+    telemetry: Telemetry | None = None
+    _timeout: tuple[float, float] | None = None
+    _compress_min_bytes: int = 0
+    _metadata_memo: dict | None = None
+
     MSFT_LOGIN_URL = "https://login.microsoftonline.com/common/oauth2/token"
     MAX_RETRIES = 7
     PAGE_SIZE = 2000
+    POOL_SIZE = 10
 
     def __init__(
-        self, client_id, client_secret, resource_url, refresh_token, api_version, max_page_size: int = PAGE_SIZE
+        self,
+        client_id,
+        client_secret,
+        resource_url,
+        refresh_token,
+        api_version,
+        max_page_size: int = PAGE_SIZE,
+        pool_size: int = POOL_SIZE,
+        max_concurrency: int = 1,
+        metadata_cache: MetadataCache | None = None,
+        fallback_refresh_token: str | None = None,
+        telemetry: Telemetry | None = None,
+        transport: str = "requests",
+        http2: bool = False,
+        keepalive_expiry: float = 30.0,
+        timeout: tuple[float, float] | None = None,
+        compress_min_bytes: int = 0,
     ):
 
         self.client_id = client_id
         self.client_secret = client_secret
         self.resource_url = os.path.join(resource_url, "")
-        self._refresh_token = refresh_token
         self._max_page_size = max_page_size
-        self.supported_endpoints = []
+        self._pool_size = pool_size
+        self._transport = transport
+        self._http2 = http2
+        self._keepalive_expiry = keepalive_expiry
+        self._timeout = timeout
+        self._compress_min_bytes = compress_min_bytes
+        self._rate_controller = AdaptiveRateController(max_concurrency)
+        self.metadata_cache = metadata_cache
+        self.telemetry = telemetry
+        self.supported_endpoints: dict[str, str] = {}
+        self.token_manager = TokenManager(
+            self.MSFT_LOGIN_URL,
+            client_id,
+            client_secret,
+            self.resource_url,
+            refresh_token,
+            fallback_refresh_token=fallback_refresh_token,
+        )
         _accessToken = self.refresh_token()
         super().__init__(
             base_url=os.path.join(resource_url, "api/data/", api_version),
             max_retries=self.MAX_RETRIES,
             auth_header={"Authorization": f"Bearer {_accessToken}"},
         )
+        self._session = self._requests_retry_session()
 
-    def refresh_token(self):
-
-        headers_refresh = {"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"}
-
-        body_refresh = {
-            "client_id": self.client_id,
-            "grant_type": "refresh_token",
-            "client_secret": self.client_secret,
-            "resource": self.resource_url,
-            "refresh_token": self._refresh_token,
-        }
-
-        resp = requests.post(self.MSFT_LOGIN_URL, headers=headers_refresh, data=body_refresh)
-        code, response_json = resp.status_code, resp.json()
-
-        if code == 200:
-            logging.debug("Access token refreshed successfully.")
-            return response_json["access_token"]
+    def refresh_token(self) -> str:
+        """Return a valid access token. The token is refreshed by the token manager before it expires."""
 
-        else:
-            raise UserException(f"Could not refresh access token. Received {code} - {response_json}.")
-
-    def __response_hook(self, res, *args, **kwargs):
+        if self.token_manager is None:
+            raise RuntimeError("The client has no token manager.")
 
-        if res.status_code == 401:
-            token = self._refresh_token()
-            self.update_auth_header({"Authorization": f"Bearer {token}"})
+        return self.token_manager.get_token()
 
-            res.request.headers["Authorization"] = f"Bearer {token}"
-            s = requests.Session()
-            return self.requests_retry_session(session=s).send(res.request)
-
-    def requests_retry_session(self, session=None):
+    def _requests_retry_session(self, session=None):
 
         session = session or requests.Session()
         retry = Retry(
@@ -71,54 +109,235 @@ class DynamicsClient(HttpClient):
             connect=self.max_retries,
             backoff_factor=self.backoff_factor,
             status_forcelist=self.status_forcelist,
-            allowed_methods=("GET", "POST", "PATCH", "UPDATE", "DELETE"),
+            allowed_methods=self.allowed_methods,
         )
-        adapter = HTTPAdapter(max_retries=retry)
+
+        if self._transport == "httpx":
+            adapter = HttpxAdapter(self._pool_size, self._http2, self._keepalive_expiry, max_retries=retry)
+        else:
+            adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size, max_retries=retry)
+
         session.mount("http://", adapter)
         session.mount("https://", adapter)
-        # append response hook
-        session.hooks["response"].append(self.__response_hook)
         return session
 
+    def _request_raw(self, method: str, endpoint_path: str | None = None, **kwargs) -> requests.Response:
+        """Send a request using a single session shared by all requests made by the client.
+
+        Unlike the base implementation, which creates a new session for every request, the shared session keeps
+        a pool of open connections, which are reused by subsequent and concurrent requests. Headers are passed
+        per request, so the session can safely be used from multiple threads.
+
+        URLs of records, which are already percent-encoded, are passed with ``is_encoded_url`` set.
+
+        Bodies of at least ``compress_min_bytes`` bytes are gzipped. Requests without an explicit timeout use
+        the ``(connect, read)`` timeout of the client.
+
+        Requests are paced by the adaptive rate controller. Throttled requests (HTTP 429) are retried once
+        the period requested by the API in the ``Retry-After`` header passes. The access token is taken from
+        the token manager for every attempt; a request rejected with HTTP 401 is retried once with a new token.
+        """
+
+        is_absolute_path = kwargs.pop("is_absolute_path", False)
+        # an encoded URL is used as is, as the base implementation would encode it again and split it at ``?``
+        is_encoded_url = kwargs.pop("is_encoded_url", False)
+        url = endpoint_path if is_encoded_url else self._build_url(endpoint_path, is_absolute_path)
+
+        headers = {**self._default_header, **(kwargs.pop("headers", None) or {})}
+
+        use_auth = kwargs.pop("ignore_auth", False) is False
+        if use_auth:
+            headers.update(self._auth_header)
+            kwargs["auth"] = self._auth
+
+        if self._default_params and type(self._default_params) is dict:
+            params = kwargs.pop("params", {}) or {}
+            kwargs["params"] = {**self._default_params, **params}
+
+        if "data" in kwargs:
+            kwargs["data"] = compress_body(kwargs["data"], headers, self._compress_min_bytes)
+
+        if self._timeout is not None:
+            kwargs.setdefault("timeout", self._timeout)
+
+        token_refreshed = False
+        attempt = 0
+        tries = 0
+
+        token_manager = self.token_manager if use_auth else None
+
+        while True:
+            access_token = None
+            if token_manager is not None:
+                access_token = token_manager.get_token()
+                headers["Authorization"] = f"Bearer {access_token}"
+
+            self._rate_controller.acquire()
+            response = None
+            started_at = time.monotonic()
+
+            try:
+                response = self._session.request(method, url, headers=headers, **kwargs)
+            finally:
+                self._rate_controller.release(response)
+                self._record_request(method, response, time.monotonic() - started_at, tries)
+                tries += 1
+
+            if (
+                response.status_code == 401
+                and token_manager is not None
+                and access_token is not None
+                and not token_refreshed
+            ):
+                logging.debug(f"Request to {url} was not authorized. Retrying with a new access token.")
+                token_manager.invalidate(access_token)
+                token_refreshed = True
+                continue
+
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            attempt += 1
+            logging.debug(f"Request to {url} was throttled by the API. Retry {attempt}/{self.max_retries}.")
+
+    def _record_request(self, method: str, response, elapsed: float, attempt: int) -> None:
+
+        if self.telemetry is None:
+            return
+
+        if response is None:
+            self.telemetry.record_request(method, None, elapsed, attempt)
+            return
+
+        body = response.request.body if response.request is not None else None
+        self.telemetry.record_request(
+            method,
+            response.status_code,
+            elapsed,
+            attempt,
+            bytes_sent=len(body or b""),
+            bytes_received=len(response.content or b""),
+        )
+
+    def _get_metadata(self, cache_name: str, url: str, params: dict, parse_response):
+        """Fetch metadata from the API, using the metadata cache, if configured.
+
+        Fresh cached values are returned without calling the API. Stale cached values with an ETag are
+        revalidated using the ``If-None-Match`` header. Without the metadata cache, values are kept in memory
+        for the lifetime of the client, so metadata used per record is fetched only once.
+        """
+
+        if self.metadata_cache is None:
+            if self._metadata_memo is None:
+                self._metadata_memo = {}
+
+            if cache_name not in self._metadata_memo:
+                self._metadata_memo[cache_name] = self._fetch_metadata(url, params, parse_response)
+
+            return self._metadata_memo[cache_name]
+
+        cached = self.metadata_cache.get(cache_name)
+
+        if cached is not None and cached.fresh:
+            logging.debug(f"Using cached metadata {cache_name}.")
+            return cached.value
+
+        headers = {"If-None-Match": cached.etag} if cached is not None and cached.etag else None
+        response = self.get_raw(url, is_absolute_path=True, params=params, headers=headers)
+
+        if cached is not None and response.status_code == 304:
+            self.metadata_cache.touch(cache_name)
+            return cached.value
+
+        response.raise_for_status()
+        value = parse_response(response.json())
+        self.metadata_cache.set(cache_name, value, response.headers.get("ETag"))
+
+        return value
+
+    def _fetch_metadata(self, url: str, params: dict, parse_response):
+
+        response = self.get_raw(url, is_absolute_path=True, params=params)
+        response.raise_for_status()
+        return parse_response(response.json())
+
+    def invalidate_entity_metadata(self, entity_name: str) -> None:
+        """Remove cached attributes and relationships of an entity, so they are fetched from the API on their next
+        use, e.g. after attributes were added to the entity."""
+
+        for cache_name in ENTITY_METADATA_NAMES:
+            name = f"{cache_name}({entity_name})"
+
+            if self.metadata_cache is not None:
+                self.metadata_cache.remove(name)
+
+            if self._metadata_memo is not None:
+                self._metadata_memo.pop(name, None)
+
     def get_entity_metadata(self) -> None:
 
         url = os.path.join(self.base_url, "EntityDefinitions")
 
         params_meta = {"$select": "EntitySetName,LogicalName"}
 
-        response = self.get_raw(url, is_absolute_path=True, params=params_meta)
-        try:
-            response.raise_for_status()
-            json_data = response.json()
-            self.supported_endpoints = {
+        self.supported_endpoints = self._get_metadata(
+            "EntityDefinitions",
+            url,
+            params_meta,
+            lambda json_data: {
                 entity["EntitySetName"].lower(): entity["LogicalName"].lower()
                 for entity in json_data["value"]
                 if entity["EntitySetName"] is not None
-            }
-
-        except requests.HTTPError as e:
-            raise e
+            },
+        )
 
-    def get_endpoint_attributes(self, entity_name: str) -> list:
+    def get_endpoint_attribute_metadata(self, entity_name: str) -> list[dict]:
+        """Return metadata of all attributes of an entity, which are valid for create or update."""
 
         url = os.path.join(self.base_url, f"EntityDefinitions(LogicalName='{entity_name}')/Attributes")
 
-        response = self.get_raw(url, is_absolute_path=True)
-
-        try:
-            response.raise_for_status()
-            json_data = response.json()
-
-            attributes = [
-                attr.get("LogicalName")
+        params = {"$select": "LogicalName,AttributeType,IsValidForCreate,IsValidForUpdate"}
+
+        return self._get_metadata(
+            f"Attributes({entity_name})",
+            url,
+            params,
+            lambda json_data: [
+                {
+                    "LogicalName": attr.get("LogicalName"),
+                    "AttributeType": attr.get("AttributeType"),
+                    "IsValidForCreate": attr.get("IsValidForCreate"),
+                    "IsValidForUpdate": attr.get("IsValidForUpdate"),
+                }
                 for attr in json_data.get("value")
                 if attr.get("IsValidForCreate") or attr.get("IsValidForUpdate")
-            ]
+            ],
+        )
+
+    def get_endpoint_attributes(self, entity_name: str) -> list:
 
-            return attributes
+        return [attr["LogicalName"] for attr in self.get_endpoint_attribute_metadata(entity_name)]
 
-        except requests.HTTPError as e:
-            raise e
+    def get_string_attribute_lengths(self, entity_name: str) -> list[dict]:
+        """Return maximum lengths of string attributes of an entity."""
+
+        url = os.path.join(
+            self.base_url,
+            f"EntityDefinitions(LogicalName='{entity_name}')/Attributes/Microsoft.Dynamics.CRM.StringAttributeMetadata",
+        )
+
+        params = {"$select": "LogicalName,MaxLength"}
+
+        return self._get_metadata(
+            f"StringAttributeLengths({entity_name})",
+            url,
+            params,
+            lambda json_data: [
+                {"LogicalName": attr.get("LogicalName"), "MaxLength": attr.get("MaxLength")}
+                for attr in json_data.get("value", [])
+                if attr.get("MaxLength")
+            ],
+        )
 
     def get_endpoint_navigation_properties(self, entity_name: str) -> list:
 
@@ -129,39 +348,369 @@ class DynamicsClient(HttpClient):
 
         params = {"$select": "ReferencingEntityNavigationPropertyName"}
 
-        response = self.get_raw(url, is_absolute_path=True, params=params)
+        return self._get_metadata(
+            f"NavigationProperties({entity_name})",
+            url,
+            params,
+            lambda json_data: [
+                rel.get("ReferencingEntityNavigationPropertyName")
+                for rel in json_data.get("value", [])
+                if rel.get("ReferencingEntityNavigationPropertyName")
+            ],
+        )
 
-        try:
-            response.raise_for_status()
-            json_data = response.json()
+    def get_navigation_targets(self, entity_name: str) -> dict[str, str]:
+        """Return logical names of entities referenced by single-valued navigation properties of an entity."""
 
-            nav_properties = [
-                rel.get("ReferencingEntityNavigationPropertyName")
+        url = os.path.join(self.base_url, f"EntityDefinitions(LogicalName='{entity_name}')/ManyToOneRelationships")
+
+        params = {"$select": "ReferencingEntityNavigationPropertyName,ReferencedEntity"}
+
+        return self._get_metadata(
+            f"NavigationTargets({entity_name})",
+            url,
+            params,
+            lambda json_data: {
+                rel["ReferencingEntityNavigationPropertyName"]: rel.get("ReferencedEntity")
                 for rel in json_data.get("value", [])
                 if rel.get("ReferencingEntityNavigationPropertyName")
-            ]
+            },
+        )
+
+    def find_records(
+        self, entity_set: str, id_attribute: str, attribute: str, values: list[str] | None
+    ) -> list[tuple[str, str]]:
+        """Return ``(value, id)`` pairs of records of an entity set, whose attribute has one of the values, or of all
+        records with the attribute set, if ``values`` is ``None``. All pages of the result are read."""
+
+        if values is None:
+            record_filter = f"{attribute} ne null"
+        else:
+            quoted = ",".join("'" + value.replace("'", "''") + "'" for value in values)
+            record_filter = f"Microsoft.Dynamics.CRM.In(PropertyName='{attribute}',PropertyValues=[{quoted}])"
+
+        records = self._get_all_records(
+            entity_set, {"$select": f"{id_attribute},{attribute}", "$filter": record_filter}
+        )
+
+        return [
+            (str(record[attribute]), record[id_attribute]) for record in records if record.get(attribute) is not None
+        ]
+
+    def get_records(
+        self, entity_set: str, id_attribute: str, record_ids: list[str], attributes: list[str]
+    ) -> dict[str, dict]:
+        """Return current values of attributes of records of an entity set by their IDs. Records are keyed by their
+        lowercase IDs, records, which do not exist, are missing."""
 
-            return nav_properties
+        quoted = ",".join(f"'{record_id}'" for record_id in record_ids)
+        params = {
+            "$select": ",".join([id_attribute, *attributes]),
+            "$filter": f"Microsoft.Dynamics.CRM.In(PropertyName='{id_attribute}',PropertyValues=[{quoted}])",
+        }
+
+        return {str(record[id_attribute]).lower(): record for record in self._get_all_records(entity_set, params)}
+
+    def _get_all_records(self, entity_set: str, params: dict | None) -> list[dict]:
+        """Return records of all pages of a query of an entity set."""
+
+        url = os.path.join(self.base_url, entity_set)
+        headers = {"Prefer": f"odata.maxpagesize={self._max_page_size}"}
+        records = []
+
+        while url:
+            response = self.get_raw(url, is_absolute_path=True, params=params, headers=headers)
+            response.raise_for_status()
+            json_data = response.json()
+            records += json_data.get("value", [])
+
+            # the next link contains all query options, which are passed as parameters, as the URL is not re-encoded
+            next_link = json_data.get("@odata.nextLink")
+            url = next_link.partition("?")[0] if next_link else None
+            params = dict(parse_qsl(urlparse(next_link).query)) if next_link else None
+
+        return records
+
+    def get_entity_keys(self, entity_name: str) -> list[dict]:
+        """Return alternate keys defined for an entity."""
+
+        url = os.path.join(self.base_url, f"EntityDefinitions(LogicalName='{entity_name}')/Keys")
+
+        params = {"$select": "LogicalName,KeyAttributes,EntityKeyIndexStatus"}
+
+        return self._get_metadata(
+            f"Keys({entity_name})",
+            url,
+            params,
+            lambda json_data: [
+                {
+                    "LogicalName": key.get("LogicalName"),
+                    "KeyAttributes": key.get("KeyAttributes") or [],
+                    "EntityKeyIndexStatus": key.get("EntityKeyIndexStatus"),
+                }
+                for key in json_data.get("value", [])
+            ],
+        )
 
-        except requests.HTTPError as e:
-            raise e
+    def get_primary_id_attribute(self, entity_name: str) -> str:
+
+        url = os.path.join(self.base_url, f"EntityDefinitions(LogicalName='{entity_name}')")
+
+        return self._get_metadata(
+            f"PrimaryIdAttribute({entity_name})",
+            url,
+            {"$select": "PrimaryIdAttribute"},
+            lambda json_data: json_data["PrimaryIdAttribute"],
+        )
+
+    def get_bulk_messages(self, entity_name: str) -> list[str]:
+        """Return names of bulk operation messages (e.g. ``CreateMultiple``) supported by an entity."""
+
+        url = os.path.join(self.base_url, "sdkmessagefilters")
+        messages = " or ".join(f"sdkmessageid/name eq '{message}'" for message in BULK_MESSAGES.values())
+
+        params = {
+            "$select": "primaryobjecttypecode",
+            "$expand": "sdkmessageid($select=name)",
+            "$filter": f"primaryobjecttypecode eq '{entity_name}' and ({messages})",
+        }
+
+        return self._get_metadata(
+            f"BulkMessages({entity_name})",
+            url,
+            params,
+            lambda json_data: sorted(
+                {
+                    message_filter["sdkmessageid"]["name"]
+                    for message_filter in json_data.get("value", [])
+                    if message_filter.get("sdkmessageid")
+                }
+            ),
+        )
+
+    def post_raw(
+        self,
+        endpoint_path: str | None = None,
+        params: dict | None = None,
+        headers: dict | None = None,
+        data: dict | bytes | str | None = None,
+        json: dict | None = None,
+        is_absolute_path: bool = False,
+        cookies=None,
+        files: dict | None = None,
+        ignore_auth: bool = False,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a POST request. Unlike in ``HttpClient``, ``data`` may be an already serialized body."""
+
+        return self._request_raw(
+            "POST",
+            endpoint_path,
+            params=params,
+            headers=headers,
+            data=data,
+            json=json,
+            cookies=cookies,
+            is_absolute_path=is_absolute_path,
+            files=files,
+            ignore_auth=ignore_auth,
+            **kwargs,
+        )
+
+    def patch_raw(
+        self,
+        endpoint_path: str | None = None,
+        params: dict | None = None,
+        headers: dict | None = None,
+        data: dict | bytes | str | None = None,
+        json: dict | None = None,
+        is_absolute_path: bool = False,
+        cookies=None,
+        files: dict | None = None,
+        ignore_auth: bool = False,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a PATCH request. Unlike in ``HttpClient``, ``data`` may be an already serialized body."""
+
+        return self._request_raw(
+            "PATCH",
+            endpoint_path,
+            params=params,
+            headers=headers,
+            data=data,
+            json=json,
+            cookies=cookies,
+            is_absolute_path=is_absolute_path,
+            files=files,
+            ignore_auth=ignore_auth,
+            **kwargs,
+        )
 
     def create_record(self, endpoint, data):
         url_create = os.path.join(self.base_url, endpoint)
-        data_create = data
-        return self.post_raw(endpoint_path=url_create, json=data_create)
+        headers_create = {"Content-Type": JSON_CONTENT_TYPE}
+        data_create = dump_payload(data)
+        return self.post_raw(endpoint_path=url_create, data=data_create, headers=headers_create)
+
+    def record_url(self, endpoint, record_id) -> str:
+        """Return the URL of a record addressed by its ID or an alternate key segment. Key values are percent-encoded,
+        so characters like ``?``, ``#`` or ``/`` do not change the meaning of the URL."""
+
+        return os.path.join(self.base_url, f"{endpoint}({quote(record_id, safe=KEY_SAFE_CHARACTERS)})")
 
     def update_record(self, endpoint, record_id, data):
-        url_update = os.path.join(self.base_url, f"{endpoint}({record_id})")
-        headers_update = {"If-Match": "*"}
-        data_update = data
-        return self.patch_raw(endpoint_path=url_update, json=data_update, headers=headers_update, is_absolute_path=True)
+        url_update = self.record_url(endpoint, record_id)
+        headers_update = {"Content-Type": JSON_CONTENT_TYPE, "If-Match": "*"}
+        data_update = dump_payload(data)
+        return self.patch_raw(endpoint_path=url_update, data=data_update, headers=headers_update, is_encoded_url=True)
 
     def upsert_record(self, endpoint, record_id, data):
-        url_update = os.path.join(self.base_url, f"{endpoint}({record_id})")
-        data_update = data
-        return self.patch_raw(endpoint_path=url_update, json=data_update)
+        url_update = self.record_url(endpoint, record_id)
+        headers_update = {"Content-Type": JSON_CONTENT_TYPE}
+        data_update = dump_payload(data)
+        return self.patch_raw(endpoint_path=url_update, data=data_update, headers=headers_update, is_encoded_url=True)
 
     def delete_record(self, endpoint, record_id):
-        url_delete = os.path.join(self.base_url, f"{endpoint}({record_id})")
-        return self.delete_raw(url_delete)
+        url_delete = self.record_url(endpoint, record_id)
+        return self.delete_raw(url_delete, is_encoded_url=True)
+
+    def build_batch_operation(self, operation, endpoint, record_id, data) -> BatchOperation:
+
+        if operation == "create":
+            return BatchOperation("POST", os.path.join(self.base_url, endpoint), data)
+
+        # alternate key values may contain characters, which are not allowed in the request line of a batch part
+        url_record = self.record_url(endpoint, record_id)
+
+        if operation == "update":
+            return BatchOperation("PATCH", url_record, data, {"If-Match": "*"})
+
+        elif operation == "upsert":
+            return BatchOperation("PATCH", url_record, data)
+
+        elif operation == "delete":
+            return BatchOperation("DELETE", url_record)
+
+        raise ValueError(f"Unsupported batch operation: {operation}.")
+
+    def execute_batch(
+        self, operations: list[BatchOperation], use_changeset: bool = False, continue_on_error: bool = True
+    ) -> list[BatchResponse]:
+        """Send operations in a single ``$batch`` request and return one response per operation.
+
+        Operations, for which the API returned no response, are assigned a response explaining why:
+        the changeset error for a rolled back changeset, or a 424 response for operations not executed
+        after the batch stopped on the first error.
+        """
+
+        batch_boundary = new_boundary("batch")
+        changeset_boundary = new_boundary("changeset") if use_changeset else None
+
+        headers_batch = {
+            "Content-Type": f"multipart/mixed; boundary={batch_boundary}",
+            "Accept": "application/json",
+            "OData-MaxVersion": "4.0",
+            "OData-Version": "4.0",
+        }
+
+        if continue_on_error and not use_changeset:
+            headers_batch["Prefer"] = "odata.continue-on-error"
+
+        body_batch = build_batch_body(operations, batch_boundary, changeset_boundary)
+        url_batch = os.path.join(self.base_url, "$batch")
+        response = self.post_raw(
+            endpoint_path=url_batch, data=body_batch.encode("utf-8"), headers=headers_batch, is_absolute_path=True
+        )
+
+        if response.status_code != 200:
+            failed = BatchResponse(response.status_code, response.reason, response.headers, response.text)
+            return [failed.copy() for _ in operations]
+
+        responses = parse_batch_response(response.headers.get("Content-Type", ""), response.text)
+        batch_request_id = self.get_batch_request_id(response)
+
+        operation_responses: list[BatchResponse | None]
+        if use_changeset and len(responses) == 1 and responses[0].status_code >= 400:
+            operation_responses = [responses[0].copy() for _ in operations]
+
+        elif use_changeset:
+            responses_by_id = {r.headers.get("Content-ID"): r for r in responses}
+            operation_responses = [responses_by_id.get(str(content_id)) for content_id in range(1, len(operations) + 1)]
+
+        else:
+            operation_responses = [*responses, *[None] * (len(operations) - len(responses))]
+
+        results = []
+        for index, operation_response in enumerate(operation_responses):
+            if operation_response is None:
+                operation_response = BatchResponse(
+                    424,
+                    "Failed Dependency",
+                    body=json.dumps(
+                        {"error": {"message": "Operation was not executed, because a previous operation failed."}}
+                    ),
+                )
+
+            if batch_request_id is not None:
+                operation_response.headers["REQ_ID"] = f"{batch_request_id}-{index + 1}"
+
+            results += [operation_response]
+
+        return results
+
+    def execute_bulk(self, operation: str, endpoint: str, records: list[tuple[str, dict]]) -> list[BatchResponse]:
+        """Send records in a single ``CreateMultiple``, ``UpdateMultiple`` or ``UpsertMultiple`` request and return
+        one response per record.
+
+        The bulk operations are transactional, so if the request fails, all records are assigned its error.
+        IDs of created records are returned in the ``OData-EntityId`` header, as for individual requests.
+        """
+
+        entity_name = self.supported_endpoints[endpoint.lower()]
+        primary_id_attribute = self.get_primary_id_attribute(entity_name) if operation != "create" else None
+
+        targets = []
+        for record_id, data in records:
+            target = {"@odata.type": f"Microsoft.Dynamics.CRM.{entity_name}", **data}
+
+            if operation != "create" and "=" in record_id:
+                target["@odata.id"] = f"{endpoint}({record_id})"
+            elif operation != "create":
+                target[primary_id_attribute] = record_id
+
+            targets += [target]
+
+        url_bulk = os.path.join(self.base_url, endpoint, f"Microsoft.Dynamics.CRM.{BULK_MESSAGES[operation]}")
+        response = self.post_raw(
+            endpoint_path=url_bulk,
+            data=dump_payload({"Targets": targets}),
+            headers={"Content-Type": JSON_CONTENT_TYPE},
+            is_absolute_path=True,
+        )
+        request_id = self.get_batch_request_id(response)
+
+        if response.status_code not in (200, 204):
+            failed = BatchResponse(response.status_code, response.reason, response.headers, response.text)
+            responses = [failed.copy() for _ in records]
+
+        else:
+            ids = response.json().get("Ids", []) if response.text.strip() else []
+            responses = [BatchResponse(204, "No Content") for _ in records]
+
+            for record_response, record_id in zip(responses, ids):
+                record_response.headers["OData-EntityId"] = os.path.join(self.base_url, f"{endpoint}({record_id})")
+
+        if request_id is not None:
+            for index, record_response in enumerate(responses):
+                record_response.headers["REQ_ID"] = f"{request_id}-{index + 1}"
+
+        return responses
+
+    @staticmethod
+    def get_batch_request_id(response) -> str | None:
+
+        _reqid = response.headers.get("req_id")
+        if _reqid is not None:
+            _reqid = _reqid.split(",")[0].strip()
+
+        return _reqid
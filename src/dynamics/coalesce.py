@@ -0,0 +1,42 @@
+class RecordCoalescer:
+    """Coalesces rows of a table, which write the same record, into a single request.
+
+    The table is read twice. In the first pass, ``add`` registers the line of each valid row of a record. In the
+    second pass, ``coalesce`` merges the payloads of all rows of a record into the last of them, later values
+    overriding earlier ones, so the final state of the record is the same as if the rows were sent one by one.
+    Only payloads of records, whose last row was not reached yet, are kept in memory.
+    """
+
+    def __init__(self):
+        self._last_rows = {}
+        self._pending = {}
+        self._added = 0
+
+    @staticmethod
+    def _key(record_id: str) -> str:
+        return record_id.lower()
+
+    def add(self, record_id: str, row_number: int) -> None:
+        self._last_rows[self._key(record_id)] = row_number
+        self._added += 1
+
+    def coalesce(self, record_id: str, row_number: int, data: dict | None) -> tuple[int | None, dict | None]:
+        """Return the line of the row, into which the row was merged, or ``None`` and the merged payload, if the row
+        is the last row of its record."""
+
+        key = self._key(record_id)
+        last_row = self._last_rows.get(key, row_number)
+
+        if row_number < last_row:
+            if data is not None:
+                self._pending[key] = {**self._pending.get(key, {}), **data}
+            return last_row, None
+
+        pending = self._pending.pop(key, None)
+        return None, {**pending, **data} if pending is not None and data is not None else data
+
+    @property
+    def duplicates(self) -> int:
+        """Number of rows, which were registered for records registered before."""
+
+        return self._added - len(self._last_rows)
@@ -0,0 +1,111 @@
+from dynamics.attributes import BIND_SUFFIX, INTEGER_TYPES, LOOKUP_TYPES, NUMBER_TYPES
+
+TRUE_VALUES = {"true", "1", "yes", "y"}
+FALSE_VALUES = {"false", "0", "no", "n"}
+
+
+def to_integer(value: str) -> int:
+    return int(value)
+
+
+def to_float(value: str) -> float:
+    """Convert a number with a decimal point or a decimal comma. A comma is accepted only if it cannot be
+    a thousands separator, i.e. it is the only separator and is not followed by exactly three digits."""
+
+    if "," in value:
+        integer_part, _, fraction = value.partition(",")
+
+        if "." in value or "," in fraction or len(fraction.strip()) == 3:
+            raise ValueError(f"ambiguous decimal separator in '{value}'")
+
+        value = f"{integer_part}.{fraction}"
+
+    return float(value)
+
+
+def to_boolean(value: str) -> bool:
+
+    lowered = value.lower()
+    if lowered in TRUE_VALUES:
+        return True
+
+    if lowered in FALSE_VALUES:
+        return False
+
+    raise ValueError(f"invalid boolean value '{value}'")
+
+
+def to_string(value: str) -> str:
+    return value
+
+
+def get_converter(attribute_type: str | None):
+    """Return a function converting a CSV value to the JSON value of an attribute of the given type."""
+
+    if attribute_type in INTEGER_TYPES:
+        return to_integer
+
+    if attribute_type in NUMBER_TYPES:
+        return to_float
+
+    if attribute_type == "Boolean":
+        return to_boolean
+
+    return to_string
+
+
+class ColumnMapping:
+    """Mapping of input table columns to attributes of an entity, compiled once per table.
+
+    Each column is mapped to the attribute of the same name and its values are converted according to the type
+    of the attribute. Columns named ``<navigation property>@odata.bind`` set lookups, e.g.
+    ``parentaccountid@odata.bind`` with values like ``/accounts(00000000-0000-0000-0000-000000000001)``. Empty
+    values are omitted from the payload, or sent as ``null`` if ``empty_as_null`` is set.
+    """
+
+    def __init__(
+        self,
+        columns: list[str],
+        attribute_types: dict[str, str],
+        excluded_columns: set[str] | None = None,
+        empty_as_null: bool = False,
+    ):
+        self.empty_as_null = empty_as_null
+        self.converters = []
+        self.lookup_columns = []
+
+        for column in columns:
+            if column in (excluded_columns or set()):
+                continue
+
+            attribute_type = attribute_types.get(column)
+            if attribute_type in LOOKUP_TYPES:
+                self.lookup_columns += [column]
+
+            converter = to_string if column.endswith(BIND_SUFFIX) else get_converter(attribute_type)
+            self.converters += [(column, converter)]
+
+    def to_payload(self, row: dict) -> dict:
+        """Build the payload of a row. Raises ``ValueError``, if a value cannot be converted."""
+
+        payload = {}
+
+        for column, converter in self.converters:
+            value = row.get(column) or ""
+
+            if value == "":
+                if self.empty_as_null:
+                    payload[column] = None
+                continue
+
+            try:
+                payload[column] = converter(value)
+            except ValueError:
+                raise ValueError(f"Invalid value '{value}' of column {column}.") from None
+
+        return payload
+
+    def row_values(self, row: dict) -> dict:
+        """Return the unconverted values of the mapped columns of a row."""
+
+        return {column: row.get(column) for column, _ in self.converters}
@@ -0,0 +1,65 @@
+import threading
+import uuid
+
+_MISSING = object()
+
+
+def is_record_id(record_id: str) -> bool:
+    """Return True, if a record is addressed by its GUID, not by an alternate key."""
+
+    try:
+        uuid.UUID(record_id)
+    except ValueError:
+        return False
+
+    return True
+
+
+class RecordIdSet:
+    """Set of records of endpoints, e.g. records already sent in a run. Only hashes of the endpoint and the record ID
+    are kept, so a collision at worst makes a record appear in the set, when it is not."""
+
+    def __init__(self):
+        self._hashes = set()
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: str, record_id: str) -> bool:
+        """Add a record. Returns True, if it was already in the set."""
+
+        record_hash = hash((endpoint.lower(), record_id.lower()))
+
+        with self._lock:
+            if record_hash in self._hashes:
+                return True
+
+            self._hashes.add(record_hash)
+            return False
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+def get_compared_attributes(data: dict) -> list[str]:
+    """Return attributes of a payload, whose current values can be compared, i.e. all but lookups and
+    annotations."""
+
+    return [key for key in data if "@" not in key]
+
+
+def values_equal(value, current) -> bool:
+    """Return True, if a value of a payload equals the current value of an attribute. Numbers are compared
+    by value, e.g. ``10`` equals ``10.0``, but booleans equal only booleans."""
+
+    if isinstance(value, bool) or isinstance(current, bool):
+        return type(value) is type(current) and value == current
+
+    return value == current
+
+
+def get_changed_data(data: dict, current: dict) -> dict:
+    """Return the part of a payload, which differs from the current values of a record. Lookups and annotations
+    cannot be compared and are always kept."""
+
+    return {
+        key: value for key, value in data.items() if "@" in key or not values_equal(value, current.get(key, _MISSING))
+    }
@@ -0,0 +1,106 @@
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+
+# service protection limits of the API per user, see https://learn.microsoft.com/en-us/power-apps/developer/data-platform/api-limits
+LIMIT_WINDOW_SECONDS = 300
+LIMIT_REQUESTS_PER_WINDOW = 6000
+LIMIT_EXECUTION_SECONDS_PER_WINDOW = 1200
+DEFAULT_LATENCY_MS = 200.0
+LATENCY_STATE_KEY = "request_latency_ms"
+
+
+@dataclass
+class EndpointEstimate:
+    endpoint: str
+    rows: Counter = field(default_factory=Counter)
+    invalid_rows: int = 0
+    skipped_rows: int = 0
+    requests: int = 0
+
+
+@dataclass
+class LoadEstimate:
+    """Estimate of the load of writing input tables, based on the latency of requests.
+
+    The runtime is the longest of the time of sending the requests with the configured concurrency and the time,
+    for which the service protection limits allow to send them. The limits allow at most 6000 requests and
+    20 minutes of execution time in any 5 minute window.
+    """
+
+    execution_engine: str
+    concurrency: int
+    latency_ms: float
+    latency_source: str
+    endpoints: list[EndpointEstimate] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def requests(self) -> int:
+        return sum(endpoint.requests for endpoint in self.endpoints)
+
+    @property
+    def invalid_rows(self) -> int:
+        return sum(endpoint.invalid_rows for endpoint in self.endpoints)
+
+    @property
+    def execution_seconds(self) -> float:
+        return self.requests * self.latency_ms / 1000
+
+    @property
+    def limit_windows(self) -> int:
+        """Number of 5 minute windows of the service protection limits needed to send the requests."""
+
+        return max(
+            math.ceil(self.requests / LIMIT_REQUESTS_PER_WINDOW),
+            math.ceil(self.execution_seconds / LIMIT_EXECUTION_SECONDS_PER_WINDOW),
+        )
+
+    @property
+    def runtime_seconds(self) -> float:
+
+        throttled_seconds = (self.limit_windows - 1) * LIMIT_WINDOW_SECONDS if self.limit_windows > 1 else 0
+        return max(self.execution_seconds / max(self.concurrency, 1), throttled_seconds)
+
+    def to_markdown(self) -> str:
+
+        lines = [
+            "| Endpoint | Operation | Rows | Invalid | Skipped | Requests |",
+            "| --- | --- | --- | --- | --- | --- |",
+        ]
+
+        for endpoint in self.endpoints:
+            operations = ", ".join(f"{operation} {count}" for operation, count in sorted(endpoint.rows.items()))
+            lines += [
+                f"| {endpoint.endpoint} | {operations or '-'} | {endpoint.rows.total()} | {endpoint.invalid_rows}"
+                f" | {endpoint.skipped_rows} | {endpoint.requests} |"
+            ]
+
+        request_share = self.requests / LIMIT_REQUESTS_PER_WINDOW
+        execution_share = self.execution_seconds / LIMIT_EXECUTION_SECONDS_PER_WINDOW
+
+        lines += [
+            "",
+            f"Execution engine **{self.execution_engine}**, concurrency **{self.concurrency}**.",
+            f"Estimated **{self.requests}** requests taking **{_duration(self.runtime_seconds)}**, assuming"
+            f" {self.latency_ms:.0f} ms per request ({self.latency_source}).",
+            f"Service protection limits: {request_share:.0%} of requests and {execution_share:.0%} of execution time"
+            f" allowed in a 5 minute window, the load spans {self.limit_windows} window(s).",
+        ]
+
+        if self.errors:
+            lines += ["", f"**{self.invalid_rows} invalid rows**, first of them:", ""]
+            lines += [f"- {error}" for error in self.errors]
+
+        return "\n".join(lines)
+
+
+def _duration(seconds: float) -> str:
+
+    minutes, seconds = divmod(int(math.ceil(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours:
+        return f"{hours} h {minutes} min"
+
+    return f"{minutes} min {seconds} s" if minutes else f"{seconds} s"
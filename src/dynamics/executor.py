@@ -0,0 +1,60 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class OrderedExecutor:
+    """Executes tasks in a thread pool with a bounded number of tasks in flight.
+
+    Results are yielded in the same order as the tasks were submitted, regardless of the order in which they
+    finish. If the consumer stops iterating (e.g. raises an exception), tasks not yet started are cancelled
+    on exit from the context manager.
+
+    Tasks in flight are also bounded by ``max_in_flight_bytes``, the total size of their items, so large items
+    wait for the consumer instead of piling up in memory. At least one task is always in flight.
+    """
+
+    def __init__(self, max_workers: int, max_in_flight: int | None = None, max_in_flight_bytes: int = 0):
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight or max_workers * 2
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self._pool = None
+
+    def __enter__(self):
+        if self.max_workers > 1:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dynamics-writer")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def map(self, fn, items, size=None):
+        """Yield ``(item, fn(item))`` tuples in order of ``items``. ``size(item)`` returns the size of an item
+        in bytes, which counts towards ``max_in_flight_bytes``."""
+
+        if self._pool is None:
+            for item in items:
+                yield item, fn(item)
+            return
+
+        in_flight = deque()
+        in_flight_bytes = 0
+
+        for item in items:
+            item_bytes = size(item) if size is not None and self.max_in_flight_bytes else 0
+
+            while in_flight and (
+                len(in_flight) >= self.max_in_flight
+                or (self.max_in_flight_bytes and in_flight_bytes + item_bytes > self.max_in_flight_bytes)
+            ):
+                done_item, done_bytes, future = in_flight.popleft()
+                in_flight_bytes -= done_bytes
+                yield done_item, future.result()
+
+            in_flight.append((item, item_bytes, self._pool.submit(fn, item)))
+            in_flight_bytes += item_bytes
+
+        while in_flight:
+            done_item, _, future = in_flight.popleft()
+            yield done_item, future.result()
@@ -0,0 +1,142 @@
+import threading
+from collections import OrderedDict
+
+IN_FILTER_VALUES = 100
+NOT_FOUND = ""
+AMBIGUOUS = "*"
+
+
+class LookupKeyError(ValueError):
+    pass
+
+
+def parse_lookup_key(value) -> tuple[str, str]:
+    """Parse the natural key of a lookup, either ``"accountnumber=A-1"`` or ``{"accountnumber": "A-1"}``."""
+
+    if isinstance(value, dict) and len(value) == 1:
+        attribute, key_value = next(iter(value.items()))
+
+    elif isinstance(value, str) and "=" in value:
+        attribute, _, key_value = value.partition("=")
+
+    else:
+        raise LookupKeyError(f"Invalid lookup key {value}, expected a single attribute, e.g. accountnumber=A-1.")
+
+    if not str(attribute).strip() or key_value is None or str(key_value) == "":
+        raise LookupKeyError(f"Invalid lookup key {value}, the attribute and its value must not be empty.")
+
+    return str(attribute).strip(), str(key_value)
+
+
+class LookupResolver:
+    """Resolves lookups by natural keys, e.g. ``parentaccountid@key: accountnumber=A-1``, to IDs of records.
+
+    Resolved IDs are kept in an LRU index of at most ``max_entries`` keys, including keys without a matching
+    record. Keys missing in the index are resolved in batches of ``Microsoft.Dynamics.CRM.In`` queries by
+    ``find_records(entity_set, id_attribute, attribute, values)``. If ``prefetch`` is set, all records of
+    a referenced entity are read into the index on its first use, with ``values`` set to ``None``; if they all
+    fit into the index, keys missing in it are known not to exist and are not queried. Targets of navigation
+    properties are kept for the whole run, see ``get_target``.
+    """
+
+    def __init__(self, find_records, max_entries: int, prefetch: bool = False, batch_size: int = IN_FILTER_VALUES):
+        self.find_records = find_records
+        self.max_entries = max_entries
+        self.prefetch = prefetch
+        self.batch_size = batch_size
+
+        self._index = OrderedDict()
+        self._complete = set()
+        self._prefetched = set()
+        self._targets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(entity_set: str, attribute: str, value: str) -> tuple:
+        return entity_set, attribute.lower(), value.lower()
+
+    def get_target(self, endpoint: str, navigation_property: str, find_target) -> tuple[str, str]:
+        """Return the entity set and ID attribute of records referenced by a navigation property of an endpoint.
+        They are found by ``find_target(endpoint, navigation_property)`` on the first use, which raises
+        ``LookupKeyError``, if the navigation property is not a lookup; the error is raised again on further uses."""
+
+        key = (endpoint.lower(), navigation_property)
+
+        if key not in self._targets:
+            try:
+                self._targets[key] = find_target(endpoint, navigation_property)
+            except LookupKeyError as e:
+                self._targets[key] = str(e)
+
+        target = self._targets[key]
+        if isinstance(target, str):
+            raise LookupKeyError(target)
+
+        return target
+
+    def resolve(self, entity_set: str, id_attribute: str, attribute: str, values) -> dict[str, str]:
+        """Return IDs of records of an entity set by values of an attribute. Values without a matching record
+        are mapped to ``NOT_FOUND``, values matching more records to ``AMBIGUOUS``."""
+
+        if self.prefetch and (entity_set, attribute.lower()) not in self._prefetched:
+            self._prefetch(entity_set, id_attribute, attribute)
+
+        resolved = {}
+        missing = []
+
+        with self._lock:
+            complete = (entity_set, attribute.lower()) in self._complete
+
+            for value in set(values):
+                key = self._key(entity_set, attribute, value)
+
+                if key in self._index:
+                    self._index.move_to_end(key)
+                    resolved[value] = self._index[key]
+                elif complete:
+                    resolved[value] = NOT_FOUND
+                else:
+                    missing += [value]
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            found = self._group(self.find_records(entity_set, id_attribute, attribute, batch))
+
+            with self._lock:
+                for value in batch:
+                    resolved[value] = found.get(value.lower(), NOT_FOUND)
+                    self._add(self._key(entity_set, attribute, value), resolved[value])
+
+        return resolved
+
+    def _prefetch(self, entity_set: str, id_attribute: str, attribute: str) -> None:
+
+        found = self._group(self.find_records(entity_set, id_attribute, attribute, None))
+
+        with self._lock:
+            self._prefetched.add((entity_set, attribute.lower()))
+
+            for value, record_id in found.items():
+                self._add(self._key(entity_set, attribute, value), record_id)
+
+            if len(found) <= self.max_entries:
+                self._complete.add((entity_set, attribute.lower()))
+
+    @staticmethod
+    def _group(records) -> dict[str, str]:
+
+        found = {}
+        for value, record_id in records:
+            key = str(value).lower()
+            found[key] = AMBIGUOUS if found.get(key, record_id) != record_id else record_id
+
+        return found
+
+    def _add(self, key: tuple, record_id: str) -> None:
+
+        self._index[key] = record_id
+        self._index.move_to_end(key)
+
+        while len(self._index) > self.max_entries:
+            evicted = self._index.popitem(last=False)[0]
+            self._complete.discard(evicted[:2])
@@ -0,0 +1,67 @@
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class CachedMetadata:
+    value: object
+    fetched_at: float
+    etag: str | None = None
+    fresh: bool = True
+
+
+class MetadataCache:
+    """Cache of entity metadata, which is persisted between runs in the component state file.
+
+    Entries are keyed by organization URL, API version and metadata name (e.g. attributes of an entity).
+    An entry is fresh for ``ttl_hours`` after it was fetched. Stale entries are revalidated with their ETag,
+    if the API provided one, otherwise they are fetched again. ``force_refresh`` marks all entries fetched before
+    the cache was created, i.e. in previous runs, as stale. Entries fetched during the run stay fresh.
+    """
+
+    STATE_KEY = "metadata_cache"
+
+    def __init__(
+        self, state: dict | None, organization_url: str, api_version: str, ttl_hours: float, force_refresh=False
+    ):
+        self._entries = dict((state or {}).get(self.STATE_KEY, {}))
+        self._prefix = f"{organization_url.rstrip('/').lower()}|{api_version}|"
+        self.ttl = ttl_hours * 3600
+        self.force_refresh = force_refresh
+        self._created_at = time.time()
+
+    def get(self, name: str) -> CachedMetadata | None:
+
+        entry = self._entries.get(self._prefix + name)
+        if entry is None:
+            return None
+
+        if self.force_refresh and entry["fetched_at"] < self._created_at:
+            fresh = False
+        else:
+            fresh = time.time() - entry["fetched_at"] < self.ttl
+        return CachedMetadata(entry["value"], entry["fetched_at"], entry.get("etag"), fresh)
+
+    def set(self, name: str, value, etag: str | None = None) -> None:
+
+        self._entries[self._prefix + name] = {"value": value, "fetched_at": time.time(), "etag": etag}
+
+    def touch(self, name: str) -> None:
+        """Mark an entry as fresh after it was successfully revalidated."""
+
+        self._entries[self._prefix + name]["fetched_at"] = time.time()
+
+    def remove(self, name: str) -> None:
+
+        self._entries.pop(self._prefix + name, None)
+
+    def to_state(self) -> dict:
+        """Return the cache in the form stored in the state file. Expired entries without ETag are dropped."""
+
+        now = time.time()
+        return {
+            key: entry
+            # a copy of the items, as entries may be added by other threads
+            for key, entry in list(self._entries.items())
+            if entry.get("etag") is not None or now - entry["fetched_at"] < self.ttl
+        }
@@ -0,0 +1,67 @@
+import ast
+import json
+import math
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a dependency, the json module is used only if it is missing
+    orjson = None
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def reject_constant(name: str):
+    raise ValueError(f"{name} is not a valid JSON value.")
+
+
+def parse_finite_float(value: str) -> float:
+
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{value} is out of the range of JSON numbers.")
+
+    return number
+
+
+def parse_payload(payload: str):
+    """Parse the ``data`` column of a row. Returns ``None``, if it is neither valid JSON nor a Python literal, or if
+    it cannot be sent as JSON, e.g. because it contains ``NaN`` or infinite numbers.
+
+    JSON is decoded by ``orjson``, which rejects non-finite numbers like the API does, or by the ``json`` module
+    with the same restriction. Python dictionary representations, e.g. with single quoted strings or
+    ``True``/``None``, are parsed by ``ast.literal_eval``, which evaluates literals only.
+    """
+
+    try:
+        if orjson is not None:
+            return orjson.loads(payload)
+
+        return json.loads(payload, parse_constant=reject_constant, parse_float=parse_finite_float)
+    except ValueError:
+        pass
+
+    try:
+        data = ast.literal_eval(payload.strip())
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+    try:
+        # literals may contain values without a JSON representation, e.g. sets or numbers like 1e999
+        json.dumps(data, allow_nan=False)
+    except (ValueError, TypeError, RecursionError):
+        return None
+
+    return data
+
+
+def dump_payload(data) -> bytes:
+    """Serialize a request body to compact UTF-8 encoded JSON."""
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # e.g. integers out of the 64-bit range or non-string keys parsed from Python literals
+            pass
+
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode("utf-8")
@@ -0,0 +1,133 @@
+import csv
+import gzip
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 500
+QUEUE_CHUNKS = 4
+_END_OF_SLICE = object()
+
+
+def get_slice_paths(table) -> list[str]:
+    """Return paths of all data files of a table. A sliced table is a directory of slices."""
+
+    if not os.path.isdir(table.full_path):
+        return [table.full_path]
+
+    return sorted(
+        os.path.join(table.full_path, name)
+        for name in os.listdir(table.full_path)
+        if not name.endswith(".manifest") and os.path.isfile(os.path.join(table.full_path, name))
+    )
+
+
+def open_slice(path: str):
+    """Open a data file as text, decompressing gzipped files."""
+
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+
+    return open(path, newline="")
+
+
+def get_table_columns(table) -> list[str]:
+    """Return column names of a table.
+
+    Slices of sliced tables have no header, so their columns are taken from the manifest. If the manifest
+    does not list any, the first line of the first slice is used.
+    """
+
+    if os.path.isdir(table.full_path) and table.column_names:
+        return list(table.column_names)
+
+    slice_paths = get_slice_paths(table)
+    if not slice_paths:
+        return []
+
+    with open_slice(slice_paths[0]) as in_slice:
+        return next(csv.reader(in_slice), [])
+
+
+def iter_table_rows(table, max_readers: int = 1):
+    """Yield rows of a table as dictionaries.
+
+    Slices of a sliced table are read by up to ``max_readers`` threads in parallel, while rows are yielded
+    in order of slices. Each reader buffers at most ``QUEUE_CHUNKS`` chunks of ``CHUNK_SIZE`` rows, so the
+    memory used does not depend on the size of the table.
+    """
+
+    slice_paths = get_slice_paths(table)
+
+    if not os.path.isdir(table.full_path):
+        with open_slice(table.full_path) as in_table:
+            yield from csv.DictReader(in_table)
+        return
+
+    # without columns in the manifest, the first slice starts with a header
+    has_header = not table.column_names
+    columns = get_table_columns(table)
+
+    if max_readers <= 1 or len(slice_paths) <= 1:
+        for index, path in enumerate(slice_paths):
+            with open_slice(path) as in_slice:
+                reader = csv.DictReader(in_slice, fieldnames=columns)
+                if index == 0 and has_header:
+                    next(reader, None)
+                yield from reader
+        return
+
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=QUEUE_CHUNKS) for _ in slice_paths]
+
+    with ThreadPoolExecutor(max_workers=max_readers, thread_name_prefix="slice-reader") as pool:
+        for index, path in enumerate(slice_paths):
+            pool.submit(_read_slice, path, columns, index == 0 and has_header, queues[index], stop)
+
+        try:
+            for slice_queue in queues:
+                while (chunk := slice_queue.get()) is not _END_OF_SLICE:
+                    if isinstance(chunk, BaseException):
+                        raise chunk
+                    yield from chunk
+
+        finally:
+            stop.set()
+
+
+def _read_slice(path, columns, skip_header, slice_queue, stop) -> None:
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                slice_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        if stop.is_set():
+            return
+
+        with open_slice(path) as in_slice:
+            reader = csv.DictReader(in_slice, fieldnames=columns)
+            if skip_header:
+                next(reader, None)
+
+            chunk = []
+            for row in reader:
+                chunk.append(row)
+                if len(chunk) >= CHUNK_SIZE:
+                    if not put(chunk):
+                        return
+                    chunk = []
+
+            if chunk and not put(chunk):
+                return
+
+        put(_END_OF_SLICE)
+
+    except Exception as e:
+        put(e)
@@ -1,7 +1,8 @@
 import csv
-import hashlib
+import gzip
 import json
 import os
+import threading
 import time
 
 FIELDS_RESULTS = [
@@ -15,13 +16,35 @@ FIELDS_RESULTS = [
     "operation_response",
 ]
 PK_RESULTS = ["request_id"]
+FLUSH_ROWS = 1000
 
 
 class DynamicsResultsWriter:
-    def __init__(self, data_out_path):
+    """Writer of the results table.
+
+    Rows are buffered and written to the file in chunks of ``flush_rows``. If ``slice_rows`` is set or
+    ``compress`` is enabled, the results are written as a sliced table, i.e. a folder of slices with at most
+    ``slice_rows`` rows each, optionally gzipped. The writer must be closed to write the buffered rows.
+    The writer can be shared by threads writing different tables.
+    """
+
+    def __init__(self, data_out_path, flush_rows: int = FLUSH_ROWS, slice_rows: int = 0, compress: bool = False):
 
         self.parDataOutPath = data_out_path
         self.parTablePath = os.path.join(self.parDataOutPath, "results.csv")
+        self.flush_rows = max(1, flush_rows)
+        self.slice_rows = slice_rows
+        self.compress = compress
+        self.is_sliced = slice_rows > 0 or compress
+
+        self._buffer = []
+        self._closed = False
+        self._slice_count = 0
+        self._slice_row_count = 0
+
+        self._run_id = str(int(time.time() * 1000))
+        self._sequence = 0
+        self._lock = threading.RLock()
 
         self._create_manifest()
         self._create_writer()
@@ -35,26 +58,85 @@ class DynamicsResultsWriter:
 
     def _create_writer(self):
 
-        self.writer = csv.DictWriter(
-            open(self.parTablePath, "w"),
-            fieldnames=FIELDS_RESULTS,
-            restval="",
-            extrasaction="ignore",
-            quotechar='"',
-            quoting=csv.QUOTE_ALL,
-        )
+        if self.is_sliced:
+            os.makedirs(self.parTablePath, exist_ok=True)
+            self._slice_count += 1
+            self._slice_row_count = 0
+            slice_path = os.path.join(self.parTablePath, f"results_{self._slice_count:04d}.csv")
+
+            if self.compress:
+                self._file = gzip.open(slice_path + ".gz", "wt", newline="")
+            else:
+                self._file = open(slice_path, "w", newline="")
 
-    def writerow(self, row_dict, endpoint, operation, request_id=None):
+        else:
+            self._file = open(self.parTablePath, "w", newline="")
+
+        self._writer = csv.writer(self._file, quotechar='"', quoting=csv.QUOTE_ALL)
+
+    def writerow(self, row_dict, endpoint, operation, request_id=None, status=None):
+        """Buffer a result row.
+
+        Columns ``id`` and ``data`` are taken from ``row_dict``. The operation status and response are taken
+        from ``status``, or from ``row_dict``, if ``status`` is not provided.
+        """
 
         write_time = str(int(time.time() * 1000))
+        status = status if status is not None else row_dict
+
+        with self._lock:
+            if request_id is None:
+                self._sequence += 1
+                request_id = f"{self._run_id}-{self._sequence}"
+
+            self._buffer.append(
+                [
+                    request_id,
+                    write_time,
+                    endpoint,
+                    operation,
+                    row_dict.get("id", ""),
+                    row_dict.get("data", ""),
+                    status.get("operation_status", ""),
+                    status.get("operation_response", ""),
+                ]
+            )
+
+            if len(self._buffer) >= self.flush_rows:
+                self.flush()
+
+    def flush(self):
+
+        with self._lock:
+            rows = self._buffer
+            self._buffer = []
+
+            while rows:
+                if self.slice_rows > 0 and self._slice_row_count >= self.slice_rows:
+                    self._file.close()
+                    self._create_writer()
+
+                capacity = self.slice_rows - self._slice_row_count if self.slice_rows > 0 else len(rows)
+                self._writer.writerows(rows[:capacity])
+                self._slice_row_count += len(rows[:capacity])
+                rows = rows[capacity:]
+
+            self._file.flush()
+
+    def close(self):
+
+        with self._lock:
+            if self._closed:
+                return
 
-        if request_id is None:
-            encode_string = "|".join([write_time, endpoint, operation, str(row_dict)])
-            request_id = hashlib.md5(encode_string.encode()).hexdigest()
+            try:
+                self.flush()
+            finally:
+                self._file.close()
+                self._closed = True
 
-        write_dict = {
-            **row_dict,
-            **{"request_id": request_id, "endpoint": endpoint, "operation": operation, "timestamp": write_time},
-        }
+    def __enter__(self):
+        return self
 
-        self.writer.writerow(write_dict)
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
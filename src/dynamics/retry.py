@@ -0,0 +1,50 @@
+import requests
+
+# timeouts, throttling and server errors, which usually succeed when sent again later
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+RETRY_QUEUE_MAX_ROWS = 10000
+
+
+def is_transient_failure(response) -> bool:
+    """Return True, if a request failed with an error, which may not occur when the request is sent again, i.e.
+    a connection error or timeout, or one of ``RETRYABLE_STATUS_CODES``."""
+
+    if isinstance(response, requests.RequestException):
+        return True
+
+    return response.status_code in RETRYABLE_STATUS_CODES
+
+
+class RetryQueue:
+    """Records of a table, whose requests failed with a transient error, deferred to be sent again after the rest
+    of the table. At most ``max_rows`` records are kept, further records are not deferred."""
+
+    def __init__(self, max_rows: int = RETRY_QUEUE_MAX_ROWS):
+        self.max_rows = max_rows
+        self._records = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record) -> bool:
+        """Defer a record. Returns False, if the queue is full and the record was not deferred."""
+
+        if len(self._records) >= self.max_rows:
+            return False
+
+        self._records.append(record)
+        return True
+
+    @property
+    def first_row_number(self) -> int | None:
+        """Line of the first deferred row, rows from which are not written yet, or ``None``, if the queue is empty."""
+
+        # records are deferred in order of their rows
+        return self._records[0].row_number if self._records else None
+
+    def drain(self) -> list:
+        """Remove and return all deferred records in order of their rows."""
+
+        records = self._records
+        self._records = []
+        return records
@@ -0,0 +1,111 @@
+from collections import Counter
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class TableScheduler:
+    """Runs tasks writing input tables, at most ``max_workers`` of them at once.
+
+    Each task belongs to an endpoint. A task starts only after all tasks of the endpoints, which its endpoint
+    depends on, finished, e.g. contacts binding to accounts are written after all tables of accounts. Ready
+    tasks are started in the order, in which they were given. Endpoints without any task do not block
+    their dependents.
+    """
+
+    def __init__(self, max_workers: int, dependencies: dict[str, list[str]] | None = None):
+        self.max_workers = max_workers
+        self.dependencies = {
+            endpoint.lower(): {dependency.lower() for dependency in depends_on} - {endpoint.lower()}
+            for endpoint, depends_on in (dependencies or {}).items()
+        }
+
+    def run(self, tasks: Sequence[tuple[str, Callable]]) -> list:
+        """Run ``(endpoint, fn)`` tasks and return their results in the order of the tasks.
+
+        If a task fails, no further tasks are started and its exception is raised, once the running tasks finish.
+        """
+
+        results = [None] * len(tasks)
+        pending = [(index, endpoint.lower(), fn) for index, (endpoint, fn) in enumerate(tasks)]
+        remaining = Counter(endpoint for _, endpoint, _ in pending)
+
+        if self.max_workers <= 1:
+            while pending:
+                index, endpoint, fn = self._pop_ready(pending, remaining)
+                results[index] = fn()
+                remaining[endpoint] -= 1
+
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dynamics-table") as pool:
+            running = {}
+
+            while pending or running:
+                while pending and len(running) < self.max_workers and self._has_ready(pending, remaining):
+                    index, endpoint, fn = self._pop_ready(pending, remaining)
+                    running[pool.submit(fn)] = (index, endpoint)
+
+                if not running:
+                    raise self._cycle_error(pending)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index, endpoint = running.pop(future)
+                    results[index] = future.result()
+                    remaining[endpoint] -= 1
+
+        return results
+
+    def _is_ready(self, endpoint: str, remaining: Counter) -> bool:
+        return all(remaining[dependency] == 0 for dependency in self.dependencies.get(endpoint, ()))
+
+    def _has_ready(self, pending: list, remaining: Counter) -> bool:
+        return any(self._is_ready(endpoint, remaining) for _, endpoint, _ in pending)
+
+    def _pop_ready(self, pending: list, remaining: Counter) -> tuple:
+
+        for position, (_, endpoint, _) in enumerate(pending):
+            if self._is_ready(endpoint, remaining):
+                return pending.pop(position)
+
+        raise self._cycle_error(pending)
+
+    @staticmethod
+    def _cycle_error(pending: list) -> ValueError:
+        return ValueError(f"Dependencies of endpoints {sorted({endpoint for _, endpoint, _ in pending})} form a cycle.")
+
+
+def find_dependency_cycle(dependencies: dict[str, list[str]]) -> list[str] | None:
+    """Return endpoints forming a cycle of dependencies, e.g. ``["accounts", "contacts", "accounts"]``, or
+    ``None``, if there is no cycle."""
+
+    graph = {
+        endpoint.lower(): [dependency.lower() for dependency in depends_on if dependency.lower() != endpoint.lower()]
+        for endpoint, depends_on in dependencies.items()
+    }
+    visited = set()
+
+    def visit(endpoint: str, path: list[str]) -> list[str] | None:
+
+        if endpoint in path:
+            return path[path.index(endpoint) :] + [endpoint]
+
+        if endpoint in visited:
+            return None
+
+        visited.add(endpoint)
+
+        for dependency in graph.get(endpoint, []):
+            cycle = visit(dependency, path + [endpoint])
+            if cycle is not None:
+                return cycle
+
+        return None
+
+    for endpoint in graph:
+        cycle = visit(endpoint, [])
+        if cycle is not None:
+            return cycle
+
+    return None
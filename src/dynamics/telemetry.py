@@ -0,0 +1,259 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+PROGRESS_INTERVAL = 60.0
+METADATA_ENDPOINT = "metadata"
+
+FIELDS_SUMMARY = [
+    "run_id",
+    "endpoint",
+    "operation",
+    "rows",
+    "rows_failed",
+    "rows_skipped",
+    "rows_per_second",
+    "requests",
+    "retries",
+    "throttled",
+    "request_errors",
+    "bytes_sent",
+    "bytes_received",
+    "latency_avg_ms",
+    "latency_p50_ms",
+    "latency_p95_ms",
+    "latency_p99_ms",
+    "latency_max_ms",
+    "latency_histogram",
+]
+PK_SUMMARY = ["run_id", "endpoint", "operation"]
+
+
+@dataclass
+class OperationMetrics:
+    rows: int = 0
+    rows_failed: int = 0
+    rows_skipped: int = 0
+    first_row_at: float | None = None
+    last_row_at: float | None = None
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    request_errors: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    latency_buckets: list = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def record_latency(self, latency_ms: float) -> None:
+
+        self.latency_total += latency_ms
+        self.latency_max = max(self.latency_max, latency_ms)
+
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                self.latency_buckets[index] += 1
+                return
+
+        self.latency_buckets[-1] += 1
+
+    def latency_percentile(self, percentile: float) -> float:
+        """Estimate a latency percentile as the upper bound of the histogram bucket, which contains it."""
+
+        total = sum(self.latency_buckets)
+        if total == 0:
+            return 0.0
+
+        rank = percentile / 100 * total
+        count = 0
+
+        for index, bucket_count in enumerate(self.latency_buckets):
+            count += bucket_count
+            if count >= rank:
+                return float(LATENCY_BUCKETS_MS[index]) if index < len(LATENCY_BUCKETS_MS) else self.latency_max
+
+        return self.latency_max
+
+    @property
+    def rows_per_second(self) -> float:
+
+        if self.first_row_at is None or self.last_row_at is None or self.last_row_at <= self.first_row_at:
+            return 0.0
+
+        return self.rows / (self.last_row_at - self.first_row_at)
+
+    def histogram(self) -> dict:
+
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {label: count for label, count in zip(labels, self.latency_buckets) if count}
+
+
+class Telemetry:
+    """Performance metrics of a run, aggregated per endpoint and operation.
+
+    Requests are recorded by ``DynamicsClient`` and attributed to the endpoint and operation set by ``scope``
+    in the thread sending the request; requests outside of any scope are attributed to metadata. Processed rows
+    are recorded by the component. A progress line is logged at most every ``progress_interval`` seconds and
+    a summary of the run is written as a table next to the results table.
+    """
+
+    def __init__(self, progress_interval: float = PROGRESS_INTERVAL):
+        self.progress_interval = progress_interval
+        self.run_id = str(int(time.time() * 1000))
+
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._scope = threading.local()
+        self._started_at = time.monotonic()
+        self._last_progress_at = self._started_at
+
+    def _get(self, endpoint: str, operation: str) -> OperationMetrics:
+
+        key = (endpoint, operation)
+        if key not in self._metrics:
+            self._metrics[key] = OperationMetrics()
+
+        return self._metrics[key]
+
+    @contextmanager
+    def scope(self, endpoint: str, operation: str):
+        """Attribute requests sent by the current thread to an endpoint and operation."""
+
+        previous = getattr(self._scope, "value", None)
+        self._scope.value = (endpoint, operation)
+        try:
+            yield
+        finally:
+            self._scope.value = previous
+
+    def record_request(
+        self,
+        method: str,
+        status_code: int | None,
+        elapsed: float,
+        attempt: int = 0,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        """Record a single attempt of a request. ``attempt`` is 0 for the first attempt, retries are counted."""
+
+        endpoint, operation = getattr(self._scope, "value", None) or (METADATA_ENDPOINT, method)
+
+        with self._lock:
+            metrics = self._get(endpoint, operation)
+            metrics.requests += 1
+            metrics.retries += int(attempt > 0)
+            metrics.throttled += int(status_code == 429)
+            metrics.request_errors += int(status_code is None or status_code >= 400)
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+            metrics.record_latency(elapsed * 1000)
+
+    def record_rows(self, endpoint: str, operation: str, rows: int, failed: int = 0, skipped: int = 0) -> None:
+
+        now = time.monotonic()
+
+        with self._lock:
+            metrics = self._get(endpoint, operation)
+            metrics.rows += rows
+            metrics.rows_failed += failed
+            metrics.rows_skipped += skipped
+            metrics.first_row_at = metrics.first_row_at if metrics.first_row_at is not None else now
+            metrics.last_row_at = now
+
+    def _totals(self) -> OperationMetrics:
+
+        totals = OperationMetrics()
+
+        with self._lock:
+            for metrics in self._metrics.values():
+                totals.rows += metrics.rows
+                totals.rows_failed += metrics.rows_failed
+                totals.rows_skipped += metrics.rows_skipped
+                totals.requests += metrics.requests
+                totals.retries += metrics.retries
+                totals.throttled += metrics.throttled
+                totals.bytes_sent += metrics.bytes_sent
+                totals.latency_max = max(totals.latency_max, metrics.latency_max)
+                totals.latency_buckets = [a + b for a, b in zip(totals.latency_buckets, metrics.latency_buckets)]
+
+        return totals
+
+    def average_latency_ms(self, metadata: bool = False) -> float | None:
+        """Return the average latency of requests writing records, or of metadata requests, if ``metadata`` is set.
+        Returns ``None``, if there were no such requests."""
+
+        with self._lock:
+            selected = [m for (endpoint, _), m in self._metrics.items() if (endpoint == METADATA_ENDPOINT) == metadata]
+
+        requests = sum(metrics.requests for metrics in selected)
+        return sum(metrics.latency_total for metrics in selected) / requests if requests else None
+
+    def log_progress(self, force: bool = False) -> None:
+        """Log the progress of the run, if ``progress_interval`` passed since the last progress line."""
+
+        now = time.monotonic()
+        if not force and now - self._last_progress_at < self.progress_interval:
+            return
+
+        self._last_progress_at = now
+        totals = self._totals()
+        elapsed = max(now - self._started_at, 1e-9)
+
+        logging.info(
+            f"Progress: {totals.rows} rows processed ({totals.rows / elapsed:.1f} rows/s), "
+            f"{totals.rows_failed} failed, {totals.rows_skipped} skipped. {totals.requests} requests, "
+            f"{totals.retries} retries, {totals.throttled} throttled, {totals.bytes_sent / 1024 / 1024:.1f} MB sent. "
+            f"Latency p50 {totals.latency_percentile(50):.0f} ms, p99 {totals.latency_percentile(99):.0f} ms."
+        )
+
+    def summary_rows(self) -> list[dict]:
+
+        rows = []
+
+        with self._lock:
+            for (endpoint, operation), metrics in sorted(self._metrics.items()):
+                rows += [
+                    {
+                        "run_id": self.run_id,
+                        "endpoint": endpoint,
+                        "operation": operation,
+                        "rows": metrics.rows,
+                        "rows_failed": metrics.rows_failed,
+                        "rows_skipped": metrics.rows_skipped,
+                        "rows_per_second": round(metrics.rows_per_second, 2),
+                        "requests": metrics.requests,
+                        "retries": metrics.retries,
+                        "throttled": metrics.throttled,
+                        "request_errors": metrics.request_errors,
+                        "bytes_sent": metrics.bytes_sent,
+                        "bytes_received": metrics.bytes_received,
+                        "latency_avg_ms": round(metrics.latency_total / metrics.requests, 2) if metrics.requests else 0,
+                        "latency_p50_ms": metrics.latency_percentile(50),
+                        "latency_p95_ms": metrics.latency_percentile(95),
+                        "latency_p99_ms": metrics.latency_percentile(99),
+                        "latency_max_ms": round(metrics.latency_max, 2),
+                        "latency_histogram": json.dumps(metrics.histogram()),
+                    }
+                ]
+
+        return rows
+
+    def write_summary(self, data_out_path: str) -> None:
+        """Write the run summary table ``run_summary.csv`` with its manifest."""
+
+        table_path = os.path.join(data_out_path, "run_summary.csv")
+
+        with open(table_path + ".manifest", "w") as manifest:
+            json.dump({"incremental": True, "primary_key": PK_SUMMARY, "columns": FIELDS_SUMMARY}, manifest)
+
+        with open(table_path, "w", newline="") as out_table:
+            writer = csv.DictWriter(out_table, FIELDS_SUMMARY, quotechar='"', quoting=csv.QUOTE_ALL)
+            writer.writerows(self.summary_rows())
@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+HEADER_RETRY_AFTER = "Retry-After"
+HEADER_BURST_REMAINING = "x-ms-ratelimit-burst-remaining-xrm-requests"
+HEADER_TIME_REMAINING = "x-ms-ratelimit-time-remaining-xrm-requests"
+
+
+class AdaptiveRateController:
+    """Adjusts the number of concurrent requests to the Dataverse service protection limits.
+
+    The controller follows the AIMD (additive increase, multiplicative decrease) scheme. The concurrency limit
+    is halved whenever the API throttles a request (HTTP 429) or the ``x-ms-ratelimit-*`` headers report that
+    the remaining capacity of the current window dropped below ``headroom``. Once the concurrency limit is at its
+    minimum, a delay between requests is introduced instead. The limit increases by one after each round
+    of successful requests with sufficient headroom.
+
+    All requests wait for the period requested by the ``Retry-After`` header of a throttled response.
+    """
+
+    MAX_DELAY = 5.0
+    MIN_DELAY = 0.05
+    DEFAULT_RETRY_AFTER = 5.0
+
+    def __init__(self, max_concurrency: int, headroom: float = 0.1, log_interval: float = 60.0):
+        self.max_concurrency = max_concurrency
+        self.headroom = headroom
+        self.log_interval = log_interval
+
+        self.limit = max_concurrency
+        self.delay = 0.0
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._next_start_at = 0.0
+        self._capacity = {}
+
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                wait = max(self._resume_at, self._next_start_at) - now
+
+                if wait > 0:
+                    self._condition.wait(wait)
+
+                elif self._in_flight >= self.limit:
+                    self._condition.wait()
+
+                else:
+                    self._in_flight += 1
+                    self._next_start_at = now + self.delay
+                    return
+
+    def release(self, response=None) -> None:
+        """Record the response of a request sent after ``acquire`` and adjust the rate accordingly."""
+
+        with self._condition:
+            self._in_flight -= 1
+            self._window_requests += 1
+
+            if response is not None and response.status_code == 429:
+                self._throttled(response)
+
+            elif response is not None and self._below_headroom(response.headers):
+                # after a decrease, wait for a round of responses at the new limit before decreasing again
+                if self._successes >= 0:
+                    self._decrease("remaining service protection capacity is low")
+                    self._successes = -self.limit
+                else:
+                    self._successes += 1
+
+            elif response is not None and response.status_code < 400:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self._successes = 0
+                    self._increase()
+
+            self._log_rate()
+            self._condition.notify_all()
+
+    def _throttled(self, response) -> None:
+
+        retry_after = parse_retry_after(response.headers.get(HEADER_RETRY_AFTER), self.DEFAULT_RETRY_AFTER)
+        now = time.monotonic()
+
+        # only decrease once per throttling period, not for every request throttled at the same time
+        if now >= self._resume_at:
+            self._decrease(f"request throttled by the API, pausing for {retry_after:.1f}s")
+
+        self._resume_at = max(self._resume_at, now + retry_after)
+        self._successes = 0
+
+    def _below_headroom(self, headers) -> bool:
+
+        for header in (HEADER_BURST_REMAINING, HEADER_TIME_REMAINING):
+            remaining = parse_remaining(headers.get(header))
+            if remaining is None:
+                continue
+
+            capacity = self._capacity[header] = max(self._capacity.get(header, 0.0), remaining)
+            if capacity > 0 and remaining / capacity < self.headroom:
+                return True
+
+        return False
+
+    def _decrease(self, reason: str) -> None:
+
+        if self.limit > 1:
+            self.limit = max(1, self.limit // 2)
+        else:
+            self.delay = min(self.MAX_DELAY, max(self.MIN_DELAY, self.delay * 2))
+
+        logging.warning(
+            f"Adaptive throttling: {reason}. Concurrency limit decreased to {self.limit}, "
+            f"delay between requests {self.delay:.2f}s."
+        )
+
+    def _increase(self) -> None:
+
+        if self.delay > 0:
+            self.delay = self.delay / 2 if self.delay / 2 >= self.MIN_DELAY else 0.0
+
+        elif self.limit < self.max_concurrency:
+            self.limit += 1
+
+        else:
+            return
+
+        logging.info(
+            f"Adaptive throttling: concurrency limit increased to {self.limit}, "
+            f"delay between requests {self.delay:.2f}s."
+        )
+
+    def _log_rate(self) -> None:
+
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < self.log_interval:
+            return
+
+        logging.info(
+            f"Current request rate: {self._window_requests / elapsed:.1f} requests/s, "
+            f"concurrency limit {self.limit}, delay between requests {self.delay:.2f}s."
+        )
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+    """Parse the ``Retry-After`` header, which contains either seconds or an HTTP date."""
+
+    if not value:
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_remaining(value: str | None) -> float | None:
+    """Parse ``x-ms-ratelimit-*`` header values, which are either numbers or ``hh:mm:ss`` durations."""
+
+    if not value:
+        return None
+
+    try:
+        if ":" in value:
+            hours, minutes, seconds = value.split(":")
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+        return float(value.replace(",", ""))
+
+    except ValueError:
+        return None
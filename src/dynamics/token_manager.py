@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import threading
+import time
+
+import requests
+from keboola.component import UserException
+
+REFRESH_MARGIN_SECONDS = 300
+DEFAULT_EXPIRES_IN_SECONDS = 3600
+
+
+class TokenManager:
+    """Access token of the Dynamics API, which is refreshed before it expires.
+
+    The token is shared by all threads using the client. A thread, which finds the token expired or about to
+    expire within ``refresh_margin`` seconds, refreshes it, while the other threads wait for the new token.
+    If the token endpoint rotates the refresh token, the new refresh token is used for further refreshes and
+    is persisted in the component state, see ``to_state`` and ``restore_refresh_token``.
+    """
+
+    STATE_KEY = "auth"
+
+    def __init__(
+        self,
+        login_url: str,
+        client_id: str,
+        client_secret: str,
+        resource_url: str,
+        refresh_token: str,
+        refresh_margin: float = REFRESH_MARGIN_SECONDS,
+        fallback_refresh_token: str | None = None,
+    ):
+        self.login_url = login_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.resource_url = resource_url
+        self.refresh_token = refresh_token
+        self.refresh_margin = refresh_margin
+        self.fallback_refresh_token = fallback_refresh_token if fallback_refresh_token != refresh_token else None
+
+        self._access_token: str | None = None
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_token(self) -> str:
+        """Return a valid access token, refreshing it first, if it expires within the refresh margin."""
+
+        access_token = self._valid_token()
+        if access_token is not None:
+            return access_token
+
+        with self._lock:
+            return self._valid_token() or self._refresh()
+
+    def invalidate(self, access_token: str) -> None:
+        """Mark a token rejected by the API as expired. A token already replaced by another thread is kept."""
+
+        with self._lock:
+            if self._access_token == access_token:
+                self._refresh_at = 0.0
+
+    def _valid_token(self) -> str | None:
+        return self._access_token if time.time() < self._refresh_at else None
+
+    def _refresh(self) -> str:
+
+        headers_refresh = {"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"}
+
+        body_refresh = {
+            "client_id": self.client_id,
+            "grant_type": "refresh_token",
+            "client_secret": self.client_secret,
+            "resource": self.resource_url,
+            "refresh_token": self.refresh_token,
+        }
+
+        resp = requests.post(self.login_url, headers=headers_refresh, data=body_refresh)
+        code, response_json = resp.status_code, resp.json()
+
+        if code != 200 and self.fallback_refresh_token is not None:
+            logging.warning("Stored refresh token was rejected, using the refresh token of the configuration.")
+            self.refresh_token, self.fallback_refresh_token = self.fallback_refresh_token, None
+            return self._refresh()
+
+        if code != 200:
+            raise UserException(f"Could not refresh access token. Received {code} - {response_json}.")
+
+        now = time.time()
+        lifetime = max(0.0, self._parse_expires_on(response_json) - now)
+
+        # tokens with a lifetime shorter than the margin are refreshed in the middle of their lifetime
+        self._access_token = response_json["access_token"]
+        self._refresh_at = now + lifetime - min(self.refresh_margin, lifetime / 2)
+        self.refresh_token = response_json.get("refresh_token") or self.refresh_token
+
+        logging.debug(f"Access token refreshed successfully, valid for {lifetime:.0f} seconds.")
+        return response_json["access_token"]
+
+    @staticmethod
+    def _parse_expires_on(response_json: dict) -> float:
+        """Return the expiration time of a token, preferring ``expires_on`` over ``expires_in``."""
+
+        try:
+            return float(response_json["expires_on"])
+        except (KeyError, TypeError, ValueError):
+            pass
+
+        try:
+            return time.time() + float(response_json["expires_in"])
+        except (KeyError, TypeError, ValueError):
+            return time.time() + DEFAULT_EXPIRES_IN_SECONDS
+
+    @staticmethod
+    def _hash(refresh_token: str) -> str:
+        return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+    @classmethod
+    def restore_refresh_token(cls, state: dict | None, refresh_token: str) -> str:
+        """Return the refresh token rotated in a previous run, if the configuration was not re-authorized since."""
+
+        stored = (state or {}).get(cls.STATE_KEY, {})
+
+        if stored.get("#refresh_token") and stored.get("source_token_hash") == cls._hash(refresh_token):
+            return stored["#refresh_token"]
+
+        return refresh_token
+
+    def to_state(self, source_refresh_token: str) -> dict:
+        """Return the current refresh token in the form stored in the state file. The value is encrypted by the
+        platform, as its key starts with ``#``."""
+
+        return {"#refresh_token": self.refresh_token, "source_token_hash": self._hash(source_refresh_token)}
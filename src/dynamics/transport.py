@@ -0,0 +1,132 @@
+import gzip
+import logging
+import time
+from datetime import timedelta
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+
+try:
+    import h2
+except ImportError:  # pragma: no cover - h2 enables HTTP/2 in httpx
+    h2 = None
+
+# headers of a single connection, which are set by the transport itself and must not be sent over HTTP/2
+HOP_BY_HOP_HEADERS = frozenset({"connection", "keep-alive", "transfer-encoding", "content-length", "host"})
+GZIP_ENCODING = "gzip"
+
+
+def compress_body(body, headers: dict, min_bytes: int):
+    """Return a request body gzipped, if it has at least ``min_bytes`` bytes, and set its ``Content-Encoding``
+    header. Bodies of other types and smaller bodies are returned unchanged. ``min_bytes`` of 0 disables
+    compression."""
+
+    if not min_bytes or body is None:
+        return body
+
+    body = body.encode() if isinstance(body, str) else body
+    if not isinstance(body, bytes) or len(body) < min_bytes:
+        return body
+
+    headers["Content-Encoding"] = GZIP_ENCODING
+    # the lowest compression level compresses JSON well at a fraction of the CPU time of the default one
+    return gzip.compress(body, compresslevel=1)
+
+
+class HttpxAdapter(BaseAdapter):
+    """Transport adapter of a ``requests`` session, which sends requests using an ``httpx`` client.
+
+    With ``http2`` enabled, concurrent requests to the same host are multiplexed over a few HTTP/2 connections
+    instead of opening a connection for each of them. Responses are returned as ``requests`` responses, so the
+    adapter can replace ``HTTPAdapter`` transparently. Like ``HTTPAdapter``, it retries connection errors and
+    responses with a status in ``status_forcelist`` of ``max_retries``, raising ``requests.exceptions.RetryError``
+    once the retries are exhausted.
+    """
+
+    def __init__(self, pool_size: int, http2: bool = False, keepalive_expiry: float = 30.0, max_retries=None):
+        super().__init__()
+
+        if http2 and h2 is None:
+            logging.warning("HTTP/2 requires the h2 package (httpx[http2]), which is not installed. Using HTTP/1.1.")
+            http2 = False
+
+        self.http2 = http2
+        self.max_retries = max_retries if isinstance(max_retries, Retry) else Retry(total=max_retries or 0)
+        self._client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=keepalive_expiry
+            ),
+            timeout=None,
+        )
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+
+        headers = {name: value for name, value in request.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS}
+        body = request.body.encode() if isinstance(request.body, str) else request.body
+        retries = self.max_retries.total or 0
+        attempt = 0
+
+        while True:
+            started_at = time.monotonic()
+
+            try:
+                response = self._client.request(
+                    request.method, request.url, headers=headers, content=body, timeout=self._timeout(timeout)
+                )
+            except httpx.TimeoutException as e:
+                if attempt >= retries:
+                    raise requests.exceptions.Timeout(e, request=request)
+            except httpx.TransportError as e:
+                if attempt >= retries:
+                    raise requests.exceptions.ConnectionError(e, request=request)
+            else:
+                if not self._is_retried(request.method, response.status_code):
+                    return self._build_response(request, response, time.monotonic() - started_at)
+
+                if attempt >= retries:
+                    raise requests.exceptions.RetryError(
+                        f"Max retries exceeded with url: {request.url} (too many {response.status_code} error responses)",
+                        request=request,
+                    )
+
+            attempt += 1
+            time.sleep(self.max_retries.backoff_factor * (2 ** (attempt - 1)))
+
+    def _is_retried(self, method: str, status_code: int) -> bool:
+
+        allowed_methods = self.max_retries.allowed_methods
+        return status_code in (self.max_retries.status_forcelist or ()) and (
+            not allowed_methods or method.upper() in allowed_methods
+        )
+
+    @staticmethod
+    def _timeout(timeout):
+
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+
+        return httpx.Timeout(timeout)
+
+    @staticmethod
+    def _build_response(request, httpx_response, elapsed: float) -> requests.Response:
+
+        response = requests.Response()
+        response.status_code = httpx_response.status_code
+        response.headers = CaseInsensitiveDict(httpx_response.headers.multi_items())
+        response.reason = httpx_response.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.elapsed = timedelta(seconds=elapsed)
+        response._content = httpx_response.content
+        response.raw = None
+        return response
+
+    def close(self) -> None:
+        self._client.close()
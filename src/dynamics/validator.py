@@ -0,0 +1,142 @@
+import threading
+
+from dynamics.attributes import BIND_SUFFIX, INTEGER_TYPES, KEY_SUFFIX, NUMBER_TYPES, STRING_TYPES
+
+SIGNATURE_CACHE_SIZE = 1024
+
+
+class AttributeValidator:
+    """Validator of record payloads against the attributes of an entity, compiled once per entity.
+
+    Attribute names are kept in sets, so a key is checked in constant time regardless of the number of
+    attributes. Rows of a table usually share the same set of keys, so the unsupported keys are computed once
+    per distinct key signature. Values are checked against the types of the attributes and the maximum lengths
+    of string attributes, ``None`` clears an attribute and is always valid.
+
+    Metadata may be cached for hours, so attributes added to the entity meanwhile appear unsupported. If
+    ``reload`` is given, it is called once, when a payload with unsupported attributes is validated first, and
+    the validator is compiled again from the returned ``(attributes, navigation properties, attribute types,
+    max lengths)``, unless it returns ``None``.
+    """
+
+    def __init__(
+        self,
+        attributes,
+        navigation_properties,
+        attribute_types: dict[str, str] | None = None,
+        max_lengths: dict[str, int] | None = None,
+        reload=None,
+    ):
+        self.reload = reload
+        self._reloadable = reload is not None
+        self._lock = threading.Lock()
+        self._compile(attributes, navigation_properties, attribute_types, max_lengths)
+
+    def _compile(
+        self,
+        attributes,
+        navigation_properties,
+        attribute_types: dict[str, str] | None = None,
+        max_lengths: dict[str, int] | None = None,
+    ) -> None:
+        self.attributes = frozenset(attributes)
+        self.navigation_properties = frozenset(navigation_properties)
+        self.bind_targets = self.attributes | self.navigation_properties
+
+        # only attributes with a checked type are kept, so untyped payloads skip value checks entirely
+        self.attribute_types = {
+            name: attribute_type
+            for name, attribute_type in (attribute_types or {}).items()
+            if attribute_type in INTEGER_TYPES | NUMBER_TYPES | STRING_TYPES or attribute_type == "Boolean"
+        }
+        self.max_lengths = dict(max_lengths or {})
+        self._signatures = {}
+
+    def get_unsupported_attributes(self, record_data: dict) -> list:
+
+        signature = tuple(record_data)
+        unsupported = self._signatures.get(signature)
+
+        if unsupported is None:
+            unsupported = [
+                key.removesuffix(BIND_SUFFIX).removesuffix(KEY_SUFFIX)
+                for key in signature
+                if not self._is_supported(key)
+            ]
+
+            if len(self._signatures) < SIGNATURE_CACHE_SIZE:
+                self._signatures[signature] = unsupported
+
+        return unsupported
+
+    def _is_supported(self, key: str) -> bool:
+
+        if key.endswith(BIND_SUFFIX):
+            return key.removesuffix(BIND_SUFFIX) in self.bind_targets
+
+        if key.endswith(KEY_SUFFIX):
+            return key.removesuffix(KEY_SUFFIX) in self.navigation_properties
+
+        return key in self.attributes
+
+    def get_invalid_values(self, record_data: dict) -> list[str]:
+        """Return descriptions of values, which do not match the type or length of their attributes."""
+
+        invalid = []
+
+        for key, value in record_data.items():
+            attribute_type = self.attribute_types.get(key)
+
+            if attribute_type is None or value is None:
+                continue
+
+            if attribute_type in INTEGER_TYPES and (isinstance(value, bool) or not isinstance(value, int)):
+                invalid += [f"{key} must be a whole number"]
+
+            elif attribute_type in NUMBER_TYPES and (isinstance(value, bool) or not isinstance(value, int | float)):
+                invalid += [f"{key} must be a number"]
+
+            elif attribute_type == "Boolean" and not isinstance(value, bool):
+                invalid += [f"{key} must be a boolean"]
+
+            elif attribute_type in STRING_TYPES and not isinstance(value, str):
+                invalid += [f"{key} must be a string"]
+
+            elif attribute_type in STRING_TYPES and len(value) > self.max_lengths.get(key, len(value)):
+                invalid += [f"{key} is longer than {self.max_lengths[key]} characters"]
+
+        return invalid
+
+    def reload_metadata(self) -> bool:
+        """Compile the validator again from reloaded metadata, if it was not reloaded yet. Returns True, if the
+        metadata was reloaded, now or before."""
+
+        if not self._reloadable:
+            return False
+
+        # other threads wait for the reload, so they do not report attributes, which are about to be added
+        with self._lock:
+            if self.reload is not None:
+                reload, self.reload = self.reload, None
+                metadata = reload()
+
+                if metadata is not None:
+                    self._compile(*metadata)
+
+        return True
+
+    def validate(self, record_data: dict) -> str | None:
+        """Return the description of the errors of a payload, or ``None``, if it is valid."""
+
+        unsupported = self.get_unsupported_attributes(record_data)
+        if unsupported and self.reload_metadata():
+            unsupported = self.get_unsupported_attributes(record_data)
+
+        if unsupported:
+            return f"Unsupported attributes: {unsupported}"
+
+        invalid = self.get_invalid_values(record_data)
+        if invalid:
+            return f"Invalid values: {'; '.join(invalid)}"
+
+        return None
@@ -0,0 +1,86 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+from urllib.parse import urlparse
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.alternate_key import AlternateKeySpec, find_entity_key  # noqa: E402
+from dynamics.client import DynamicsClient  # noqa: E402
+from dynamics.throttling import AdaptiveRateController  # noqa: E402
+
+
+class TestAlternateKey(unittest.TestCase):
+    def test_segment_is_formatted_by_attribute_type(self):
+        key = AlternateKeySpec(
+            ["accountnumber", "numberofemployees", "parentaccountid"],
+            {"accountnumber": "String", "numberofemployees": "Integer", "parentaccountid": "Lookup"},
+        )
+        row = {"accountnumber": "O'Neil", "numberofemployees": "10", "parentaccountid": "abc"}
+
+        self.assertEqual(key.segment(row), "accountnumber='O''Neil',numberofemployees=10,_parentaccountid_value=abc")
+
+    def test_option_set_values_are_not_quoted(self):
+        key = AlternateKeySpec(["industrycode", "statecode"], {"industrycode": "Picklist", "statecode": "State"})
+
+        self.assertEqual(key.segment({"industrycode": "7", "statecode": "0"}), "industrycode=7,statecode=0")
+
+    def test_missing_key_value(self):
+        key = AlternateKeySpec(["accountnumber", "name"])
+
+        self.assertIsNone(key.segment({"accountnumber": "A-1", "name": " "}))
+
+    def test_entity_key_is_matched_regardless_of_order(self):
+        keys = [
+            {"LogicalName": "number_key", "KeyAttributes": ["accountnumber"]},
+            {"LogicalName": "composite_key", "KeyAttributes": ["name", "accountnumber"]},
+        ]
+
+        self.assertEqual(find_entity_key(keys, ["accountnumber", "name"]), keys[1])
+        self.assertIsNone(find_entity_key(keys, ["name"]))
+
+    def test_batch_operation_url_is_encoded(self):
+        client = DynamicsClient.__new__(DynamicsClient)
+        client.base_url = "https://org.crm.dynamics.com/api/data/v9.2/"
+
+        operation = client.build_batch_operation("upsert", "accounts", "accountnumber='A 1'", {"name": "A"})
+
+        self.assertEqual(operation.url, "https://org.crm.dynamics.com/api/data/v9.2/accounts(accountnumber='A%201')")
+
+    def test_record_urls_of_single_requests_are_encoded(self):
+        client = DynamicsClient.__new__(DynamicsClient)
+        client.base_url = "https://org.crm.dynamics.com/api/data/v9.2/"
+        client.max_retries = 0
+        client._default_header = {}
+        client._auth_header = {}
+        client._auth = None
+        client._default_params = None
+        client._rate_controller = AdaptiveRateController(1)
+        client._session = MagicMock()
+        client._session.request.return_value = MagicMock(status_code=204)
+
+        client.upsert_record("accounts", "accountnumber='A?1#2/3'", {"name": "A"})
+        client.update_record("accounts", "accountnumber='O''Neil'", {"name": "A"})
+        client.delete_record("accounts", "accountnumber='A?1'")
+
+        urls = [c.args[1] for c in client._session.request.call_args_list]
+        self.assertEqual(
+            urls,
+            [
+                "https://org.crm.dynamics.com/api/data/v9.2/accounts(accountnumber='A%3F1%232%2F3')",
+                "https://org.crm.dynamics.com/api/data/v9.2/accounts(accountnumber='O''Neil')",
+                "https://org.crm.dynamics.com/api/data/v9.2/accounts(accountnumber='A%3F1')",
+            ],
+        )
+
+        # requests keeps the encoded characters, so the key is sent as a single path segment
+        prepared = requests.Request("PATCH", urls[0]).prepare()
+        self.assertEqual(urlparse(prepared.url).path, "/api/data/v9.2/accounts(accountnumber='A%3F1%232%2F3')")
+        self.assertEqual((urlparse(prepared.url).query, urlparse(prepared.url).fragment), ("", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.batch import BatchOperation, build_batch_body, parse_batch_response  # noqa: E402
+from dynamics.client import DynamicsClient  # noqa: E402
+
+BASE_URL = "https://org.crm.dynamics.com/api/data/v9.2/"
+
+
+def _http_part(status_line, headers=None, body="", content_id=None):
+    lines = ["Content-Type: application/http", "Content-Transfer-Encoding: binary"]
+    if content_id is not None:
+        lines += [f"Content-ID: {content_id}"]
+    lines += ["", status_line, *[f"{k}: {v}" for k, v in (headers or {}).items()], "", body]
+    return "\r\n".join(lines)
+
+
+def _multipart(boundary, parts):
+    return "\r\n".join([item for part in parts for item in (f"--{boundary}", part)] + [f"--{boundary}--", ""])
+
+
+class TestBatchBody(unittest.TestCase):
+    """Serialization of $batch request bodies."""
+
+    def test_operations_without_changeset(self):
+        body = build_batch_body(
+            [
+                BatchOperation("POST", BASE_URL + "accounts", {"name": "A"}),
+                BatchOperation("DELETE", BASE_URL + "accounts(1)"),
+            ],
+            "batch_1",
+        )
+        self.assertIn("--batch_1\r\nContent-Type: application/http", body)
+        self.assertIn(f"POST {BASE_URL}accounts HTTP/1.1", body)
+        self.assertIn('{"name":"A"}', body)
+        self.assertIn(f"DELETE {BASE_URL}accounts(1) HTTP/1.1", body)
+        self.assertNotIn("changeset", body)
+        self.assertTrue(body.endswith("--batch_1--\r\n"))
+
+    def test_operations_in_changeset_have_content_ids(self):
+        body = build_batch_body(
+            [
+                BatchOperation("PATCH", BASE_URL + "accounts(1)", {"name": "A"}, {"If-Match": "*"}),
+                BatchOperation("PATCH", BASE_URL + "accounts(2)", {"name": "B"}),
+            ],
+            "batch_1",
+            "changeset_1",
+        )
+        self.assertIn("Content-Type: multipart/mixed; boundary=changeset_1", body)
+        self.assertIn("Content-ID: 1", body)
+        self.assertIn("Content-ID: 2", body)
+        self.assertIn("If-Match: *", body)
+        self.assertIn("--changeset_1--", body)
+
+
+class TestParseBatchResponse(unittest.TestCase):
+    """Parsing of multipart $batch responses."""
+
+    def test_flat_response(self):
+        body = _multipart(
+            "batchresponse_1",
+            [
+                _http_part("HTTP/1.1 204 No Content", {"OData-EntityId": BASE_URL + "accounts(abc)"}),
+                _http_part(
+                    "HTTP/1.1 404 Not Found",
+                    {"Content-Type": "application/json"},
+                    '{"error": {"message": "Not found"}}',
+                ),
+            ],
+        )
+        responses = parse_batch_response("multipart/mixed; boundary=batchresponse_1", body)
+
+        self.assertEqual([r.status_code for r in responses], [204, 404])
+        self.assertEqual(responses[0].headers["odata-entityid"], BASE_URL + "accounts(abc)")
+        self.assertEqual(responses[1].json()["error"]["message"], "Not found")
+        self.assertEqual(responses[1].reason, "Not Found")
+
+    def test_changeset_response_is_flattened(self):
+        changeset = _multipart(
+            "changesetresponse_1",
+            [_http_part("HTTP/1.1 204 No Content", content_id=2), _http_part("HTTP/1.1 204 No Content", content_id=1)],
+        )
+        body = _multipart(
+            "batchresponse_1",
+            ["Content-Type: multipart/mixed; boundary=changesetresponse_1\r\n\r\n" + changeset],
+        )
+        responses = parse_batch_response('multipart/mixed; boundary="batchresponse_1"', body)
+
+        self.assertEqual([r.headers["Content-ID"] for r in responses], ["2", "1"])
+
+    def test_non_multipart_response_raises(self):
+        with self.assertRaises(ValueError):
+            parse_batch_response("application/json", "{}")
+
+
+class TestExecuteBatch(unittest.TestCase):
+    """Mapping of $batch responses back to operations in DynamicsClient.execute_batch."""
+
+    def setUp(self):
+        self.client = DynamicsClient.__new__(DynamicsClient)
+        self.client.base_url = BASE_URL
+
+    def _mock_batch_response(self, parts):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(
+            {"Content-Type": "multipart/mixed; boundary=batchresponse_1", "REQ_ID": "req-1"}
+        )
+        response.text = _multipart("batchresponse_1", parts)
+        self.post_raw = MagicMock(return_value=response)
+        self.client.post_raw = self.post_raw
+
+    def _operations(self, count):
+        return [self.client.build_batch_operation("upsert", "accounts", str(i), {"name": i}) for i in range(count)]
+
+    def test_responses_are_assigned_unique_request_ids(self):
+        self._mock_batch_response([_http_part("HTTP/1.1 204 No Content"), _http_part("HTTP/1.1 204 No Content")])
+        responses = self.client.execute_batch(self._operations(2))
+
+        self.assertEqual([r.headers["REQ_ID"] for r in responses], ["req-1-1", "req-1-2"])
+        self.assertEqual(self.post_raw.call_args.kwargs["headers"]["Prefer"], "odata.continue-on-error")
+
+    def test_operations_after_first_error_are_not_executed(self):
+        self._mock_batch_response([_http_part("HTTP/1.1 400 Bad Request", body='{"error": {"message": "Bad"}}')])
+        responses = self.client.execute_batch(self._operations(3), continue_on_error=False)
+
+        self.assertEqual([r.status_code for r in responses], [400, 424, 424])
+        self.assertNotIn("Prefer", self.post_raw.call_args.kwargs["headers"])
+
+    def test_failed_changeset_fails_all_operations(self):
+        self._mock_batch_response([_http_part("HTTP/1.1 400 Bad Request", body='{"error": {"message": "Bad"}}')])
+        responses = self.client.execute_batch(self._operations(3), use_changeset=True)
+
+        self.assertEqual([r.status_code for r in responses], [400, 400, 400])
+        self.assertEqual(len({r.headers["REQ_ID"] for r in responses}), 3)
+
+    def test_failed_batch_request_fails_all_operations(self):
+        response = MagicMock(status_code=401, reason="Unauthorized", headers={}, text="")
+        self.post_raw = MagicMock(return_value=response)
+        self.client.post_raw = self.post_raw
+        responses = self.client.execute_batch(self._operations(2))
+
+        self.assertEqual([(r.status_code, r.reason) for r in responses], [(401, "Unauthorized")] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
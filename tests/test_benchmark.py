@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mock_server import DataverseMockServer, MockSettings  # noqa: E402
+from run_benchmark import find_regressions, parse_scenario, run_scenario  # noqa: E402
+
+
+class TestBenchmark(unittest.TestCase):
+    """Smoke tests of the benchmark harness, which run the component end to end against the mock server."""
+
+    def setUp(self):
+        self.server = DataverseMockServer(("127.0.0.1", 0), MockSettings(seed=1))
+        self.server.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_parse_scenario(self):
+        self.assertEqual(parse_scenario("upsert-10k"), ("upsert", 10_000))
+        self.assertEqual(parse_scenario("delete-1m"), ("delete", 1_000_000))
+        self.assertEqual(parse_scenario("create-250"), ("create", 250))
+
+        with self.assertRaises(ValueError):
+            parse_scenario("merge-10k")
+
+    def test_batch_scenario_runs_end_to_end(self):
+        parameters = {"execution_engine": "batch", "batch_size": 10, "use_changesets": True, "concurrency": 2}
+        result = run_scenario("upsert-50", self.server.url, parameters)
+
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["rows"], 50)
+        self.assertEqual(self.server.stats.batches, 5)
+        self.assertEqual(self.server.stats.errors, 0)
+
+    def test_httpx_transport_with_compression_runs_end_to_end(self):
+        parameters = {
+            "execution_engine": "bulk",
+            "batch_size": 10,
+            "http_transport": "httpx",
+            "compress_requests_kb": 1,
+        }
+        result = run_scenario("upsert-50", self.server.url, parameters)
+
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["rows"], 50)
+        self.assertEqual(self.server.stats.errors, 0)
+
+    def test_regression_is_reported(self):
+        baseline = [{"scenario": "upsert-10k", "rows_per_second": 100.0}]
+
+        self.assertEqual(find_regressions([{"scenario": "upsert-10k", "rows_per_second": 95.0}], baseline, 0.1), [])
+        self.assertEqual(len(find_regressions([{"scenario": "upsert-10k", "rows_per_second": 80.0}], baseline, 0.1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
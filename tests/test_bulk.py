@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.client import DynamicsClient  # noqa: E402
+
+BASE_URL = "https://org.crm.dynamics.com/api/data/v9.2/"
+
+
+class TestExecuteBulk(unittest.TestCase):
+    """Bulk operations in DynamicsClient.execute_bulk."""
+
+    def setUp(self):
+        self.client = DynamicsClient.__new__(DynamicsClient)
+        self.client.base_url = BASE_URL
+        self.client.supported_endpoints = {"accounts": "account"}
+        self.client.get_primary_id_attribute = MagicMock(return_value="accountid")
+
+    def _mock_response(self, status_code, body=None):
+        response = MagicMock(status_code=status_code, reason="", headers=CaseInsensitiveDict({"REQ_ID": "req-1"}))
+        response.text = json.dumps(body) if body is not None else ""
+        response.json.return_value = body
+        self.post_raw = MagicMock(return_value=response)
+        self.client.post_raw = self.post_raw
+
+    def _targets(self):
+        return json.loads(self.post_raw.call_args.kwargs["data"])["Targets"]
+
+    def test_created_ids_are_mapped_to_records(self):
+        self._mock_response(200, {"Ids": ["a", "b"]})
+        responses = self.client.execute_bulk("create", "accounts", [("", {"name": 1}), ("", {"name": 2})])
+
+        self.assertTrue(self.post_raw.call_args.kwargs["endpoint_path"].endswith("CreateMultiple"))
+        self.assertEqual(self._targets()[0], {"@odata.type": "Microsoft.Dynamics.CRM.account", "name": 1})
+        self.assertEqual(
+            [r.headers["OData-EntityId"] for r in responses], [BASE_URL + "accounts(a)", BASE_URL + "accounts(b)"]
+        )
+        self.assertEqual([r.headers["REQ_ID"] for r in responses], ["req-1-1", "req-1-2"])
+
+    def test_records_are_addressed_by_primary_id_or_alternate_key(self):
+        self._mock_response(204)
+        responses = self.client.execute_bulk(
+            "upsert", "accounts", [("1", {"name": 1}), ("accountnumber='A-2'", {"name": 2})]
+        )
+
+        self.assertEqual(self._targets()[0]["accountid"], "1")
+        self.assertEqual(self._targets()[1]["@odata.id"], "accounts(accountnumber='A-2')")
+        self.assertEqual([r.status_code for r in responses], [204, 204])
+
+    def test_failed_request_fails_all_records(self):
+        self._mock_response(400, {"error": {"message": "Bad"}})
+        responses = self.client.execute_bulk("update", "accounts", [("1", {"name": 1}), ("2", {"name": 2})])
+
+        self.assertEqual([r.status_code for r in responses], [400, 400])
+        self.assertEqual(responses[1].json()["error"]["message"], "Bad")
+
+
+if __name__ == "__main__":
+    unittest.main()
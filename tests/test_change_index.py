@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.change_index import ChangeIndex  # noqa: E402
+
+ORG_URL = "https://org.crm.dynamics.com"
+
+
+class TestChangeIndex(unittest.TestCase):
+    def test_unchanged_data_is_detected_regardless_of_attribute_order(self):
+        index = ChangeIndex({}, ORG_URL, 10)
+        index.add("accounts", "1", {"name": "A", "revenue": 10})
+
+        self.assertTrue(index.is_unchanged("accounts", "1", {"revenue": 10, "name": "A"}))
+        self.assertFalse(index.is_unchanged("accounts", "1", {"name": "B", "revenue": 10}))
+        self.assertFalse(index.is_unchanged("contacts", "1", {"name": "A", "revenue": 10}))
+
+    def test_hash_of_full_data_is_recorded_for_partial_writes(self):
+        index = ChangeIndex(None, "https://org.crm.dynamics.com", 10)
+        index.add("accounts", "1", {"revenue": 10}, ChangeIndex.data_hash({"name": "A", "revenue": 10}))
+
+        self.assertTrue(index.is_unchanged("accounts", "1", {"revenue": 10, "name": "A"}))
+
+    def test_index_survives_state_round_trip(self):
+        index = ChangeIndex({}, ORG_URL, 10)
+        index.add("accounts", "1", {"name": "A"})
+
+        restored = ChangeIndex({ChangeIndex.STATE_KEY: index.to_state()}, ORG_URL, 10)
+        self.assertTrue(restored.is_unchanged("accounts", "1", {"name": "A"}))
+
+        other_org = ChangeIndex({ChangeIndex.STATE_KEY: index.to_state()}, "https://other.crm.dynamics.com", 10)
+        self.assertFalse(other_org.is_unchanged("accounts", "1", {"name": "A"}))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        index = ChangeIndex({}, ORG_URL, 2)
+        index.add("accounts", "1", {"name": "A"})
+        index.add("accounts", "2", {"name": "B"})
+        index.is_unchanged("accounts", "1", {"name": "A"})
+        index.add("accounts", "3", {"name": "C"})
+
+        self.assertEqual(len(index), 2)
+        self.assertTrue(index.is_unchanged("accounts", "1", {"name": "A"}))
+        self.assertFalse(index.is_unchanged("accounts", "2", {"name": "B"}))
+
+    def test_deleted_record_is_removed(self):
+        index = ChangeIndex({}, ORG_URL, 10)
+        index.add("accounts", "1", {"name": "A"})
+        index.remove("accounts", "1")
+
+        self.assertFalse(index.is_unchanged("accounts", "1", {"name": "A"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.checkpoint import CheckpointStore, table_fingerprint  # noqa: E402
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def test_progress_is_saved_every_interval(self):
+        save = MagicMock()
+        store = CheckpointStore({}, 100, save)
+
+        for rows in range(10, 260, 10):
+            store.update("accounts|accounts.csv", "abc", rows)
+
+        self.assertEqual(save.call_count, 2)
+        self.assertEqual(store.to_state(), {"accounts|accounts.csv": {"fingerprint": "abc", "rows": 250}})
+
+    def test_checkpoint_survives_state_round_trip(self):
+        store = CheckpointStore({}, 0, MagicMock())
+        store.update("accounts|accounts.csv", "abc", 300)
+
+        restored = CheckpointStore({CheckpointStore.STATE_KEY: store.to_state()}, 0, MagicMock())
+        self.assertEqual(restored.get("accounts|accounts.csv", "abc"), 300)
+
+    def test_checkpoint_of_changed_table_is_ignored(self):
+        store = CheckpointStore(
+            {CheckpointStore.STATE_KEY: {"accounts|accounts.csv": {"fingerprint": "abc", "rows": 300}}}, 0, MagicMock()
+        )
+
+        self.assertEqual(store.get("accounts|accounts.csv", "def"), 0)
+
+    def test_completed_table_is_removed(self):
+        save = MagicMock()
+        store = CheckpointStore({}, 0, save)
+        store.update("accounts|accounts.csv", "abc", 300)
+        store.complete("accounts|accounts.csv")
+
+        self.assertEqual(store.to_state(), {})
+        save.assert_called_once()
+
+
+class TestTableFingerprint(unittest.TestCase):
+    def _table(self, content):
+        path = os.path.join(tempfile.mkdtemp(), "accounts.csv")
+        with open(path, "w") as f:
+            f.write(content)
+        return MagicMock(full_path=path)
+
+    def test_fingerprint_depends_on_content(self):
+        first = table_fingerprint(self._table('"id","data"\n"1","{}"\n'))
+        same = table_fingerprint(self._table('"id","data"\n"1","{}"\n'))
+        other = table_fingerprint(self._table('"id","data"\n"2","{}"\n'))
+
+        self.assertEqual(first, same)
+        self.assertNotEqual(first, other)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.coalesce import RecordCoalescer  # noqa: E402
+
+
+class TestRecordCoalescer(unittest.TestCase):
+    def test_payloads_are_merged_into_the_last_row(self):
+        coalescer = RecordCoalescer()
+        for record_id, row_number in [("A", 1), ("b", 2), ("a", 3), ("A", 4)]:
+            coalescer.add(record_id, row_number)
+
+        self.assertEqual(coalescer.duplicates, 2)
+        self.assertEqual(coalescer.coalesce("A", 1, {"name": "1", "revenue": 1}), (4, None))
+        self.assertEqual(coalescer.coalesce("b", 2, {"name": "2"}), (None, {"name": "2"}))
+        self.assertEqual(coalescer.coalesce("a", 3, {"name": "3"}), (4, None))
+        self.assertEqual(coalescer.coalesce("A", 4, {"city": "X"}), (None, {"name": "3", "revenue": 1, "city": "X"}))
+
+    def test_deletes_are_coalesced_without_payload(self):
+        coalescer = RecordCoalescer()
+        coalescer.add("1", 1)
+        coalescer.add("1", 2)
+
+        self.assertEqual(coalescer.coalesce("1", 1, None), (2, None))
+        self.assertEqual(coalescer.coalesce("1", 2, None), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
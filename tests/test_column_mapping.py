@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.column_mapping import ColumnMapping  # noqa: E402
+
+ATTRIBUTE_TYPES = {
+    "name": "String",
+    "numberofemployees": "Integer",
+    "revenue": "Money",
+    "donotemail": "Boolean",
+    "industrycode": "Picklist",
+    "parentaccountid": "Lookup",
+}
+
+
+class TestColumnMapping(unittest.TestCase):
+    def test_values_are_converted_by_attribute_type(self):
+        mapping = ColumnMapping(
+            ["id", "name", "numberofemployees", "revenue", "donotemail", "industrycode", "parentaccountid@odata.bind"],
+            ATTRIBUTE_TYPES,
+            {"id"},
+        )
+        row = {
+            "id": "1",
+            "name": "Contoso",
+            "numberofemployees": "25",
+            "revenue": "10,5",
+            "donotemail": "Yes",
+            "industrycode": "3",
+            "parentaccountid@odata.bind": "/accounts(2)",
+        }
+
+        self.assertEqual(
+            mapping.to_payload(row),
+            {
+                "name": "Contoso",
+                "numberofemployees": 25,
+                "revenue": 10.5,
+                "donotemail": True,
+                "industrycode": 3,
+                "parentaccountid@odata.bind": "/accounts(2)",
+            },
+        )
+
+    def test_empty_values_are_omitted_or_null(self):
+        row = {"name": "", "revenue": "1"}
+
+        self.assertEqual(ColumnMapping(["name", "revenue"], ATTRIBUTE_TYPES).to_payload(row), {"revenue": 1.0})
+        self.assertEqual(
+            ColumnMapping(["name", "revenue"], ATTRIBUTE_TYPES, empty_as_null=True).to_payload(row),
+            {"name": None, "revenue": 1.0},
+        )
+
+    def test_thousands_separators_are_rejected(self):
+        mapping = ColumnMapping(["revenue"], ATTRIBUTE_TYPES)
+
+        self.assertEqual(mapping.to_payload({"revenue": "1,25"}), {"revenue": 1.25})
+        self.assertEqual(mapping.to_payload({"revenue": "1000.5"}), {"revenue": 1000.5})
+
+        for value in ["1,000", "1,234", "1,000.5", "1.000,5", "1,000,000"]:
+            with self.assertRaisesRegex(ValueError, "revenue"):
+                mapping.to_payload({"revenue": value})
+
+    def test_invalid_value_raises_error(self):
+        mapping = ColumnMapping(["numberofemployees"], ATTRIBUTE_TYPES)
+
+        with self.assertRaisesRegex(ValueError, "numberofemployees"):
+            mapping.to_payload({"numberofemployees": "many"})
+
+    def test_lookup_columns_without_bind_are_reported(self):
+        self.assertEqual(
+            ColumnMapping(["name", "parentaccountid"], ATTRIBUTE_TYPES).lookup_columns, ["parentaccountid"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
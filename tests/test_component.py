@@ -1,10 +1,14 @@
 import csv
+import io
 import json
+import logging
 import os
+import random
 import sys
 import tempfile
+import time
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import requests
 
@@ -13,6 +17,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 from keboola.component.exceptions import UserException  # noqa: E402
 
 from dynamics.client import DynamicsClient  # noqa: E402
+from dynamics.retry import RetryQueue  # noqa: E402
 
 
 class TestGetEndpointNavigationProperties(unittest.TestCase):
@@ -158,6 +163,22 @@ class TestCheckInputAttributes(unittest.TestCase):
         with self.assertRaises(UserException):
             comp.check_input_attributes()
 
+    def test_invalid_json_data_is_rejected(self):
+        """Data, which cannot be parsed into a dictionary, raises UserException instead of crashing."""
+        comp = self._build_component("incidents", [{"id": "abc", "data": ["title"]}], ["title"], [])
+        with self.assertRaises(UserException):
+            comp.check_input_attributes()
+
+    def test_all_invalid_rows_are_reported(self):
+        comp = self._build_component(
+            "incidents",
+            [{"id": "a", "data": {"title": "A"}}, {"id": "b", "data": {"typo": "B"}}, {"id": "c", "data": {"x": 1}}],
+            supported_attrs=["title"],
+            nav_properties=[],
+        )
+        with self.assertRaisesRegex(UserException, "2 invalid rows.*line 2.*line 3"):
+            comp.check_input_attributes()
+
     def test_delete_operation_skips_attribute_validation(self):
         """Delete rows bypass attribute validation entirely."""
         comp = self._build_component(
@@ -253,6 +274,12 @@ class TestEntitySetNameDerivation(unittest.TestCase):
         table = self._real_table("incidents", sliced=True)
         self.assertEqual(Component._entity_set_name(table), "incidents")
 
+    def test_entity_set_name_for_gzipped_table(self):
+        from component import Component
+
+        table = MagicMock(full_path="/data/in/tables/incidents.csv.gz")
+        self.assertEqual(Component._entity_set_name(table), "incidents")
+
     def test_check_input_endpoints_resolves_filename_over_storage_name(self):
         """The bug: endpoint validation rejected the Storage name. It must use the filename."""
         table = self._real_table("incidents.csv")
@@ -269,5 +296,493 @@ class TestEntitySetNameDerivation(unittest.TestCase):
         comp.check_input_attributes()  # must not raise
 
 
+class TestWriteTable(unittest.TestCase):
+    """Tests for the request dispatch loop in write_table."""
+
+    def _build_component(self, rows, **parameters):
+        tmp_dir = tempfile.mkdtemp()
+        csv_path = os.path.join(tmp_dir, "accounts.csv")
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["id", "data"])
+            writer.writeheader()
+            writer.writerows(rows)
+
+        mock_table = MagicMock()
+        mock_table.name = "accounts.csv"
+        mock_table.full_path = csv_path
+
+        from component import Component
+        from configuration import Configuration
+
+        comp = Component.__new__(Component)
+        comp.cfg = Configuration.fromDict(
+            {"api_version": "v9.2", "organization_url": "https://org.crm.dynamics.com", **parameters}
+        )
+        comp._client = MagicMock()
+        comp.writer = MagicMock()
+        return comp, mock_table
+
+    @staticmethod
+    def _response(status_code):
+        response = MagicMock(status_code=status_code, headers={"req_id": "req"}, reason="")
+        response.json.return_value = {"error": {"message": "error"}}
+        return response
+
+    def _written_ids(self, comp):
+        return [c.args[0]["id"] for c in comp.writer.writerow.call_args_list]
+
+    def test_concurrent_results_keep_input_order(self):
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(50)]
+        comp, table = self._build_component(rows, operation="upsert", concurrency=8)
+
+        def delayed_response(endpoint, record_id, data):
+            time.sleep(random.random() / 100)
+            return self._response(204)
+
+        comp._client.upsert_record.side_effect = delayed_response
+
+        self.assertEqual(comp.write_table(table), 0)
+        self.assertEqual(self._written_ids(comp), [str(i) for i in range(50)])
+
+    def test_invalid_rows_keep_input_order(self):
+        rows = [
+            {"id": "1", "data": json.dumps({"name": 1})},
+            {"id": "", "data": json.dumps({"name": 2})},
+            {"id": "3", "data": json.dumps({"name": 3})},
+        ]
+        comp, table = self._build_component(rows, operation="upsert", concurrency=2)
+        comp._client.upsert_record.return_value = self._response(204)
+
+        self.assertEqual(comp.write_table(table), 1)
+        self.assertEqual(self._written_ids(comp), ["1", "", "3"])
+        self.assertEqual(
+            comp.writer.writerow.call_args_list[1].kwargs["status"]["operation_status"], "MISSING_ID_ERROR"
+        )
+
+    def test_failed_request_stops_writing_without_continue_on_error(self):
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(20)]
+        comp, table = self._build_component(rows, operation="upsert", concurrency=4, continue_on_error=False)
+        comp._client.upsert_record.side_effect = lambda endpoint, record_id, data: self._response(
+            404 if record_id == "0" else 204
+        )
+
+        with self.assertRaises(UserException):
+            comp.write_table(table)
+
+        comp.writer.writerow.assert_not_called()
+        self.assertLess(comp._client.upsert_record.call_count, 20)
+
+    def test_per_row_validation_reports_invalid_rows(self):
+        rows = [
+            {"id": "1", "data": json.dumps({"name": 1})},
+            {"id": "2", "data": json.dumps({"notanattr": 2})},
+        ]
+        comp, table = self._build_component(rows, operation="upsert", validate_before_write=False)
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_endpoint_attributes.return_value = ["name"]
+        comp._client.get_endpoint_navigation_properties.return_value = []
+        comp._client.upsert_record.return_value = self._response(204)
+
+        self.assertEqual(comp.write_table(table), 1)
+        self.assertEqual(comp._client.upsert_record.call_count, 1)
+        self.assertEqual(comp.writer.writerow.call_args_list[1].kwargs["status"]["operation_status"], "ATTRIBUTE_ERROR")
+
+    def test_per_row_validation_fails_without_continue_on_error(self):
+        rows = [{"id": "1", "data": json.dumps({"notanattr": 1})}]
+        comp, table = self._build_component(
+            rows, operation="upsert", validate_before_write=False, continue_on_error=False
+        )
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_endpoint_attributes.return_value = ["name"]
+        comp._client.get_endpoint_navigation_properties.return_value = []
+
+        with self.assertRaises(UserException):
+            comp.write_table(table)
+
+        comp._client.upsert_record.assert_not_called()
+
+    def test_batch_engine_groups_records(self):
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(5)]
+        comp, table = self._build_component(rows, operation="upsert", execution_engine="batch", batch_size=2)
+        comp._client.execute_batch.side_effect = lambda operations, *args: [self._response(204)] * len(operations)
+
+        self.assertEqual(comp.write_table(table), 0)
+        self.assertEqual([len(c.args[0]) for c in comp._client.execute_batch.call_args_list], [2, 2, 1])
+        self.assertEqual(self._written_ids(comp), [str(i) for i in range(5)])
+
+    def test_resume_skips_rows_written_before_checkpoint(self):
+        from dynamics.checkpoint import CheckpointStore, table_fingerprint
+
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(5)]
+        comp, table = self._build_component(rows, operation="upsert", resume_from_checkpoint=True)
+        comp._client.upsert_record.return_value = self._response(204)
+        checkpoint = {"accounts|accounts.csv": {"fingerprint": table_fingerprint(table), "rows": 3}}
+        comp.checkpoints = CheckpointStore({CheckpointStore.STATE_KEY: checkpoint}, 0, MagicMock())
+
+        self.assertEqual(comp.write_table(table), 0)
+        self.assertEqual(self._written_ids(comp), ["3", "4"])
+        self.assertEqual(comp.checkpoints.to_state(), {})
+
+    def test_unchanged_records_are_skipped(self):
+        from dynamics.change_index import ChangeIndex
+
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(3)]
+        comp, table = self._build_component(rows, operation="upsert", skip_unchanged=True)
+        comp._client.upsert_record.return_value = self._response(204)
+        comp.change_index = ChangeIndex({}, "https://org.crm.dynamics.com", 10)
+        comp.change_index.add("accounts", "0", {"name": 0})
+        comp.change_index.add("accounts", "1", {"name": "changed"})
+
+        self.assertEqual(comp.write_table(table), 0)
+        self.assertEqual([c.args[1] for c in comp._client.upsert_record.call_args_list], ["1", "2"])
+        self.assertEqual(
+            comp.writer.writerow.call_args_list[0].kwargs["status"]["operation_status"], "SKIPPED - UNCHANGED"
+        )
+        self.assertTrue(comp.change_index.is_unchanged("accounts", "2", {"name": 2}))
+
+    def test_repeated_records_are_not_skipped_as_unchanged(self):
+        from dynamics.change_index import ChangeIndex
+
+        rows = [{"id": "1", "data": json.dumps({"name": "B"})}, {"id": "1", "data": json.dumps({"name": "A"})}]
+        comp, table = self._build_component(
+            rows, operation="upsert", skip_unchanged=True, execution_engine="batch", batch_size=2
+        )
+        comp._client.execute_batch.side_effect = lambda operations, *args: [self._response(204)] * len(operations)
+        comp.change_index = ChangeIndex({}, "https://org.crm.dynamics.com", 10)
+        comp.change_index.add("accounts", "1", {"name": "A"})
+
+        self.assertEqual(comp.write_table(table), 0)
+        self.assertEqual(len(comp._client.execute_batch.call_args.args[0]), 2)
+        self.assertTrue(comp.change_index.is_unchanged("accounts", "1", {"name": "A"}))
+
+    def test_rows_are_recorded_in_telemetry(self):
+        from dynamics.telemetry import Telemetry
+
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(4)]
+        comp, table = self._build_component(rows, operation="upsert")
+        comp._client.upsert_record.side_effect = lambda endpoint, record_id, data: self._response(
+            404 if record_id == "0" else 204
+        )
+        comp.telemetry = Telemetry()
+
+        comp.write_table(table)
+
+        summary = comp.telemetry.summary_rows()[0]
+        self.assertEqual((summary["endpoint"], summary["operation"]), ("accounts", "upsert"))
+        self.assertEqual((summary["rows"], summary["rows_failed"]), (4, 1))
+
+    def test_records_are_upserted_by_alternate_key(self):
+        comp, table = self._build_component([], operation="create_and_update")
+        with open(table.full_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["accountnumber", "data"])
+            writer.writeheader()
+            writer.writerows(
+                [{"accountnumber": "A-1", "data": json.dumps({"name": 1})}, {"accountnumber": "", "data": "{}"}]
+            )
+
+        comp.cfg = comp.cfg.fromDict(
+            {
+                "api_version": "v9.2",
+                "organization_url": "https://org.crm.dynamics.com",
+                "operation": "create_and_update",
+                "alternate_keys": [{"endpoint": "accounts", "columns": ["accountnumber"]}],
+            }
+        )
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_entity_keys.return_value = [
+            {"LogicalName": "key", "KeyAttributes": ["accountnumber"], "EntityKeyIndexStatus": "Active"}
+        ]
+        comp._client.get_endpoint_attribute_metadata.return_value = [
+            {"LogicalName": "accountnumber", "AttributeType": "String"}
+        ]
+        comp._client.upsert_record.return_value = self._response(204)
+
+        comp.check_alternate_keys()
+
+        self.assertEqual(comp.write_table(table), 1)
+        comp._client.upsert_record.assert_called_once_with("accounts", "accountnumber='A-1'", {"name": 1})
+        self.assertEqual(
+            [c.args[0].get("id") for c in comp.writer.writerow.call_args_list], ["accountnumber='A-1'", None]
+        )
+
+    def test_invalid_alternate_key_is_rejected(self):
+        comp, _ = self._build_component(
+            [], operation="upsert", alternate_keys=[{"endpoint": "accounts", "columns": ["name"]}]
+        )
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_entity_keys.return_value = [
+            {"LogicalName": "key", "KeyAttributes": ["accountnumber"], "EntityKeyIndexStatus": "Active"}
+        ]
+
+        with self.assertRaises(UserException):
+            comp.check_alternate_keys()
+
+    def test_bulk_engine_falls_back_to_individual_requests(self):
+        from dynamics.batch import BatchResponse
+
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(3)]
+        comp, table = self._build_component(rows, operation="upsert", execution_engine="bulk", batch_size=10)
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_bulk_messages.return_value = ["UpsertMultiple"]
+        comp._client.execute_bulk.return_value = [BatchResponse(400, "Bad Request", body="{}") for _ in range(3)]
+        comp._client.upsert_record.side_effect = lambda endpoint, record_id, data: self._response(
+            404 if record_id == "1" else 204
+        )
+
+        self.assertEqual(comp.write_table(table), 1)
+        comp._client.execute_bulk.assert_called_once()
+        self.assertEqual(comp._client.upsert_record.call_count, 3)
+
+    def test_bulk_units_are_limited_by_payload_size(self):
+        rows = [{"id": str(i), "data": json.dumps({"name": "x" * 600})} for i in range(5)]
+        comp, _ = self._build_component(rows, operation="upsert", execution_engine="bulk", bulk_max_payload_kb=1)
+        records = [comp.prepare_record(row, number) for number, row in enumerate(rows, start=1)]
+
+        self.assertEqual([len(unit) for unit in comp.group_records(records)], [1, 1, 1, 1, 1])
+
+    def test_columns_are_mapped_to_attributes(self):
+        comp, table = self._build_component([], operation="upsert", input_mode="columns")
+        with open(table.full_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["id", "name", "numberofemployees"])
+            writer.writeheader()
+            writer.writerows(
+                [
+                    {"id": "1", "name": "A", "numberofemployees": "10"},
+                    {"id": "2", "name": "B", "numberofemployees": "x"},
+                ]
+            )
+
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_endpoint_attribute_metadata.return_value = [
+            {"LogicalName": "name", "AttributeType": "String"},
+            {"LogicalName": "numberofemployees", "AttributeType": "Integer"},
+        ]
+        comp._client.upsert_record.return_value = self._response(204)
+
+        self.assertEqual(comp.write_table(table), 1)
+        comp._client.upsert_record.assert_called_once_with("accounts", "1", {"name": "A", "numberofemployees": 10})
+        self.assertEqual(comp.writer.writerow.call_args_list[1].kwargs["status"]["operation_status"], "DATA_ERROR")
+        self.assertEqual(
+            [json.loads(c.args[0]["data"]) for c in comp.writer.writerow.call_args_list],
+            [{"name": "A", "numberofemployees": 10}, {"name": "B", "numberofemployees": "x"}],
+        )
+
+    def test_load_is_estimated_without_writing(self):
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(250)]
+        rows[5]["data"] = "invalid"
+        comp, table = self._build_component(rows, operation="upsert", execution_engine="batch", batch_size=100)
+        comp.in_tables = [table]
+        comp.state = {"request_latency_ms": {"batch": 500.0}}
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_endpoint_attributes.return_value = ["name"]
+
+        estimate = comp.estimate_load()
+
+        self.assertEqual((estimate.requests, estimate.invalid_rows), (3, 1))
+        self.assertEqual(estimate.endpoints[0].rows, {"upsert": 249})
+        self.assertEqual((estimate.latency_ms, estimate.latency_source), (500.0, "measured in previous runs"))
+        comp._client.execute_batch.assert_not_called()
+
+    def test_dry_run_sync_action_validates_configuration_without_tables(self):
+        comp, _ = self._build_component(
+            [], operation="upsert", alternate_keys=[{"endpoint": "accounts", "columns": ["accountnumber"]}]
+        )
+        comp.in_tables = []
+        # sync actions mute logging
+        self.addCleanup(logging.getLogger().setLevel, logging.getLogger().level)
+        comp._init_configuration = MagicMock()
+        comp.get_state_file = MagicMock(return_value={})
+        comp.init_client = MagicMock()
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_entity_keys.return_value = [
+            {"LogicalName": "key", "KeyAttributes": ["accountnumber"], "EntityKeyIndexStatus": "Active"}
+        ]
+
+        with (
+            patch.object(type(comp), "configuration", MagicMock(action="dryRun")),
+            patch("sys.stdout", new_callable=io.StringIO) as stdout,
+        ):
+            comp.dry_run()
+
+        self.assertEqual(json.loads(stdout.getvalue())["type"], "success")
+        self.assertIn("accounts", comp.alternate_keys)
+        comp._client.get_entity_metadata.assert_called_once()
+
+    def test_rows_of_the_same_record_are_coalesced(self):
+        rows = [
+            {"id": "1", "data": json.dumps({"name": "A", "revenue": 1})},
+            {"id": "2", "data": json.dumps({"name": "B"})},
+            {"id": "1", "data": "invalid"},
+            {"id": "1", "data": json.dumps({"name": "C"})},
+        ]
+        comp, table = self._build_component(rows, operation="upsert", coalesce_records=True)
+        comp._client.upsert_record.return_value = self._response(204)
+
+        self.assertEqual(comp.write_table(table), 1)
+        self.assertEqual(
+            [c.args for c in comp._client.upsert_record.call_args_list],
+            [("accounts", "2", {"name": "B"}), ("accounts", "1", {"name": "C", "revenue": 1})],
+        )
+        statuses = [c.kwargs["status"] for c in comp.writer.writerow.call_args_list]
+        self.assertEqual(statuses[0]["operation_status"], "COALESCED")
+        self.assertIn("line 4", statuses[0]["operation_response"])
+
+    def test_lookups_are_resolved_by_natural_keys(self):
+        rows = [
+            {"id": "1", "data": json.dumps({"name": "A", "parentaccountid@key": "accountnumber=P-1"})},
+            {"id": "2", "data": json.dumps({"name": "B", "parentaccountid@key": {"accountnumber": "P-2"}})},
+            {"id": "3", "data": json.dumps({"name": "C", "parentaccountid@key": "accountnumber=P-1"})},
+        ]
+        comp, table = self._build_component(rows, operation="upsert")
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_navigation_targets.return_value = {"parentaccountid": "account"}
+        comp._client.get_primary_id_attribute.return_value = "accountid"
+        comp._client.find_records.return_value = [("P-1", "p1")]
+        comp._client.upsert_record.return_value = self._response(204)
+
+        self.assertEqual(comp.write_table(table), 1)
+        comp._client.find_records.assert_called_once()
+        self.assertEqual(
+            [c.args for c in comp._client.upsert_record.call_args_list],
+            [
+                ("accounts", "1", {"name": "A", "parentaccountid@odata.bind": "/accounts(p1)"}),
+                ("accounts", "3", {"name": "C", "parentaccountid@odata.bind": "/accounts(p1)"}),
+            ],
+        )
+        status = comp.writer.writerow.call_args_list[1].kwargs["status"]
+        self.assertEqual(status["operation_status"], "LOOKUP_ERROR")
+        self.assertIn("P-2", status["operation_response"])
+        comp._client.get_navigation_targets.assert_called_once()
+        comp._client.get_primary_id_attribute.assert_called_once()
+
+    def test_failed_lookup_requests_fail_only_affected_rows(self):
+        rows = [
+            {"id": "1", "data": json.dumps({"name": "A", "parentaccountid@key": "accountnumber=P-1"})},
+            {"id": "2", "data": json.dumps({"name": "B"})},
+        ]
+        comp, table = self._build_component(rows, operation="upsert")
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_navigation_targets.return_value = {"parentaccountid": "account"}
+        comp._client.get_primary_id_attribute.return_value = "accountid"
+        comp._client.find_records.side_effect = requests.ConnectionError("reset")
+        comp._client.upsert_record.return_value = self._response(204)
+
+        self.assertEqual(comp.write_table(table), 1)
+        comp._client.upsert_record.assert_called_once_with("accounts", "2", {"name": "B"})
+        status = comp.writer.writerow.call_args_list[0].kwargs["status"]
+        self.assertEqual(status["operation_status"], "LOOKUP_ERROR")
+        self.assertIn("reset", status["operation_response"])
+
+    def test_transient_failures_are_retried_after_the_table(self):
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(5)]
+        comp, table = self._build_component(rows, operation="upsert", retry_delay_seconds=0)
+        attempts = {"1": [self._response(503), self._response(204)], "3": [requests.ConnectionError("reset")] * 2}
+
+        def respond(endpoint, record_id, data):
+            if record_id not in attempts:
+                return self._response(204)
+            response = attempts[record_id].pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        comp._client.upsert_record.side_effect = respond
+
+        self.assertEqual(comp.write_table(table), 1)
+        self.assertEqual(self._written_ids(comp), ["0", "2", "4", "1", "3"])
+        statuses = [c.kwargs["status"]["operation_status"] for c in comp.writer.writerow.call_args_list]
+        self.assertEqual(statuses[3:], ["REQUEST_OK - 204", "REQUEST_ERROR - ConnectionError"])
+
+    def test_checkpoint_stops_before_deferred_rows(self):
+        rows = [{"id": str(i), "data": json.dumps({"name": i})} for i in range(5)]
+        comp, table = self._build_component(rows, operation="upsert", retry_passes=0)
+        comp.checkpoints = MagicMock()
+        comp._client.upsert_record.side_effect = lambda endpoint, record_id, data: self._response(
+            429 if record_id == "1" else 204
+        )
+        queue = RetryQueue()
+
+        for record in comp.iter_records(table):
+            comp.process_unit("accounts", [record], comp.execute_unit("accounts", [record]), queue)
+
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(comp.checkpoint_rows(5, queue), 1)
+        self.assertEqual(self._written_ids(comp), ["0", "2", "3", "4"])
+
+    def test_only_changed_attributes_are_sent(self):
+        ids = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(4)]
+        rows = [
+            {"id": ids[0], "data": json.dumps({"name": "A", "revenue": 10})},
+            {"id": ids[1], "data": json.dumps({"name": "B", "revenue": 20})},
+            {"id": ids[2], "data": json.dumps({"name": "C"})},
+            {"id": "accountnumber='A-1'", "data": json.dumps({"name": "D"})},
+        ]
+        comp, table = self._build_component(rows, operation="upsert", send_changed_attributes=True)
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_primary_id_attribute.return_value = "accountid"
+        comp._client.get_records.return_value = {
+            ids[0]: {"accountid": ids[0], "name": "A", "revenue": 15.0},
+            ids[1]: {"accountid": ids[1], "name": "B", "revenue": 20.0},
+        }
+        comp._client.upsert_record.return_value = self._response(204)
+
+        self.assertEqual(comp.write_table(table), 0)
+        comp._client.get_records.assert_called_once_with("accounts", "accountid", ids[:3], ["name", "revenue"])
+        self.assertEqual(
+            [c.args for c in comp._client.upsert_record.call_args_list],
+            [
+                ("accounts", ids[0], {"revenue": 10}),
+                ("accounts", ids[2], {"name": "C"}),
+                ("accounts", "accountnumber='A-1'", {"name": "D"}),
+            ],
+        )
+        status = comp.writer.writerow.call_args_list[1].kwargs["status"]
+        self.assertEqual(status["operation_status"], "SKIPPED - UNCHANGED")
+
+    def test_repeated_records_are_sent_in_full(self):
+        record_id = "00000000-0000-0000-0000-000000000001"
+        rows = [
+            {"id": record_id, "data": json.dumps({"name": "B"})},
+            {"id": record_id, "data": json.dumps({"name": "A"})},
+        ]
+        comp, table = self._build_component(rows, operation="upsert", send_changed_attributes=True)
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_primary_id_attribute.return_value = "accountid"
+        comp._client.get_records.return_value = {record_id: {"accountid": record_id, "name": "A"}}
+        comp._client.upsert_record.return_value = self._response(204)
+
+        self.assertEqual(comp.write_table(table), 0)
+        self.assertEqual(
+            [c.args for c in comp._client.upsert_record.call_args_list],
+            [("accounts", record_id, {"name": "B"}), ("accounts", record_id, {"name": "A"})],
+        )
+
+    def test_current_values_are_read_once_with_validation_before_write(self):
+        ids = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(2)]
+        rows = [
+            {"id": ids[0], "data": json.dumps({"name": "A", "parentaccountid@key": "accountnumber=P-1"})},
+            {"id": ids[1], "data": json.dumps({"name": "B"})},
+        ]
+        comp, table = self._build_component(rows, operation="upsert", send_changed_attributes=True)
+        comp.in_tables = [table]
+        comp._client.supported_endpoints = {"accounts": "account"}
+        comp._client.get_endpoint_attributes.return_value = ["name"]
+        comp._client.get_endpoint_navigation_properties.return_value = ["parentaccountid"]
+        comp._client.get_navigation_targets.return_value = {"parentaccountid": "account"}
+        comp._client.get_primary_id_attribute.return_value = "accountid"
+        comp._client.find_records.return_value = [("P-1", "p1")]
+        comp._client.get_records.return_value = {}
+        comp._client.upsert_record.return_value = self._response(204)
+
+        comp.check_input_attributes()
+
+        comp._client.find_records.assert_not_called()
+        comp._client.get_records.assert_not_called()
+
+        self.assertEqual(comp.write_table(table), 0)
+        self.assertEqual(comp._client.find_records.call_count, 1)
+        self.assertEqual(comp._client.get_records.call_count, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
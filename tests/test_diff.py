@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.diff import get_changed_data, get_compared_attributes, is_record_id, values_equal  # noqa: E402
+
+
+class TestDiff(unittest.TestCase):
+    def test_records_addressed_by_ids(self):
+        self.assertTrue(is_record_id("00000000-0000-0000-0000-000000000001"))
+        self.assertFalse(is_record_id("accountnumber='A-1'"))
+
+    def test_values_are_compared_by_type(self):
+        self.assertTrue(values_equal(10, 10.0))
+        self.assertTrue(values_equal(None, None))
+        self.assertFalse(values_equal(True, 1))
+        self.assertFalse(values_equal("10", 10))
+
+    def test_only_changed_attributes_and_lookups_are_kept(self):
+        data = {"name": "A", "revenue": 10, "telephone1": None, "parentaccountid@odata.bind": "/accounts(1)"}
+        current = {"name": "A", "revenue": 12.5, "telephone1": None}
+
+        self.assertEqual(get_compared_attributes(data), ["name", "revenue", "telephone1"])
+        self.assertEqual(get_changed_data(data, current), {"revenue": 10, "parentaccountid@odata.bind": "/accounts(1)"})
+        self.assertEqual(get_changed_data({"description": "x"}, current), {"description": "x"})
+
+
+if __name__ == "__main__":
+    unittest.main()
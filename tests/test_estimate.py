@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.estimate import EndpointEstimate, LoadEstimate  # noqa: E402
+
+
+class TestLoadEstimate(unittest.TestCase):
+    def test_runtime_is_limited_by_concurrency(self):
+        estimate = LoadEstimate("single", 4, 100.0, "default", [EndpointEstimate("accounts", requests=1000)])
+
+        self.assertEqual(estimate.execution_seconds, 100.0)
+        self.assertEqual(estimate.runtime_seconds, 25.0)
+        self.assertEqual(estimate.limit_windows, 1)
+
+    def test_runtime_is_limited_by_service_protection_limits(self):
+        estimate = LoadEstimate("single", 50, 10.0, "default", [EndpointEstimate("accounts", requests=13000)])
+
+        self.assertEqual(estimate.limit_windows, 3)
+        self.assertEqual(estimate.runtime_seconds, 600)
+
+    def test_report_lists_endpoints_and_errors(self):
+        estimate = LoadEstimate(
+            "batch",
+            1,
+            200.0,
+            "default",
+            [EndpointEstimate("accounts", Counter({"create": 5, "update": 3}), invalid_rows=1, requests=1)],
+            ["In accounts.csv on the line 2: Unsupported attributes: ['x']"],
+        )
+        report = estimate.to_markdown()
+
+        self.assertIn("| accounts | create 5, update 3 | 8 | 1 | 0 | 1 |", report)
+        self.assertIn("**1 invalid rows**", report)
+        self.assertIn("- In accounts.csv on the line 2", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
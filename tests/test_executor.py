@@ -0,0 +1,53 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.executor import OrderedExecutor  # noqa: E402
+
+
+class TestOrderedExecutor(unittest.TestCase):
+    def _run(self, executor, items, size=None):
+        submitted = []
+        in_flight = []
+        lock = threading.Lock()
+
+        def source():
+            for item in items:
+                submitted.append(item)
+                yield item
+
+        results = []
+        with executor:
+            for item, result in executor.map(lambda item: item * 2, source(), size=size):
+                with lock:
+                    in_flight.append(len(submitted) - len(results) - 1)
+                results.append((item, result))
+
+        return results, in_flight
+
+    def test_results_keep_order_of_items(self):
+        results, _ = self._run(OrderedExecutor(4), list(range(20)))
+        self.assertEqual(results, [(i, i * 2) for i in range(20)])
+
+    def test_items_in_flight_are_bounded_by_count(self):
+        _, in_flight = self._run(OrderedExecutor(2, max_in_flight=3), list(range(20)))
+        self.assertLessEqual(max(in_flight), 3)
+
+    def test_items_in_flight_are_bounded_by_size(self):
+        results, in_flight = self._run(
+            OrderedExecutor(4, max_in_flight=10, max_in_flight_bytes=100), [60] * 10, size=lambda item: item
+        )
+        self.assertEqual(len(results), 10)
+        self.assertEqual(max(in_flight), 1)
+
+    def test_item_larger_than_the_budget_is_sent_alone(self):
+        results, in_flight = self._run(OrderedExecutor(4, max_in_flight_bytes=10), [5, 50, 5], size=lambda item: item)
+        self.assertEqual(results, [(5, 10), (50, 100), (5, 10)])
+        self.assertEqual(max(in_flight), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.lookup import AMBIGUOUS, NOT_FOUND, LookupKeyError, LookupResolver, parse_lookup_key  # noqa: E402
+
+
+class TestParseLookupKey(unittest.TestCase):
+    def test_string_and_dict_keys(self):
+        self.assertEqual(parse_lookup_key("accountnumber=A=1"), ("accountnumber", "A=1"))
+        self.assertEqual(parse_lookup_key({"accountnumber": 10}), ("accountnumber", "10"))
+
+    def test_invalid_keys(self):
+        for value in ["A-1", "=A-1", "accountnumber=", {"a": 1, "b": 2}, None]:
+            with self.assertRaises(LookupKeyError):
+                parse_lookup_key(value)
+
+
+class TestLookupResolver(unittest.TestCase):
+    def test_values_are_resolved_in_batches_and_cached(self):
+        find_records = MagicMock(side_effect=lambda *args: [("a", "1"), ("B", "2"), ("b", "3")])
+        resolver = LookupResolver(find_records, max_entries=100, batch_size=2)
+
+        resolved = resolver.resolve("accounts", "accountid", "accountnumber", ["A", "b", "c"])
+
+        self.assertEqual(resolved, {"A": "1", "b": AMBIGUOUS, "c": NOT_FOUND})
+        self.assertEqual(find_records.call_count, 2)
+
+        self.assertEqual(
+            resolver.resolve("accounts", "accountid", "accountnumber", ["a", "c"]), {"a": "1", "c": NOT_FOUND}
+        )
+        self.assertEqual(find_records.call_count, 2)
+
+    def test_targets_are_found_once(self):
+        resolver = LookupResolver(MagicMock(), max_entries=100)
+        find_target = MagicMock(return_value=("accounts", "accountid"))
+
+        for endpoint in ["contacts", "Contacts", "contacts"]:
+            self.assertEqual(resolver.get_target(endpoint, "parentcustomerid", find_target), ("accounts", "accountid"))
+
+        find_target.assert_called_once_with("contacts", "parentcustomerid")
+
+    def test_missing_targets_are_found_once(self):
+        resolver = LookupResolver(MagicMock(), max_entries=100)
+        find_target = MagicMock(side_effect=LookupKeyError("name is not a lookup of contacts."))
+
+        for _ in range(3):
+            with self.assertRaisesRegex(LookupKeyError, "not a lookup"):
+                resolver.get_target("contacts", "name", find_target)
+
+        find_target.assert_called_once()
+
+    def test_least_recently_used_values_are_evicted(self):
+        find_records = MagicMock(
+            side_effect=lambda entity_set, id_attribute, attribute, values: [(v, v) for v in values]
+        )
+        resolver = LookupResolver(find_records, max_entries=2)
+
+        for value in ["a", "b", "a", "c", "a", "b"]:
+            resolver.resolve("accounts", "accountid", "accountnumber", [value])
+
+        self.assertEqual([c.args[3] for c in find_records.call_args_list], [["a"], ["b"], ["c"], ["b"]])
+
+    def test_prefetched_entity_is_not_queried_for_missing_values(self):
+        find_records = MagicMock(return_value=[("a", "1"), ("b", "2")])
+        resolver = LookupResolver(find_records, max_entries=10, prefetch=True)
+
+        self.assertEqual(
+            resolver.resolve("accounts", "accountid", "accountnumber", ["a", "x"]), {"a": "1", "x": NOT_FOUND}
+        )
+        find_records.assert_called_once_with("accounts", "accountid", "accountnumber", None)
+
+    def test_prefetch_exceeding_the_index_queries_missing_values(self):
+        find_records = MagicMock(side_effect=[[("a", "1"), ("b", "2"), ("c", "3")], []])
+        resolver = LookupResolver(find_records, max_entries=2, prefetch=True)
+
+        self.assertEqual(resolver.resolve("accounts", "accountid", "accountnumber", ["x"]), {"x": NOT_FOUND})
+        self.assertEqual(find_records.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.client import DynamicsClient  # noqa: E402
+from dynamics.metadata_cache import MetadataCache  # noqa: E402
+
+ORG_URL = "https://org.crm.dynamics.com"
+
+
+class TestMetadataCache(unittest.TestCase):
+    """Metadata requests of DynamicsClient served from MetadataCache."""
+
+    def setUp(self):
+        self.client = DynamicsClient.__new__(DynamicsClient)
+        self.client.base_url = "https://org.crm.dynamics.com/api/data/v9.2/"
+
+    def _mock_response(self, value_list, status_code=200, etag=None):
+        mock_resp = MagicMock(status_code=status_code, headers={"ETag": etag} if etag else {})
+        mock_resp.raise_for_status.return_value = None
+        mock_resp.json.return_value = {"value": value_list}
+        return mock_resp
+
+    def _cache(self, state=None, ttl_hours=24, **kwargs):
+        return MetadataCache(state, ORG_URL, "v9.2", ttl_hours, **kwargs)
+
+    def test_fresh_entry_is_served_without_request(self):
+        self.client.metadata_cache = self._cache()
+        self.client.get_raw = MagicMock(
+            return_value=self._mock_response([{"ReferencingEntityNavigationPropertyName": "customerid_account"}])
+        )
+
+        self.client.get_endpoint_navigation_properties("incident")
+        result = self.client.get_endpoint_navigation_properties("incident")
+
+        self.assertEqual(result, ["customerid_account"])
+        self.assertEqual(self.client.get_raw.call_count, 1)
+
+    def test_invalidated_entity_metadata_is_fetched_again(self):
+        self.client.metadata_cache = self._cache()
+        self.client.get_raw = MagicMock(return_value=self._mock_response([{"LogicalName": "name"}], etag='W/"1"'))
+
+        self.client.get_endpoint_attribute_metadata("account")
+        self.client.invalidate_entity_metadata("account")
+        self.client.get_endpoint_attribute_metadata("account")
+
+        self.assertEqual(self.client.get_raw.call_count, 2)
+        self.assertIsNone(self.client.get_raw.call_args.kwargs["headers"])
+
+    def test_cache_survives_state_round_trip(self):
+        cache = self._cache()
+        cache.set("NavigationProperties(incident)", ["customerid_account"])
+
+        self.client.metadata_cache = self._cache({MetadataCache.STATE_KEY: cache.to_state()})
+        self.client.get_raw = MagicMock()
+
+        self.assertEqual(self.client.get_endpoint_navigation_properties("incident"), ["customerid_account"])
+        self.client.get_raw.assert_not_called()
+
+    def test_entries_are_keyed_by_organization(self):
+        cache = self._cache()
+        cache.set("NavigationProperties(incident)", ["customerid_account"])
+
+        other = MetadataCache({MetadataCache.STATE_KEY: cache.to_state()}, "https://other.crm.dynamics.com", "v9.2", 24)
+        self.assertIsNone(other.get("NavigationProperties(incident)"))
+
+    def test_stale_entry_is_revalidated_with_etag(self):
+        cache = self._cache()
+        cache.set("NavigationProperties(incident)", ["customerid_account"], etag='W/"1"')
+        cache.ttl = 0
+
+        self.client.metadata_cache = cache
+        self.client.get_raw = MagicMock(return_value=self._mock_response([], status_code=304))
+
+        self.assertEqual(self.client.get_endpoint_navigation_properties("incident"), ["customerid_account"])
+        self.assertEqual(self.client.get_raw.call_args.kwargs["headers"], {"If-None-Match": 'W/"1"'})
+
+    def test_force_refresh_fetches_metadata_of_previous_runs_once(self):
+        previous = self._cache()
+        previous.set("NavigationProperties(incident)", ["customerid_account"])
+        previous._entries[f"{ORG_URL}|v9.2|NavigationProperties(incident)"]["fetched_at"] = time.time() - 60
+
+        self.client.metadata_cache = self._cache({MetadataCache.STATE_KEY: previous.to_state()}, force_refresh=True)
+        self.client.get_raw = MagicMock(
+            return_value=self._mock_response([{"ReferencingEntityNavigationPropertyName": "customerid_contact"}])
+        )
+
+        for _ in range(5):
+            self.assertEqual(self.client.get_endpoint_navigation_properties("incident"), ["customerid_contact"])
+        self.assertEqual(self.client.get_raw.call_count, 1)
+
+    def test_metadata_is_fetched_once_without_cache(self):
+        self.client.get_raw = MagicMock(return_value=self._mock_response([]))
+        self.client.get_raw.return_value.json.return_value = {"PrimaryIdAttribute": "accountid"}
+
+        for _ in range(5):
+            self.assertEqual(self.client.get_primary_id_attribute("account"), "accountid")
+        self.assertEqual(self.client.get_raw.call_count, 1)
+
+    def test_expired_entries_without_etag_are_not_persisted(self):
+        cache = self._cache()
+        cache.set("Attributes(account)", [])
+        cache.set("Attributes(contact)", [], etag='W/"1"')
+        cache._entries[f"{ORG_URL}|v9.2|Attributes(account)"]["fetched_at"] = time.time() - 48 * 3600
+        cache._entries[f"{ORG_URL}|v9.2|Attributes(contact)"]["fetched_at"] = time.time() - 48 * 3600
+
+        self.assertEqual(list(cache.to_state()), [f"{ORG_URL}|v9.2|Attributes(contact)"])
+
+    def test_attributes_are_requested_with_select(self):
+        self.client.get_raw = MagicMock(
+            return_value=self._mock_response(
+                [
+                    {"LogicalName": "name", "AttributeType": "String", "IsValidForCreate": True},
+                    {"LogicalName": "createdon", "AttributeType": "DateTime"},
+                ]
+            )
+        )
+
+        self.assertEqual(self.client.get_endpoint_attributes("account"), ["name"])
+        self.assertIn("LogicalName", self.client.get_raw.call_args.kwargs["params"]["$select"])
+
+
+if __name__ == "__main__":
+    unittest.main()
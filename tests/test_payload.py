@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics import payload  # noqa: E402
+from dynamics.payload import dump_payload, parse_payload  # noqa: E402
+
+
+class TestParsePayload(unittest.TestCase):
+    def test_json_is_parsed(self):
+        self.assertEqual(
+            parse_payload('{"name": "A", "revenue": 1.5, "active": true}'),
+            {"name": "A", "revenue": 1.5, "active": True},
+        )
+
+    def test_python_literal_is_parsed(self):
+        self.assertEqual(
+            parse_payload("{'name': 'A', 'active': True, 'parent': None}"),
+            {"name": "A", "active": True, "parent": None},
+        )
+
+    def test_expressions_are_not_evaluated(self):
+        self.assertIsNone(parse_payload("__import__('os').getcwd()"))
+        self.assertIsNone(parse_payload("{'name': 'A' * 3}"))
+        self.assertIsNone(parse_payload("not a payload"))
+
+    def test_json_is_parsed_without_orjson(self):
+        with patch.object(payload, "orjson", None):
+            self.assertEqual(parse_payload('{"name": "A"}'), {"name": "A"})
+            self.assertEqual(parse_payload("{'name': 'A'}"), {"name": "A"})
+
+    def test_non_finite_numbers_are_rejected(self):
+        for orjson in (payload.orjson, None):
+            with patch.object(payload, "orjson", orjson):
+                for value in ['{"revenue": NaN}', '{"revenue": -Infinity}', '{"revenue": 1e999}', "{'a': {1, 2}}"]:
+                    self.assertIsNone(parse_payload(value), value)
+
+
+class TestDumpPayload(unittest.TestCase):
+    def test_payload_is_compact_utf8_json(self):
+        data = {"name": "Příliš žluťoučký kůň", "revenue": 10}
+
+        for orjson in (payload.orjson, None):
+            with patch.object(payload, "orjson", orjson):
+                body = dump_payload(data)
+                self.assertIsInstance(body, bytes)
+                self.assertNotIn(b", ", body)
+                self.assertEqual(json.loads(body), data)
+
+    def test_values_unsupported_by_orjson_fall_back_to_json(self):
+        self.assertEqual(json.loads(dump_payload({"count": 2**70})), {"count": 2**70})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import csv
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics import reader  # noqa: E402
+from dynamics.reader import get_table_columns, iter_table_rows  # noqa: E402
+
+
+class TestTableReader(unittest.TestCase):
+    """Reading of plain, gzipped and sliced input tables."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def _write(self, path, rows, header=None):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt", newline="") as f:
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(header)
+            writer.writerows(rows)
+
+    def _sliced_table(self, slices, columns=("id", "data"), gzipped=False):
+        path = os.path.join(self.tmp_dir, "accounts.csv")
+        os.makedirs(path)
+        for index, rows in enumerate(slices):
+            self._write(os.path.join(path, f"slice_{index:03d}.csv" + (".gz" if gzipped else "")), rows)
+        return SimpleNamespace(full_path=path, column_names=list(columns))
+
+    def test_plain_table(self):
+        path = os.path.join(self.tmp_dir, "accounts.csv")
+        self._write(path, [["1", "{}"]], header=["id", "data"])
+        table = SimpleNamespace(full_path=path, column_names=["id", "data"])
+
+        self.assertEqual(list(iter_table_rows(table)), [{"id": "1", "data": "{}"}])
+        self.assertEqual(get_table_columns(table), ["id", "data"])
+
+    def test_gzipped_table(self):
+        path = os.path.join(self.tmp_dir, "accounts.csv.gz")
+        self._write(path, [["1", "{}"]], header=["id", "data"])
+        table = SimpleNamespace(full_path=path, column_names=[])
+
+        self.assertEqual(list(iter_table_rows(table)), [{"id": "1", "data": "{}"}])
+
+    def test_sliced_table_uses_manifest_columns(self):
+        table = self._sliced_table([[["1", "a"]], [["2", "b"]]], gzipped=True)
+
+        self.assertEqual(get_table_columns(table), ["id", "data"])
+        self.assertEqual([row["id"] for row in iter_table_rows(table)], ["1", "2"])
+
+    def test_sliced_table_without_manifest_columns_has_header(self):
+        table = self._sliced_table([[["id", "data"], ["1", "a"]], [["2", "b"]]], columns=())
+
+        self.assertEqual(get_table_columns(table), ["id", "data"])
+        self.assertEqual([row["id"] for row in iter_table_rows(table)], ["1", "2"])
+
+    def test_parallel_readers_keep_slice_order(self):
+        slices = [[[str(s * 1000 + i), ""] for i in range(1000)] for s in range(6)]
+        table = self._sliced_table(slices)
+
+        with patch.object(reader, "CHUNK_SIZE", 7):
+            ids = [row["id"] for row in iter_table_rows(table, max_readers=3)]
+
+        self.assertEqual(ids, [str(i) for i in range(6000)])
+
+    def test_parallel_readers_stop_when_consumer_stops(self):
+        slices = [[[str(i), ""] for i in range(5000)] for _ in range(4)]
+        table = self._sliced_table(slices)
+
+        rows = iter_table_rows(table, max_readers=2)
+        self.assertEqual(next(rows)["id"], "0")
+        rows.close()  # must not hang waiting for readers blocked on full queues
+
+
+if __name__ == "__main__":
+    unittest.main()
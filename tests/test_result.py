@@ -0,0 +1,81 @@
+import csv
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.result import FIELDS_RESULTS, DynamicsResultsWriter  # noqa: E402
+
+
+class TestDynamicsResultsWriter(unittest.TestCase):
+    """Buffering, slicing and compression of the results table."""
+
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.table_path = os.path.join(self.out_dir, "results.csv")
+
+    @staticmethod
+    def _read(path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", newline="") as f:
+            return list(csv.reader(f))
+
+    def _write_rows(self, writer, count):
+        for i in range(count):
+            writer.writerow(
+                {"id": str(i), "data": "{}"},
+                "accounts",
+                "upsert",
+                status={"operation_status": "REQUEST_OK - 204", "operation_response": ""},
+            )
+
+    def test_rows_are_buffered_until_flush(self):
+        writer = DynamicsResultsWriter(self.out_dir, flush_rows=3)
+        self._write_rows(writer, 4)
+
+        self.assertEqual(len(self._read(self.table_path)), 3)
+
+        writer.close()
+        rows = self._read(self.table_path)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0][FIELDS_RESULTS.index("operation_status")], "REQUEST_OK - 204")
+
+    def test_close_on_failure_writes_buffered_rows(self):
+        with self.assertRaises(RuntimeError), DynamicsResultsWriter(self.out_dir) as writer:
+            self._write_rows(writer, 2)
+            raise RuntimeError()
+
+        self.assertEqual(len(self._read(self.table_path)), 2)
+
+    def test_status_is_read_from_row_without_status(self):
+        with DynamicsResultsWriter(self.out_dir) as writer:
+            writer.writerow({"id": "1", "data": "{}", "operation_status": "DATA_ERROR"}, "accounts", "create", "req")
+
+        row = dict(zip(FIELDS_RESULTS, self._read(self.table_path)[0]))
+        self.assertEqual((row["request_id"], row["id"], row["operation_status"]), ("req", "1", "DATA_ERROR"))
+
+    def test_generated_request_ids_are_unique(self):
+        with DynamicsResultsWriter(self.out_dir) as writer:
+            self._write_rows(writer, 10)
+
+        request_ids = [row[0] for row in self._read(self.table_path)]
+        self.assertEqual(len(set(request_ids)), 10)
+
+    def test_sliced_gzipped_output(self):
+        with DynamicsResultsWriter(self.out_dir, flush_rows=4, slice_rows=3, compress=True) as writer:
+            self._write_rows(writer, 7)
+
+        slices = sorted(os.listdir(self.table_path))
+        self.assertEqual(slices, ["results_0001.csv.gz", "results_0002.csv.gz", "results_0003.csv.gz"])
+        self.assertEqual([len(self._read(os.path.join(self.table_path, s))) for s in slices], [3, 3, 1])
+
+        with open(self.table_path + ".manifest") as f:
+            self.assertEqual(json.load(f)["columns"], FIELDS_RESULTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
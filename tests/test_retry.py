@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.retry import RetryQueue, is_transient_failure  # noqa: E402
+
+
+class TestRetryQueue(unittest.TestCase):
+    def test_failures_are_classified(self):
+        self.assertTrue(is_transient_failure(MagicMock(status_code=429)))
+        self.assertTrue(is_transient_failure(MagicMock(status_code=503)))
+        self.assertTrue(is_transient_failure(requests.ConnectionError("reset")))
+        self.assertTrue(is_transient_failure(requests.exceptions.RetryError("too many 500 error responses")))
+        self.assertFalse(is_transient_failure(MagicMock(status_code=400)))
+        self.assertFalse(is_transient_failure(MagicMock(status_code=404)))
+
+    def test_records_are_deferred_up_to_the_limit(self):
+        queue = RetryQueue(max_rows=2)
+        records = [MagicMock(row_number=number) for number in (3, 5, 8)]
+
+        self.assertEqual([queue.add(record) for record in records], [True, True, False])
+        self.assertEqual((len(queue), queue.first_row_number), (2, 3))
+
+        self.assertEqual(queue.drain(), records[:2])
+        self.assertEqual((len(queue), queue.first_row_number), (0, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.scheduler import TableScheduler, find_dependency_cycle  # noqa: E402
+
+
+class TestTableScheduler(unittest.TestCase):
+    def _tasks(self, endpoints, log, delay=0.0):
+        def task(name):
+            log.append(("start", name))
+            time.sleep(delay)
+            log.append(("end", name))
+            return name
+
+        return [(endpoint, lambda endpoint=endpoint: task(endpoint)) for endpoint in endpoints]
+
+    def test_dependencies_are_written_first(self):
+        log = []
+        scheduler = TableScheduler(1, {"contacts": ["Accounts"]})
+        results = scheduler.run(self._tasks(["contacts", "leads", "accounts"], log))
+
+        self.assertEqual(results, ["contacts", "leads", "accounts"])
+        self.assertEqual([name for event, name in log if event == "start"], ["leads", "accounts", "contacts"])
+
+    def test_tables_are_written_in_parallel_after_dependencies(self):
+        log = []
+        scheduler = TableScheduler(3, {"contacts": ["accounts"]})
+        scheduler.run(self._tasks(["accounts", "leads", "contacts"], log, delay=0.05))
+
+        self.assertLess(log.index(("start", "leads")), log.index(("end", "accounts")))
+        self.assertLess(log.index(("end", "accounts")), log.index(("start", "contacts")))
+
+    def test_concurrency_is_limited(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def task():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+        TableScheduler(2).run([(f"endpoint{i}", task) for i in range(6)])
+        self.assertEqual(max(peak), 2)
+
+    def test_failure_stops_scheduling(self):
+        started = []
+
+        def fail():
+            raise RuntimeError("failed")
+
+        tasks = [("accounts", fail), ("contacts", lambda: started.append("contacts"))]
+
+        with self.assertRaises(RuntimeError):
+            TableScheduler(2, {"contacts": ["accounts"]}).run(tasks)
+        self.assertEqual(started, [])
+
+    def test_cycle_is_detected(self):
+        self.assertIsNone(find_dependency_cycle({"contacts": ["accounts"], "accounts": ["accounts"]}))
+        self.assertEqual(
+            find_dependency_cycle({"contacts": ["accounts"], "accounts": ["leads"], "leads": ["Contacts"]}),
+            ["contacts", "accounts", "leads", "contacts"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
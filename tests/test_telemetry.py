@@ -0,0 +1,87 @@
+import csv
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.client import DynamicsClient  # noqa: E402
+from dynamics.telemetry import FIELDS_SUMMARY, METADATA_ENDPOINT, OperationMetrics, Telemetry  # noqa: E402
+from dynamics.throttling import AdaptiveRateController  # noqa: E402
+
+
+class TestTelemetry(unittest.TestCase):
+    def test_latency_percentiles_are_estimated_from_histogram(self):
+        metrics = OperationMetrics()
+        for latency_ms in [5] * 90 + [200] * 9 + [60000]:
+            metrics.record_latency(latency_ms)
+
+        self.assertEqual(metrics.latency_percentile(50), 10.0)
+        self.assertEqual(metrics.latency_percentile(95), 250.0)
+        self.assertEqual(metrics.latency_percentile(100), 60000)
+
+    def test_requests_are_attributed_to_scope(self):
+        telemetry = Telemetry()
+        telemetry.record_request("GET", 200, 0.01)
+
+        with telemetry.scope("accounts", "upsert"):
+            telemetry.record_request("PATCH", 429, 0.02, bytes_sent=100)
+            telemetry.record_request("PATCH", 204, 0.02, attempt=1, bytes_sent=100)
+
+        telemetry.record_rows("accounts", "upsert", 1)
+        rows = {(row["endpoint"], row["operation"]): row for row in telemetry.summary_rows()}
+
+        self.assertEqual(rows[(METADATA_ENDPOINT, "GET")]["requests"], 1)
+        self.assertEqual(rows[("accounts", "upsert")]["requests"], 2)
+        self.assertEqual(rows[("accounts", "upsert")]["retries"], 1)
+        self.assertEqual(rows[("accounts", "upsert")]["throttled"], 1)
+        self.assertEqual(rows[("accounts", "upsert")]["bytes_sent"], 200)
+        self.assertEqual(rows[("accounts", "upsert")]["rows"], 1)
+
+    def test_summary_table_is_written_with_manifest(self):
+        telemetry = Telemetry()
+        telemetry.record_rows("accounts", "delete", 10, failed=2)
+        out_path = tempfile.mkdtemp()
+
+        telemetry.write_summary(out_path)
+
+        with open(os.path.join(out_path, "run_summary.csv.manifest")) as manifest:
+            self.assertEqual(json.load(manifest)["columns"], FIELDS_SUMMARY)
+
+        with open(os.path.join(out_path, "run_summary.csv")) as summary:
+            rows = list(csv.DictReader(summary, fieldnames=FIELDS_SUMMARY))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["rows_failed"], "2")
+
+    def test_client_records_each_attempt(self):
+        client = DynamicsClient.__new__(DynamicsClient)
+        client.base_url = "https://org.crm.dynamics.com/api/data/v9.2/"
+        client.max_retries = 2
+        client._default_header = {}
+        client._auth_header = {}
+        client._auth = None
+        client._default_params = None
+        client._rate_controller = AdaptiveRateController(1)
+        client._session = MagicMock()
+        client.telemetry = Telemetry()
+
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0"}, content=b"{}")
+        throttled.request.body = b'{"name": "A"}'
+        success = MagicMock(status_code=204, headers={}, content=b"")
+        success.request.body = b'{"name": "A"}'
+        client._session.request.side_effect = [throttled, success]
+
+        with client.telemetry.scope("accounts", "upsert"):
+            client.patch_raw("accounts(1)", json={"name": "A"})
+
+        row = client.telemetry.summary_rows()[0]
+        self.assertEqual((row["requests"], row["retries"], row["throttled"]), (2, 1, 1))
+        self.assertEqual(row["bytes_sent"], 26)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.client import DynamicsClient  # noqa: E402
+from dynamics.throttling import (  # noqa: E402
+    HEADER_BURST_REMAINING,
+    AdaptiveRateController,
+    parse_remaining,
+    parse_retry_after,
+)
+
+
+def _response(status_code, headers=None):
+    return MagicMock(status_code=status_code, headers=CaseInsensitiveDict(headers or {}))
+
+
+class TestAdaptiveRateController(unittest.TestCase):
+    """AIMD adjustments of the AdaptiveRateController."""
+
+    def _send(self, controller, response):
+        controller.acquire()
+        controller.release(response)
+
+    def test_throttled_response_halves_limit_and_pauses(self):
+        controller = AdaptiveRateController(8)
+        self._send(controller, _response(429, {"Retry-After": "0.2"}))
+
+        self.assertEqual(controller.limit, 4)
+
+        start = time.monotonic()
+        controller.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_simultaneous_throttled_responses_decrease_once(self):
+        controller = AdaptiveRateController(8)
+        for _ in range(3):
+            controller.acquire()
+        for _ in range(3):
+            controller.release(_response(429, {"Retry-After": "10"}))
+
+        self.assertEqual(controller.limit, 4)
+
+    def test_delay_is_introduced_at_minimal_limit(self):
+        controller = AdaptiveRateController(1)
+        self._send(controller, _response(429, {"Retry-After": "0"}))
+
+        self.assertEqual(controller.limit, 1)
+        self.assertEqual(controller.delay, AdaptiveRateController.MIN_DELAY)
+
+    def test_low_headroom_decreases_limit(self):
+        controller = AdaptiveRateController(8)
+        self._send(controller, _response(204, {HEADER_BURST_REMAINING: "6000"}))
+        self._send(controller, _response(204, {HEADER_BURST_REMAINING: "300"}))
+
+        self.assertEqual(controller.limit, 4)
+
+    def test_successful_rounds_increase_limit(self):
+        controller = AdaptiveRateController(4)
+        controller.limit = 2
+
+        for _ in range(2):
+            self._send(controller, _response(204))
+        self.assertEqual(controller.limit, 3)
+
+        for _ in range(10):
+            self._send(controller, _response(204))
+        self.assertEqual(controller.limit, 4)
+
+
+class TestHeaderParsing(unittest.TestCase):
+    def test_retry_after(self):
+        self.assertEqual(parse_retry_after("12", 5.0), 12.0)
+        self.assertEqual(parse_retry_after(None, 5.0), 5.0)
+        self.assertEqual(parse_retry_after("not a date", 5.0), 5.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", 5.0), 0.0)
+
+    def test_remaining(self):
+        self.assertEqual(parse_remaining("5,999"), 5999.0)
+        self.assertEqual(parse_remaining("00:19:59.5"), 1199.5)
+        self.assertIsNone(parse_remaining(None))
+        self.assertIsNone(parse_remaining("unknown"))
+
+
+class TestThrottledRequestRetry(unittest.TestCase):
+    """DynamicsClient retries requests throttled by the API."""
+
+    def setUp(self):
+        self.client = DynamicsClient.__new__(DynamicsClient)
+        self.client.base_url = "https://org.crm.dynamics.com/api/data/v9.2/"
+        self.client.max_retries = 2
+        self.client._default_header = {}
+        self.client._auth_header = {}
+        self.client._auth = None
+        self.client._default_params = None
+        self.client._rate_controller = AdaptiveRateController(1)
+        self.client._session = MagicMock()
+
+    def test_throttled_request_is_retried(self):
+        self.client._session.request.side_effect = [_response(429, {"Retry-After": "0"}), _response(204)]
+        response = self.client.delete_raw("accounts(1)")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client._session.request.call_count, 2)
+
+    def test_retries_are_limited(self):
+        self.client._session.request.return_value = _response(429, {"Retry-After": "0"})
+        response = self.client.delete_raw("accounts(1)")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.client._session.request.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.client import DynamicsClient  # noqa: E402
+from dynamics.throttling import AdaptiveRateController  # noqa: E402
+from dynamics.token_manager import TokenManager  # noqa: E402
+
+
+def _token_response(access_token, expires_in=3600, refresh_token=None, status_code=200):
+    body = {"access_token": access_token, "expires_on": str(int(time.time() + expires_in))}
+    if refresh_token is not None:
+        body["refresh_token"] = refresh_token
+    if status_code != 200:
+        body = {"error": "invalid_grant"}
+    return MagicMock(status_code=status_code, json=MagicMock(return_value=body))
+
+
+def _manager(**kwargs):
+    return TokenManager("https://login/token", "id", "secret", "https://org/", "refresh-1", **kwargs)
+
+
+@patch("dynamics.token_manager.requests.post")
+class TestTokenManager(unittest.TestCase):
+    def test_valid_token_is_reused(self, post):
+        post.return_value = _token_response("token-1")
+        manager = _manager()
+
+        self.assertEqual(manager.get_token(), "token-1")
+        self.assertEqual(manager.get_token(), "token-1")
+        self.assertEqual(post.call_count, 1)
+
+    def test_token_is_refreshed_before_expiry(self, post):
+        post.side_effect = [_token_response("token-1", expires_in=200), _token_response("token-2")]
+        manager = _manager(refresh_margin=300)
+
+        manager.get_token()
+        self.assertEqual(manager.get_token(), "token-1")
+
+        with patch("dynamics.token_manager.time.time", return_value=time.time() + 150):
+            self.assertEqual(manager.get_token(), "token-2")
+
+    def test_rotated_refresh_token_is_used(self, post):
+        post.side_effect = [_token_response("token-1", refresh_token="refresh-2"), _token_response("token-2")]
+        manager = _manager()
+
+        manager.get_token()
+        manager.invalidate("token-1")
+        manager.get_token()
+
+        self.assertEqual(post.call_args.kwargs["data"]["refresh_token"], "refresh-2")
+        self.assertEqual(manager.refresh_token, "refresh-2")
+
+    def test_invalidating_replaced_token_does_not_refresh(self, post):
+        post.side_effect = [_token_response("token-1"), _token_response("token-2")]
+        manager = _manager()
+
+        manager.get_token()
+        manager.invalidate("token-1")
+        manager.get_token()
+        manager.invalidate("token-1")
+
+        self.assertEqual(manager.get_token(), "token-2")
+        self.assertEqual(post.call_count, 2)
+
+    def test_concurrent_threads_refresh_once(self, post):
+        def slow_refresh(*args, **kwargs):
+            time.sleep(0.05)
+            return _token_response("token-1")
+
+        post.side_effect = slow_refresh
+        manager = _manager()
+        tokens = []
+
+        threads = [threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(tokens, ["token-1"] * 8)
+        self.assertEqual(post.call_count, 1)
+
+    def test_rejected_stored_token_falls_back_to_configuration(self, post):
+        post.side_effect = [_token_response(None, status_code=400), _token_response("token-1")]
+        manager = TokenManager(
+            "https://login/token", "id", "secret", "https://org/", "stored", fallback_refresh_token="configured"
+        )
+
+        self.assertEqual(manager.get_token(), "token-1")
+        self.assertEqual(post.call_args.kwargs["data"]["refresh_token"], "configured")
+
+    def test_refresh_token_survives_state_round_trip(self, post):
+        post.return_value = _token_response("token-1", refresh_token="refresh-2")
+        manager = _manager()
+        manager.get_token()
+
+        state = {TokenManager.STATE_KEY: manager.to_state("refresh-1")}
+
+        self.assertEqual(TokenManager.restore_refresh_token(state, "refresh-1"), "refresh-2")
+        self.assertEqual(TokenManager.restore_refresh_token(state, "reauthorized"), "reauthorized")
+
+
+class TestUnauthorizedRequestRetry(unittest.TestCase):
+    """DynamicsClient retries requests rejected with 401 with a new token on the shared session."""
+
+    def setUp(self):
+        self.client = DynamicsClient.__new__(DynamicsClient)
+        self.client.base_url = "https://org.crm.dynamics.com/api/data/v9.2/"
+        self.client.max_retries = 2
+        self.client._default_header = {}
+        self.client._auth_header = {}
+        self.client._auth = None
+        self.client._default_params = None
+        self.client._rate_controller = AdaptiveRateController(1)
+        self.client._session = MagicMock()
+        self.token_manager = MagicMock()
+        self.token_manager.get_token.side_effect = ["token-1", "token-2"]
+        self.client.token_manager = self.token_manager
+
+    def test_unauthorized_request_is_retried_with_new_token(self):
+        self.client._session.request.side_effect = [MagicMock(status_code=401), MagicMock(status_code=204)]
+        response = self.client.delete_raw("accounts(1)")
+
+        self.assertEqual(response.status_code, 204)
+        self.token_manager.invalidate.assert_called_once_with("token-1")
+        self.assertEqual(self.client._session.request.call_args.kwargs["headers"]["Authorization"], "Bearer token-2")
+
+    def test_unauthorized_request_is_retried_once(self):
+        self.client._session.request.return_value = MagicMock(status_code=401)
+        response = self.client.delete_raw("accounts(1)")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.client._session.request.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import gzip
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import httpx
+import requests
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.transport import HttpxAdapter, compress_body  # noqa: E402
+
+
+class TestCompressBody(unittest.TestCase):
+    def test_large_bodies_are_gzipped(self):
+        headers = {}
+        body = compress_body(json.dumps({"name": "A" * 2000}), headers, 1024)
+
+        self.assertEqual(headers, {"Content-Encoding": "gzip"})
+        self.assertEqual(json.loads(gzip.decompress(body)), {"name": "A" * 2000})
+
+    def test_small_bodies_and_disabled_compression_are_unchanged(self):
+        headers = {}
+
+        self.assertEqual(compress_body(b"{}", headers, 1024), b"{}")
+        self.assertEqual(compress_body(b"{}" * 1000, headers, 0), b"{}" * 1000)
+        self.assertEqual(headers, {})
+
+
+class TestHttpxAdapter(unittest.TestCase):
+    def _session(self, handler, retries: int = 0) -> requests.Session:
+        retry = Retry(total=retries, backoff_factor=0, status_forcelist=(500, 502, 504), allowed_methods=None)
+        adapter = HttpxAdapter(pool_size=4, max_retries=retry)
+        adapter._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        return session
+
+    def test_responses_are_converted(self):
+        requests_sent = []
+
+        def handler(request):
+            requests_sent.append(request)
+            return httpx.Response(204, headers={"OData-EntityId": "https://org/accounts(1)", "req_id": "r1"})
+
+        response = self._session(handler).post("https://org/api/accounts", data=b'{"name": "A"}')
+
+        self.assertEqual((response.status_code, response.reason), (204, "No Content"))
+        self.assertEqual(response.headers["odata-entityid"], "https://org/accounts(1)")
+        self.assertEqual(requests_sent[0].content, b'{"name": "A"}')
+        self.assertEqual(requests_sent[0].headers["content-length"], "13")
+
+    def test_server_errors_are_retried(self):
+        statuses = [502, 502, 200]
+
+        def handler(request):
+            return httpx.Response(statuses.pop(0), json={"value": []})
+
+        response = self._session(handler, retries=2).get("https://org/api/accounts")
+
+        self.assertEqual(response.json(), {"value": []})
+        self.assertEqual(statuses, [])
+
+    def test_exhausted_retries_raise_like_http_adapter(self):
+
+        def failing(request):
+            return httpx.Response(500)
+
+        def disconnecting(request):
+            raise httpx.ConnectError("connection refused")
+
+        with self.assertRaises(requests.exceptions.RetryError):
+            self._session(failing, retries=1).get("https://org/api/accounts")
+
+        with self.assertRaises(requests.ConnectionError):
+            self._session(disconnecting, retries=1).get("https://org/api/accounts")
+
+    def test_http2_is_enabled_on_the_client(self):
+        # httpx refuses to create an HTTP/2 client, if h2 is not installed
+        with patch("dynamics.transport.httpx.Client", wraps=httpx.Client) as client_class:
+            adapter = HttpxAdapter(pool_size=4, http2=True)
+
+        self.assertTrue(adapter.http2)
+        self.assertTrue(client_class.call_args.kwargs["http2"])
+
+    def test_http2_falls_back_to_http1_without_h2(self):
+        with (
+            patch("dynamics.transport.h2", None),
+            patch("dynamics.transport.httpx.Client", wraps=httpx.Client) as client_class,
+            self.assertLogs(level="WARNING") as logs,
+        ):
+            adapter = HttpxAdapter(pool_size=4, http2=True)
+
+        self.assertFalse(adapter.http2)
+        self.assertFalse(client_class.call_args.kwargs["http2"])
+        self.assertIn("HTTP/1.1", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
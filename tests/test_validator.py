@@ -0,0 +1,69 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from dynamics.validator import AttributeValidator  # noqa: E402
+
+ATTRIBUTE_TYPES = {
+    "name": "String",
+    "description": "Memo",
+    "numberofemployees": "Integer",
+    "revenue": "Money",
+    "donotemail": "Boolean",
+    "createdon": "DateTime",
+}
+
+
+class TestAttributeValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = AttributeValidator(ATTRIBUTE_TYPES, ["customerid_account"], ATTRIBUTE_TYPES, {"name": 5})
+
+    def test_unsupported_attributes_and_bind_targets(self):
+        self.assertEqual(
+            self.validator.get_unsupported_attributes(
+                {"name": "A", "notanattr": 1, "customerid_account@odata.bind": "/accounts(1)", "typo@odata.bind": ""}
+            ),
+            ["notanattr", "typo"],
+        )
+
+    def test_lookup_keys_of_navigation_properties_are_supported(self):
+        self.assertEqual(
+            self.validator.get_unsupported_attributes({"customerid_account@key": "a=1", "name@key": "a=1"}), ["name"]
+        )
+
+    def test_metadata_is_reloaded_once_for_unsupported_attributes(self):
+        reload = MagicMock(return_value=(["name", "newattr"], [], {}, {}))
+        validator = AttributeValidator(["name"], [], reload=reload)
+
+        self.assertIsNone(validator.validate({"name": "A"}))
+        reload.assert_not_called()
+
+        self.assertIsNone(validator.validate({"name": "A", "newattr": 1}))
+        self.assertEqual(validator.validate({"othernewattr": 1}), "Unsupported attributes: ['othernewattr']")
+        reload.assert_called_once()
+
+    def test_key_signatures_are_validated_once(self):
+        self.validator.get_unsupported_attributes({"name": "A", "notanattr": 1})
+        self.validator.attributes = frozenset()
+
+        self.assertEqual(self.validator.get_unsupported_attributes({"name": "B", "notanattr": 2}), ["notanattr"])
+
+    def test_values_are_checked_against_types_and_lengths(self):
+        self.assertIsNone(
+            self.validator.validate(
+                {"name": "Short", "numberofemployees": 1, "revenue": 1, "donotemail": False, "createdon": "2024"}
+            )
+        )
+        self.assertIsNone(self.validator.validate({"name": None, "numberofemployees": None}))
+        self.assertEqual(
+            self.validator.validate({"name": "Too long", "numberofemployees": "1", "revenue": True}),
+            "Invalid values: name is longer than 5 characters; numberofemployees must be a whole number;"
+            " revenue must be a number",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()